@@ -0,0 +1,44 @@
+"""load search indexes
+
+Revision ID: 20261018_0003
+Revises: 20260213_0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0003"
+down_revision: str | None = "20260213_0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_loads_origin_lower_trgm",
+            "loads",
+            [sa.text("lower(origin) gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+    else:
+        op.create_index(
+            "ix_loads_search_covering",
+            "loads",
+            ["is_active", "equipment_type", "origin", "pickup_datetime"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_loads_origin_lower_trgm", table_name="loads")
+    else:
+        op.drop_index("ix_loads_search_covering", table_name="loads")
@@ -0,0 +1,153 @@
+"""persisted load search columns
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0004"
+down_revision: str | None = "20261018_0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copies of the app.core.load_matching helpers as of this revision, so later
+# changes to the app cannot alter what this backfill writes.
+EQUIPMENT_ALIASES = {
+    "dryvan": "dry van",
+    "dry-van": "dry van",
+    "reefer": "reefer",
+    "flat bed": "flatbed",
+    "flat-bed": "flatbed",
+}
+
+
+def _normalize_text(value: str) -> str:
+    normalized = value.strip().lower().replace(",", " ")
+    return " ".join(normalized.split())
+
+
+def _normalize_equipment(equipment_type: str) -> str:
+    alias = EQUIPMENT_ALIASES.get(_normalize_text(equipment_type).replace(" ", ""))
+    if alias:
+        return alias
+    return _normalize_text(equipment_type)
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    tokens_type = postgresql.ARRAY(sa.String(length=255)) if is_postgres else sa.JSON()
+
+    op.add_column("loads", sa.Column("origin_normalized", sa.String(length=255), nullable=True))
+    op.add_column("loads", sa.Column("origin_tokens", tokens_type, nullable=True))
+    op.add_column("loads", sa.Column("equipment_code", sa.String(length=50), nullable=True))
+    op.add_column("loads", sa.Column("pickup_at_utc", sa.DateTime(timezone=False), nullable=True))
+
+    loads = sa.table(
+        "loads",
+        sa.column("id", sa.Integer()),
+        sa.column("origin", sa.String()),
+        sa.column("equipment_type", sa.String()),
+        sa.column("pickup_datetime", sa.DateTime(timezone=True)),
+        sa.column("origin_normalized", sa.String()),
+        sa.column("origin_tokens", tokens_type),
+        sa.column("equipment_code", sa.String()),
+        sa.column("pickup_at_utc", sa.DateTime(timezone=False)),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(loads.c.id, loads.c.origin, loads.c.equipment_type, loads.c.pickup_datetime)
+            .where(loads.c.id > last_id)
+            .order_by(loads.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            origin_normalized = _normalize_text(row.origin)
+            values.append(
+                {
+                    "row_id": row.id,
+                    "origin_normalized": origin_normalized,
+                    "origin_tokens": list(dict.fromkeys(origin_normalized.split())),
+                    "equipment_code": _normalize_equipment(row.equipment_type),
+                    "pickup_at_utc": _to_utc_naive(row.pickup_datetime),
+                }
+            )
+        # One executemany UPDATE per batch.
+        bind.execute(loads.update().where(loads.c.id == sa.bindparam("row_id")), values)
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("loads") as batch_op:
+        batch_op.alter_column("origin_normalized", nullable=False)
+        batch_op.alter_column("origin_tokens", nullable=False)
+        batch_op.alter_column("equipment_code", nullable=False)
+        batch_op.alter_column("pickup_at_utc", nullable=False)
+
+    op.create_index(op.f("ix_loads_equipment_code"), "loads", ["equipment_code"], unique=False)
+    op.create_index(op.f("ix_loads_pickup_at_utc"), "loads", ["pickup_at_utc"], unique=False)
+    if is_postgres:
+        op.drop_index("ix_loads_origin_lower_trgm", table_name="loads")
+        op.create_index(
+            "ix_loads_origin_normalized_trgm",
+            "loads",
+            [sa.text("origin_normalized gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+        op.create_index("ix_loads_origin_tokens", "loads", ["origin_tokens"], unique=False, postgresql_using="gin")
+    else:
+        op.drop_index("ix_loads_search_covering", table_name="loads")
+        op.create_index(
+            "ix_loads_search_covering",
+            "loads",
+            ["is_active", "equipment_code", "origin_normalized", "pickup_at_utc"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_loads_origin_tokens", table_name="loads")
+        op.drop_index("ix_loads_origin_normalized_trgm", table_name="loads")
+        op.create_index(
+            "ix_loads_origin_lower_trgm",
+            "loads",
+            [sa.text("lower(origin) gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+    else:
+        op.drop_index("ix_loads_search_covering", table_name="loads")
+        op.create_index(
+            "ix_loads_search_covering",
+            "loads",
+            ["is_active", "equipment_type", "origin", "pickup_datetime"],
+            unique=False,
+        )
+    op.drop_index(op.f("ix_loads_pickup_at_utc"), table_name="loads")
+    op.drop_index(op.f("ix_loads_equipment_code"), table_name="loads")
+    with op.batch_alter_table("loads") as batch_op:
+        batch_op.drop_column("pickup_at_utc")
+        batch_op.drop_column("equipment_code")
+        batch_op.drop_column("origin_tokens")
+        batch_op.drop_column("origin_normalized")
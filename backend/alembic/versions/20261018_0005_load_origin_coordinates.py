@@ -0,0 +1,314 @@
+"""geocoded load origins
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import csv
+import io
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0005"
+down_revision: str | None = "20261018_0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# A frozen copy of app.core.gazetteer and app/data/us_cities.csv as of this revision,
+# so later changes to the app cannot alter what this backfill writes.
+STATE_NAMES = {
+    "alabama": "al",
+    "alaska": "ak",
+    "arizona": "az",
+    "arkansas": "ar",
+    "california": "ca",
+    "colorado": "co",
+    "connecticut": "ct",
+    "delaware": "de",
+    "district of columbia": "dc",
+    "florida": "fl",
+    "georgia": "ga",
+    "hawaii": "hi",
+    "idaho": "id",
+    "illinois": "il",
+    "indiana": "in",
+    "iowa": "ia",
+    "kansas": "ks",
+    "kentucky": "ky",
+    "louisiana": "la",
+    "maine": "me",
+    "maryland": "md",
+    "massachusetts": "ma",
+    "michigan": "mi",
+    "minnesota": "mn",
+    "mississippi": "ms",
+    "missouri": "mo",
+    "montana": "mt",
+    "nebraska": "ne",
+    "nevada": "nv",
+    "new hampshire": "nh",
+    "new jersey": "nj",
+    "new mexico": "nm",
+    "new york": "ny",
+    "north carolina": "nc",
+    "north dakota": "nd",
+    "ohio": "oh",
+    "oklahoma": "ok",
+    "oregon": "or",
+    "pennsylvania": "pa",
+    "rhode island": "ri",
+    "south carolina": "sc",
+    "south dakota": "sd",
+    "tennessee": "tn",
+    "texas": "tx",
+    "utah": "ut",
+    "vermont": "vt",
+    "virginia": "va",
+    "washington": "wa",
+    "west virginia": "wv",
+    "wisconsin": "wi",
+    "wyoming": "wy",
+}
+STATE_CODES = set(STATE_NAMES.values())
+CITY_WORD_ALIASES = {"st": "saint", "st.": "saint", "ft": "fort", "ft.": "fort", "mt": "mount", "mt.": "mount"}
+US_CITIES_CSV = """\
+city,state,latitude,longitude
+Albany,NY,42.6526,-73.7562
+Albuquerque,NM,35.0844,-106.6504
+Allentown,PA,40.6023,-75.4714
+Amarillo,TX,35.2220,-101.8313
+Arlington,TX,32.7357,-97.1081
+Atlanta,GA,33.7490,-84.3880
+Augusta,GA,33.4735,-82.0105
+Aurora,IL,41.7606,-88.3201
+Austin,TX,30.2672,-97.7431
+Bakersfield,CA,35.3733,-119.0187
+Baltimore,MD,39.2904,-76.6122
+Baton Rouge,LA,30.4515,-91.1871
+Billings,MT,45.7833,-108.5007
+Birmingham,AL,33.5186,-86.8104
+Bloomington,IL,40.4842,-88.9937
+Boise,ID,43.6150,-116.2023
+Boston,MA,42.3601,-71.0589
+Buffalo,NY,42.8864,-78.8784
+Cedar Rapids,IA,41.9779,-91.6656
+Champaign,IL,40.1164,-88.2434
+Charleston,SC,32.7765,-79.9311
+Charlotte,NC,35.2271,-80.8431
+Chattanooga,TN,35.0456,-85.3097
+Cheyenne,WY,41.1400,-104.8202
+Chicago,IL,41.8781,-87.6298
+Cicero,IL,41.8456,-87.7539
+Cincinnati,OH,39.1031,-84.5120
+Cleveland,OH,41.4993,-81.6944
+Colorado Springs,CO,38.8339,-104.8214
+Columbia,SC,34.0007,-81.0348
+Columbus,OH,39.9612,-82.9988
+Corpus Christi,TX,27.8006,-97.3964
+Dallas,TX,32.7767,-96.7970
+Davenport,IA,41.5236,-90.5776
+Dayton,OH,39.7589,-84.1916
+Denver,CO,39.7392,-104.9903
+Des Moines,IA,41.5868,-93.6250
+Detroit,MI,42.3314,-83.0458
+Durham,NC,35.9940,-78.8986
+Edison,NJ,40.5187,-74.4121
+El Paso,TX,31.7619,-106.4850
+Elgin,IL,42.0354,-88.2826
+Elizabeth,NJ,40.6640,-74.2107
+Evansville,IN,37.9716,-87.5711
+Fargo,ND,46.8772,-96.7898
+Fort Lauderdale,FL,26.1224,-80.1373
+Fort Smith,AR,35.3859,-94.3985
+Fort Wayne,IN,41.0793,-85.1394
+Fort Worth,TX,32.7555,-97.3308
+Fresno,CA,36.7378,-119.7871
+Gary,IN,41.5934,-87.3464
+Grand Rapids,MI,42.9634,-85.6681
+Green Bay,WI,44.5133,-88.0133
+Greensboro,NC,36.0726,-79.7920
+Greenville,SC,34.8526,-82.3940
+Hammond,IN,41.5834,-87.5000
+Harrisburg,PA,40.2732,-76.8867
+Hartford,CT,41.7658,-72.6734
+Houston,TX,29.7604,-95.3698
+Huntsville,AL,34.7304,-86.5861
+Indianapolis,IN,39.7684,-86.1581
+Jackson,MS,32.2988,-90.1848
+Jacksonville,FL,30.3322,-81.6557
+Jersey City,NJ,40.7178,-74.0431
+Joliet,IL,41.5250,-88.0817
+Kansas City,KS,39.1141,-94.6275
+Kansas City,MO,39.0997,-94.5786
+Knoxville,TN,35.9606,-83.9207
+Lakeland,FL,28.0395,-81.9498
+Lansing,MI,42.7325,-84.5555
+Laredo,TX,27.5306,-99.4803
+Las Vegas,NV,36.1699,-115.1398
+Lexington,KY,38.0406,-84.5037
+Lincoln,NE,40.8136,-96.7026
+Little Rock,AR,34.7465,-92.2896
+Long Beach,CA,33.7701,-118.1937
+Los Angeles,CA,34.0522,-118.2437
+Louisville,KY,38.2527,-85.7585
+Lubbock,TX,33.5779,-101.8552
+Macon,GA,32.8407,-83.6324
+Madison,WI,43.0731,-89.4012
+McAllen,TX,26.2034,-98.2300
+Memphis,TN,35.1495,-90.0490
+Miami,FL,25.7617,-80.1918
+Milwaukee,WI,43.0389,-87.9065
+Minneapolis,MN,44.9778,-93.2650
+Mobile,AL,30.6954,-88.0399
+Montgomery,AL,32.3792,-86.3077
+Naperville,IL,41.7508,-88.1535
+Nashville,TN,36.1627,-86.7816
+New Orleans,LA,29.9511,-90.0715
+New York,NY,40.7128,-74.0060
+Newark,NJ,40.7357,-74.1724
+Norfolk,VA,36.8508,-76.2859
+Oakland,CA,37.8044,-122.2712
+Ogden,UT,41.2230,-111.9738
+Oklahoma City,OK,35.4676,-97.5164
+Omaha,NE,41.2565,-95.9345
+Ontario,CA,34.0633,-117.6509
+Orlando,FL,28.5383,-81.3792
+Pensacola,FL,30.4213,-87.2169
+Peoria,IL,40.6936,-89.5890
+Philadelphia,PA,39.9526,-75.1652
+Phoenix,AZ,33.4484,-112.0740
+Pittsburgh,PA,40.4406,-79.9959
+Portland,OR,45.5152,-122.6784
+Providence,RI,41.8240,-71.4128
+Raleigh,NC,35.7796,-78.6382
+Reno,NV,39.5296,-119.8138
+Richmond,VA,37.5407,-77.4360
+Riverside,CA,33.9806,-117.3755
+Roanoke,VA,37.2710,-79.9414
+Rochester,NY,43.1566,-77.6088
+Rockford,IL,42.2711,-89.0940
+Sacramento,CA,38.5816,-121.4944
+Saint Louis,MO,38.6270,-90.1994
+Saint Paul,MN,44.9537,-93.0900
+Salt Lake City,UT,40.7608,-111.8910
+San Antonio,TX,29.4241,-98.4936
+San Bernardino,CA,34.1083,-117.2898
+San Diego,CA,32.7157,-117.1611
+San Francisco,CA,37.7749,-122.4194
+San Jose,CA,37.3382,-121.8863
+Savannah,GA,32.0809,-81.0912
+Scranton,PA,41.4090,-75.6624
+Seattle,WA,47.6062,-122.3321
+Shreveport,LA,32.5252,-93.7502
+Sioux Falls,SD,43.5446,-96.7311
+South Bend,IN,41.6764,-86.2520
+Spartanburg,SC,34.9496,-81.9320
+Spokane,WA,47.6588,-117.4260
+Springfield,IL,39.7817,-89.6501
+Springfield,MA,42.1015,-72.5898
+Springfield,MO,37.2090,-93.2923
+Stockton,CA,37.9577,-121.2908
+Syracuse,NY,43.0481,-76.1474
+Tacoma,WA,47.2529,-122.4443
+Tallahassee,FL,30.4383,-84.2807
+Tampa,FL,27.9506,-82.4572
+Toledo,OH,41.6528,-83.5379
+Topeka,KS,39.0473,-95.6752
+Trenton,NJ,40.2206,-74.7597
+Tucson,AZ,32.2226,-110.9747
+Tulsa,OK,36.1540,-95.9928
+Waco,TX,31.5493,-97.1467
+Washington,DC,38.9072,-77.0369
+Wichita,KS,37.6872,-97.3301
+Winston-Salem,NC,36.0999,-80.2442
+Worcester,MA,42.2626,-71.8023
+"""
+
+
+def _normalize_text(value: str) -> str:
+    normalized = value.strip().lower().replace(",", " ")
+    return " ".join(normalized.split())
+
+
+def _load_gazetteer() -> tuple[dict[tuple[str, str], tuple[float, float]], dict[str, list[tuple[float, float]]]]:
+    by_city_state: dict[tuple[str, str], tuple[float, float]] = {}
+    by_city: dict[str, list[tuple[float, float]]] = {}
+    for row in csv.DictReader(io.StringIO(US_CITIES_CSV)):
+        city = _normalize_text(row["city"])
+        point = (float(row["latitude"]), float(row["longitude"]))
+        by_city_state[(city, row["state"].lower())] = point
+        by_city.setdefault(city, []).append(point)
+    return by_city_state, by_city
+
+
+def _split_state(words: list[str]) -> tuple[list[str], str | None]:
+    if words and words[-1] in STATE_CODES and len(words) > 1:
+        return words[:-1], words[-1]
+    for size in (3, 2, 1):
+        if len(words) > size:
+            state_name = " ".join(words[-size:])
+            if state_name in STATE_NAMES:
+                return words[:-size], STATE_NAMES[state_name]
+    return words, None
+
+
+def _geocode(location: str, gazetteer) -> tuple[float, float] | None:
+    words = [word for word in _normalize_text(location).split() if not word.isdigit()]
+    city_words, state = _split_state(words)
+    city = " ".join(CITY_WORD_ALIASES.get(word, word) for word in city_words)
+    by_city_state, by_city = gazetteer
+    if state is not None:
+        return by_city_state.get((city, state))
+    candidates = by_city.get(city, [])
+    if len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column("loads", sa.Column("origin_latitude", sa.Float(), nullable=True))
+    op.add_column("loads", sa.Column("origin_longitude", sa.Float(), nullable=True))
+
+    loads = sa.table(
+        "loads",
+        sa.column("id", sa.Integer()),
+        sa.column("origin_normalized", sa.String()),
+        sa.column("origin_latitude", sa.Float()),
+        sa.column("origin_longitude", sa.Float()),
+    )
+    gazetteer = _load_gazetteer()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(loads.c.id, loads.c.origin_normalized)
+            .where(loads.c.id > last_id)
+            .order_by(loads.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            point = _geocode(row.origin_normalized, gazetteer)
+            if point is not None:
+                values.append({"row_id": row.id, "origin_latitude": point[0], "origin_longitude": point[1]})
+        if values:
+            # One executemany UPDATE per batch.
+            bind.execute(loads.update().where(loads.c.id == sa.bindparam("row_id")), values)
+        last_id = rows[-1].id
+
+    op.create_index("ix_loads_origin_coordinates", "loads", ["origin_latitude", "origin_longitude"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_loads_origin_coordinates", table_name="loads")
+    op.drop_column("loads", "origin_longitude")
+    op.drop_column("loads", "origin_latitude")
@@ -0,0 +1,39 @@
+"""carrier verification cache table
+
+Revision ID: 20261018_0006
+Revises: 20261018_0005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0006"
+down_revision: str | None = "20261018_0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "carrier_verifications",
+        sa.Column("mc_number", sa.String(length=32), nullable=False),
+        sa.Column("eligible", sa.Boolean(), nullable=False),
+        sa.Column("verification", sa.String(length=32), nullable=False),
+        sa.Column("legal_name", sa.String(length=255), nullable=True),
+        sa.Column("verified_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("mc_number"),
+    )
+    op.create_index(
+        op.f("ix_carrier_verifications_expires_at"), "carrier_verifications", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_carrier_verifications_expires_at"), table_name="carrier_verifications")
+    op.drop_table("carrier_verifications")
@@ -0,0 +1,33 @@
+"""negotiation session index
+
+Revision ID: 20261018_0007
+Revises: 20261018_0006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0007"
+down_revision: str | None = "20261018_0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_negotiations_session_round",
+        "negotiations",
+        ["call_sid", "load_id", "round_number"],
+        unique=False,
+    )
+    # The composite index leads with call_sid, so the single-column one is redundant.
+    op.drop_index(op.f("ix_negotiations_call_sid"), table_name="negotiations")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_negotiations_call_sid"), "negotiations", ["call_sid"], unique=False)
+    op.drop_index("ix_negotiations_session_round", table_name="negotiations")
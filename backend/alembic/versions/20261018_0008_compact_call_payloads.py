@@ -0,0 +1,44 @@
+"""store call analytics payloads as JSONB
+
+Revision ID: 20261018_0008
+Revises: 20261018_0007
+Create Date: 2026-10-18 00:00:00.000000
+
+Existing payloads are left as written. Compacting them is a separate, explicit
+step: `python -m app.services.call_payloads compact` (and `expand` to undo it).
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0008"
+down_revision: str | None = "20261018_0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "calls",
+            "analytics_payload",
+            type_=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using="analytics_payload::jsonb",
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "calls",
+            "analytics_payload",
+            type_=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using="analytics_payload::json",
+        )
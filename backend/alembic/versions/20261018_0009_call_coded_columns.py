@@ -0,0 +1,122 @@
+"""coded categorical call columns
+
+Revision ID: 20261018_0009
+Revises: 20261018_0008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import re
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0009"
+down_revision: str | None = "20261018_0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# A frozen copy of app.core.call_codes as of this revision, so later changes to the
+# app cannot alter what this backfill writes.
+OUTCOME_OTHER = 0
+OUTCOME_CODES = {
+    "booked": 1,
+    "declined": 2,
+    "no_match": 3,
+    "not_verified": 4,
+    "transferred": 5,
+}
+SENTIMENT_SCORES = {"positive": 1, "neutral": 0, "negative": -1}
+MARGIN_PRESSURE_LEVELS = {"low": 1, "medium": 2, "high": 3}
+EQUIPMENT_DRY_VAN = 1
+EQUIPMENT_REEFER = 2
+EQUIPMENT_FLATBED = 3
+
+
+def _normalize(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def _equipment_code(equipment_type: str | None) -> int | None:
+    tokens = [token.strip() for token in re.split(r"[,/&;|]+", _normalize(equipment_type)) if token.strip()]
+    recognized: set[int] = set()
+    for token in tokens:
+        if "dry" in token and "van" in token:
+            recognized.add(EQUIPMENT_DRY_VAN)
+        elif "reefer" in token:
+            recognized.add(EQUIPMENT_REEFER)
+        elif "flatbed" in token:
+            recognized.add(EQUIPMENT_FLATBED)
+    return recognized.pop() if len(recognized) == 1 else None
+
+
+def _coded_columns(row) -> dict[str, int | str | None]:
+    return {
+        "outcome_code": OUTCOME_CODES.get(re.sub(r"[\s\-]+", "_", _normalize(row.call_outcome)), OUTCOME_OTHER),
+        "sentiment_label": _normalize(row.sentiment) or None,
+        "sentiment_score": SENTIMENT_SCORES.get(_normalize(row.sentiment)),
+        "margin_pressure_level": MARGIN_PRESSURE_LEVELS.get(_normalize(row.deal_margin_pressure)),
+        "equipment_code": _equipment_code(row.equipment_type),
+    }
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column("calls", sa.Column("outcome_code", sa.SmallInteger(), nullable=False, server_default="0"))
+    op.add_column("calls", sa.Column("sentiment_label", sa.String(length=32), nullable=True))
+    op.add_column("calls", sa.Column("sentiment_score", sa.SmallInteger(), nullable=True))
+    op.add_column("calls", sa.Column("margin_pressure_level", sa.SmallInteger(), nullable=True))
+    op.add_column("calls", sa.Column("equipment_code", sa.SmallInteger(), nullable=True))
+
+    calls = sa.table(
+        "calls",
+        sa.column("id", sa.Integer()),
+        sa.column("call_outcome", sa.String()),
+        sa.column("sentiment", sa.String()),
+        sa.column("deal_margin_pressure", sa.String()),
+        sa.column("equipment_type", sa.String()),
+        sa.column("outcome_code", sa.SmallInteger()),
+        sa.column("sentiment_label", sa.String()),
+        sa.column("sentiment_score", sa.SmallInteger()),
+        sa.column("margin_pressure_level", sa.SmallInteger()),
+        sa.column("equipment_code", sa.SmallInteger()),
+    )
+    last_id = 0
+    text_columns = (calls.c.call_outcome, calls.c.sentiment, calls.c.deal_margin_pressure, calls.c.equipment_type)
+    while True:
+        rows = bind.execute(
+            sa.select(calls.c.id, *text_columns)
+            .where(calls.c.id > last_id)
+            .order_by(calls.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        # One executemany UPDATE per batch.
+        bind.execute(
+            calls.update().where(calls.c.id == sa.bindparam("row_id")),
+            [{"row_id": row.id, **_coded_columns(row)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index(op.f("ix_calls_outcome_code"), "calls", ["outcome_code"], unique=False)
+    op.create_index(op.f("ix_calls_sentiment_score"), "calls", ["sentiment_score"], unique=False)
+    # Dashboards no longer filter on the raw text, so its indexes only cost writes.
+    op.drop_index(op.f("ix_calls_call_outcome"), table_name="calls")
+    op.drop_index(op.f("ix_calls_sentiment"), table_name="calls")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_calls_sentiment"), "calls", ["sentiment"], unique=False)
+    op.create_index(op.f("ix_calls_call_outcome"), "calls", ["call_outcome"], unique=False)
+    op.drop_index(op.f("ix_calls_sentiment_score"), table_name="calls")
+    op.drop_index(op.f("ix_calls_outcome_code"), table_name="calls")
+    op.drop_column("calls", "equipment_code")
+    op.drop_column("calls", "margin_pressure_level")
+    op.drop_column("calls", "sentiment_score")
+    op.drop_column("calls", "sentiment_label")
+    op.drop_column("calls", "outcome_code")
@@ -0,0 +1,150 @@
+"""daily call rollups
+
+Revision ID: 20261018_0010
+Revises: 20261018_0009
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_0010"
+down_revision: str | None = "20261018_0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copies of app.core.call_rollups as of this revision, so later changes to the app cannot alter this backfill.
+OUTCOME_BOOKED = 1
+SENTIMENT_MISSING = ""
+VERIFIED = 1
+UNVERIFIED = 0
+VERIFICATION_UNKNOWN = 2
+EQUIPMENT_NONE = 0
+DAILY_KEYS = ("day", "outcome_code", "sentiment_label", "verification_key", "equipment_code")
+DAILY_MEASURES = (
+    "call_count",
+    "loads_presented_sum",
+    "negotiation_rounds_sum",
+    "negotiation_rounds_count",
+    "margin_pressure_sum",
+    "margin_pressure_count",
+)
+LANE_KEYS = ("day", "load_id", "equipment_code")
+LANE_MEASURES = ("call_count", "booked_count", "final_rate_sum", "final_rate_count")
+
+
+def _accumulate(row, daily: dict, lanes: dict) -> None:
+    created_at = row.created_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    day = created_at.date()
+    if row.carrier_verified is None:
+        verification_key = VERIFICATION_UNKNOWN
+    else:
+        verification_key = VERIFIED if row.carrier_verified else UNVERIFIED
+    key = (
+        day,
+        row.outcome_code,
+        row.sentiment_label if row.sentiment_label is not None else SENTIMENT_MISSING,
+        verification_key,
+        row.equipment_code if row.equipment_code is not None else EQUIPMENT_NONE,
+    )
+    totals = daily.setdefault(key, dict.fromkeys(DAILY_MEASURES, 0))
+    totals["call_count"] += 1
+    totals["loads_presented_sum"] += row.loads_presented_count or 0
+    if row.negotiation_rounds is not None:
+        totals["negotiation_rounds_sum"] += row.negotiation_rounds
+        totals["negotiation_rounds_count"] += 1
+    if row.margin_pressure_level is not None:
+        totals["margin_pressure_sum"] += row.margin_pressure_level
+        totals["margin_pressure_count"] += 1
+
+    if row.load_id_discussed is None or row.equipment_code is None:
+        return
+    lane = lanes.setdefault((day, row.load_id_discussed, row.equipment_code), dict.fromkeys(LANE_MEASURES, 0))
+    lane["call_count"] += 1
+    lane["booked_count"] += int(row.outcome_code == OUTCOME_BOOKED)
+    if row.final_rate is not None:
+        lane["final_rate_sum"] += row.final_rate
+        lane["final_rate_count"] += 1
+
+
+def _rows(keys: tuple[str, ...], totals: dict) -> list[dict]:
+    return [{**dict(zip(keys, key)), **totals[key]} for key in sorted(totals)]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    daily = op.create_table(
+        "call_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("outcome_code", sa.SmallInteger(), nullable=False),
+        sa.Column("sentiment_label", sa.String(length=32), nullable=False),
+        sa.Column("verification_key", sa.SmallInteger(), nullable=False),
+        sa.Column("equipment_code", sa.SmallInteger(), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False),
+        sa.Column("loads_presented_sum", sa.Integer(), nullable=False),
+        sa.Column("negotiation_rounds_sum", sa.Integer(), nullable=False),
+        sa.Column("negotiation_rounds_count", sa.Integer(), nullable=False),
+        sa.Column("margin_pressure_sum", sa.Integer(), nullable=False),
+        sa.Column("margin_pressure_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "outcome_code", "sentiment_label", "verification_key", "equipment_code"),
+    )
+    lanes = op.create_table(
+        "call_lane_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("load_id", sa.String(length=64), nullable=False),
+        sa.Column("equipment_code", sa.SmallInteger(), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False),
+        sa.Column("booked_count", sa.Integer(), nullable=False),
+        sa.Column("final_rate_sum", sa.Float(), nullable=False),
+        sa.Column("final_rate_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "load_id", "equipment_code"),
+    )
+
+    calls = sa.table(
+        "calls",
+        sa.column("id", sa.Integer()),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+        sa.column("outcome_code", sa.SmallInteger()),
+        sa.column("sentiment_label", sa.String()),
+        sa.column("carrier_verified", sa.Boolean()),
+        sa.column("equipment_code", sa.SmallInteger()),
+        sa.column("loads_presented_count", sa.Integer()),
+        sa.column("negotiation_rounds", sa.Integer()),
+        sa.column("margin_pressure_level", sa.SmallInteger()),
+        sa.column("load_id_discussed", sa.String()),
+        sa.column("final_rate", sa.Float()),
+    )
+    daily_totals: dict = {}
+    lane_totals: dict = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(calls)
+            .where(calls.c.id > last_id)
+            .order_by(calls.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            _accumulate(row, daily_totals, lane_totals)
+        last_id = rows[-1].id
+
+    if daily_totals:
+        bind.execute(sa.insert(daily), _rows(DAILY_KEYS, daily_totals))
+    if lane_totals:
+        bind.execute(sa.insert(lanes), _rows(LANE_KEYS, lane_totals))
+
+
+def downgrade() -> None:
+    op.drop_table("call_lane_daily_rollups")
+    op.drop_table("call_daily_rollups")
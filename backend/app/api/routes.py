@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db_session
-from app.repositories import CallRepository, LoadRepository, NegotiationRepository
-from app.schemas.call import LogCallRequest, LogCallResponse
+from app.repositories import CallRepository, CarrierVerificationRepository, LoadRepository, NegotiationRepository
+from app.schemas.call import LogCallBulkResponse, LogCallRequest, LogCallResponse
 from app.schemas.dashboard import (
     FunnelStage,
     LoadPerformancePoint,
@@ -12,12 +12,36 @@ from app.schemas.dashboard import (
     SentimentDistributionPoint,
     SentimentPoint,
 )
-from app.schemas.load import SearchLoadsRequest, SearchLoadsResponse
-from app.schemas.negotiation import EvaluateOfferRequest, EvaluateOfferResponse
-from app.schemas.verification import VerifyCarrierRequest, VerifyCarrierResponse
+from app.schemas.load import (
+    SearchLoadsBatchRequest,
+    SearchLoadsBatchResponse,
+    SearchLoadsRequest,
+    SearchLoadsResponse,
+)
+from app.schemas.negotiation import (
+    EvaluateOfferRequest,
+    EvaluateOfferResponse,
+    NegotiationLadderRequest,
+    NegotiationLadderResponse,
+    NegotiationLadderRound,
+)
+from app.schemas.verification import (
+    VerifyCarrierRequest,
+    VerifyCarrierResponse,
+    VerifyCarriersBulkRequest,
+    VerifyCarriersBulkResponse,
+)
 from app.services import AnalyticsService, CarrierService, LoadService, NegotiationService
-from app.services.fmcsa_client import FMCSAClient, FMCSAServiceError
+from app.services.call_log_ingest import call_log_payload, ingest_call_logs
+from app.services.call_log_writer import call_log_writer
+from app.services.carrier_service import verify_carriers
+from app.services.fmcsa_client import FMCSAClient, FMCSAServiceError, build_fmcsa_client
+from app.services.negotiation_audit import negotiation_audit_writer
+from app.services.negotiation_service import MAX_ROUNDS
+from app.services.negotiation_session_cache import negotiation_session_cache
 from app.core.config import get_settings
+from app.core.json_stream import iter_json_records
+from app.core.metrics import collect_metrics
 
 router = APIRouter()
 
@@ -27,12 +51,23 @@ async def healthcheck() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+async def metrics() -> dict:
+    return collect_metrics()
+
+
+def get_fmcsa_client(http_request: Request) -> FMCSAClient:
+    # Created in the app lifespan; without it (e.g. lifespan not run) each call opens its own client.
+    return build_fmcsa_client(get_settings(), getattr(http_request.app.state, "fmcsa_http_client", None))
+
+
 @router.post("/verify-carrier", response_model=VerifyCarrierResponse)
 async def verify_carrier(
     request: VerifyCarrierRequest,
+    fmcsa_client: FMCSAClient = Depends(get_fmcsa_client),
+    session: AsyncSession = Depends(get_db_session),
 ) -> VerifyCarrierResponse:
-    settings = get_settings()
-    carrier_service = CarrierService(FMCSAClient(api_key=settings.fmcsa_api_key))
+    carrier_service = CarrierService(fmcsa_client, CarrierVerificationRepository(session))
 
     try:
         result = await carrier_service.verify(request.mc_number)
@@ -41,6 +76,8 @@ async def verify_carrier(
             verification=result.verification,
             legal_name=result.legal_name,
             mc_number=result.mc_number,
+            cached=result.cached,
+            cache_age_seconds=result.cache_age_seconds,
         )
     except FMCSAServiceError:
         return VerifyCarrierResponse(
@@ -51,6 +88,36 @@ async def verify_carrier(
         )
 
 
+@router.post("/verify-carrier/bulk", response_model=VerifyCarriersBulkResponse)
+async def verify_carriers_bulk(
+    request: VerifyCarriersBulkRequest,
+    fmcsa_client: FMCSAClient = Depends(get_fmcsa_client),
+) -> VerifyCarriersBulkResponse:
+    results = await verify_carriers(
+        request.mc_numbers, fmcsa_client, get_settings().carrier_bulk_verify_max_concurrency
+    )
+    return VerifyCarriersBulkResponse(
+        results=[
+            VerifyCarrierResponse(
+                eligible=False,
+                verification="verification_unavailable",
+                legal_name=None,
+                mc_number=mc_number,
+            )
+            if isinstance(result, FMCSAServiceError)
+            else VerifyCarrierResponse(
+                eligible=result.eligible,
+                verification=result.verification,
+                legal_name=result.legal_name,
+                mc_number=result.mc_number,
+                cached=result.cached,
+                cache_age_seconds=result.cache_age_seconds,
+            )
+            for mc_number, result in zip(request.mc_numbers, results)
+        ]
+    )
+
+
 @router.post("/search-loads", response_model=SearchLoadsResponse)
 async def search_loads(
     request: SearchLoadsRequest,
@@ -61,8 +128,28 @@ async def search_loads(
         equipment_type=request.equipment_type,
         origin_location=request.origin_location,
         availability_time=request.availability_time,
+        origin_radius_miles=request.origin_radius_miles,
+        pickup_window_hours=request.pickup_window_hours,
+    )
+    return SearchLoadsResponse(
+        loads=loads,
+        pruned_by_pickup_window=service.last_search_stats.pruned_by_pickup_window,
+    )
+
+
+@router.post("/search-loads/batch", response_model=SearchLoadsBatchResponse)
+async def search_loads_batch(
+    request: SearchLoadsBatchRequest,
+    session: AsyncSession = Depends(get_db_session),
+) -> SearchLoadsBatchResponse:
+    service = LoadService(LoadRepository(session))
+    results = await service.search_batch(request.queries)
+    return SearchLoadsBatchResponse(
+        results=[
+            SearchLoadsResponse(loads=loads, pruned_by_pickup_window=stats.pruned_by_pickup_window)
+            for loads, stats in results
+        ]
     )
-    return SearchLoadsResponse(loads=loads)
 
 
 @router.post("/evaluate-offer", response_model=EvaluateOfferResponse)
@@ -70,15 +157,19 @@ async def evaluate_offer(
     request: EvaluateOfferRequest,
     session: AsyncSession = Depends(get_db_session),
 ) -> EvaluateOfferResponse:
-    load_repo = LoadRepository(session)
     negotiation_repo = NegotiationRepository(session)
-
-    load = await load_repo.get_by_load_id(request.load_id)
-    previous_counter_rate = None
-    if request.round_number > 1 and load is not None:
-        previous_counter_rate = await negotiation_repo.latest_counter_before_round(
+    previous_turn = negotiation_session_cache.previous_turn(request.call_sid, request.load_id, request.round_number)
+    if previous_turn is not None or request.round_number == 1:
+        # Nothing to look up in the history: round one has none, and the session cache holds the last turn.
+        load = await LoadRepository(session).get_by_load_id(request.load_id)
+        previous_counter_rate = previous_turn.last_counter_rate if previous_turn is not None else None
+    else:
+        # A deferred write of the previous round may still be pending; the history read must see it.
+        await negotiation_audit_writer.wait_for_session(request.call_sid, request.load_id)
+        load, previous_counter_rate = await negotiation_repo.load_with_latest_counter(
             load_id=request.load_id,
             round_number=request.round_number,
+            call_sid=request.call_sid,
         )
 
     decision, counter_rate, reasoning = NegotiationService().evaluate_offer(
@@ -89,31 +180,81 @@ async def evaluate_offer(
     )
 
     if load is not None:
-        await negotiation_repo.create_entry(
-            call_sid=None,
-            load_id=request.load_id,
-            carrier_offer=request.carrier_offer,
-            round_number=request.round_number,
-            decision=decision,
-            counter_rate=counter_rate,
-            reasoning=reasoning,
-        )
+        if request.call_sid is not None:
+            negotiation_session_cache.record(
+                request.call_sid,
+                request.load_id,
+                request.round_number,
+                counter_rate if counter_rate is not None else previous_counter_rate,
+            )
+        audit_entry = {
+            "call_sid": request.call_sid,
+            "load_id": request.load_id,
+            "carrier_offer": request.carrier_offer,
+            "round_number": request.round_number,
+            "decision": decision,
+            "counter_rate": counter_rate,
+            "reasoning": reasoning,
+        }
+        # Without a call_sid the next round reads this row back, so it must be committed first.
+        if get_settings().negotiation_audit_write_mode == "deferred" and request.call_sid is not None:
+            negotiation_audit_writer.schedule(**audit_entry)
+        else:
+            await negotiation_repo.create_entry(**audit_entry)
 
     return EvaluateOfferResponse(decision=decision, counter_rate=counter_rate, reasoning=reasoning)
 
 
+@router.post("/negotiation-ladder", response_model=NegotiationLadderResponse)
+async def negotiation_ladder(
+    request: NegotiationLadderRequest,
+    session: AsyncSession = Depends(get_db_session),
+) -> NegotiationLadderResponse:
+    load = await LoadRepository(session).get_by_load_id(request.load_id)
+    if load is None:
+        raise HTTPException(status_code=404, detail="Unknown load_id")
+
+    ladder = NegotiationService().ladder(load)
+    return NegotiationLadderResponse(
+        load_id=load.load_id,
+        loadboard_rate=ladder.loadboard_rate,
+        accept_at_or_below=ladder.accept_at_or_below,
+        counter_cap=ladder.counter_cap,
+        rounds=[
+            NegotiationLadderRound(
+                round_number=round_number,
+                reject_at_or_above=ladder.reject_at_or_above,
+                reject_above=ladder.reject_above(round_number),
+            )
+            for round_number in range(1, MAX_ROUNDS + 1)
+        ],
+    )
+
+
 @router.post("/log-call", response_model=LogCallResponse)
 async def log_call(
     request: LogCallRequest,
     session: AsyncSession = Depends(get_db_session),
 ) -> LogCallResponse:
-    repo = CallRepository(session)
-    payload = request.model_dump()
-    payload["analytics_payload"] = request.model_dump(mode="json")
-    record = await repo.create_call(payload)
+    payload = call_log_payload(request)
+    # A full queue (or a writer that is not running) falls back to the synchronous insert.
+    if get_settings().call_log_write_mode == "write_behind" and call_log_writer.submit(payload):
+        return LogCallResponse(status="queued")
+    record = await CallRepository(session).create_call(payload)
     return LogCallResponse(status="logged", call_id=record.id)
 
 
+@router.post("/log-call/bulk", response_model=LogCallBulkResponse)
+async def log_call_bulk(
+    http_request: Request,
+    session: AsyncSession = Depends(get_db_session),
+) -> LogCallBulkResponse:
+    # The body is a JSON array or NDJSON of /log-call records, decoded as it streams in.
+    return await ingest_call_logs(
+        iter_json_records(http_request.stream()), CallRepository(session), get_settings().call_log_bulk_batch_rows
+    )
+
+
 @router.get("/dashboard/overview", response_model=OverviewStats)
 async def dashboard_overview(session: AsyncSession = Depends(get_db_session)) -> OverviewStats:
     service = AnalyticsService(CallRepository(session), NegotiationRepository(session), LoadRepository(session))
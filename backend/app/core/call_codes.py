@@ -0,0 +1,75 @@
+"""Enumerated codes for the categorical call fields the dashboards aggregate on.
+
+AI Extract sends `call_outcome`, `sentiment`, `deal_margin_pressure` and
+`equipment_type` as free text. They are normalized once when a call is written
+into small integer columns (and sentiment into a normalized label, since the
+dashboards report every sentiment category), so the aggregates group and
+filter on those columns instead of lowercasing every row.
+"""
+import re
+from collections.abc import Mapping
+from typing import Any
+
+OUTCOME_OTHER = 0
+OUTCOME_CODES = {
+    "booked": 1,
+    "declined": 2,
+    "no_match": 3,
+    "not_verified": 4,
+    "transferred": 5,
+}
+OUTCOME_BOOKED = OUTCOME_CODES["booked"]
+
+# Scores average directly into the dashboards' sentiment and margin-pressure figures.
+SENTIMENT_SCORES = {"positive": 1, "neutral": 0, "negative": -1}
+MARGIN_PRESSURE_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
+EQUIPMENT_DRY_VAN = 1
+EQUIPMENT_REEFER = 2
+EQUIPMENT_FLATBED = 3
+EQUIPMENT_LABELS = {EQUIPMENT_DRY_VAN: "Dry Van", EQUIPMENT_REEFER: "Reefer", EQUIPMENT_FLATBED: "Flatbed"}
+
+
+def _normalize(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def outcome_code(call_outcome: str | None) -> int:
+    return OUTCOME_CODES.get(re.sub(r"[\s\-]+", "_", _normalize(call_outcome)), OUTCOME_OTHER)
+
+
+def sentiment_label(sentiment: str | None) -> str | None:
+    return _normalize(sentiment) or None
+
+
+def sentiment_score(sentiment: str | None) -> int | None:
+    return SENTIMENT_SCORES.get(_normalize(sentiment))
+
+
+def margin_pressure_level(deal_margin_pressure: str | None) -> int | None:
+    return MARGIN_PRESSURE_LEVELS.get(_normalize(deal_margin_pressure))
+
+
+def equipment_code(equipment_type: str | None) -> int | None:
+    tokens = [token.strip() for token in re.split(r"[,/&;|]+", _normalize(equipment_type)) if token.strip()]
+    recognized: set[int] = set()
+    for token in tokens:
+        if "dry" in token and "van" in token:
+            recognized.add(EQUIPMENT_DRY_VAN)
+        elif "reefer" in token:
+            recognized.add(EQUIPMENT_REEFER)
+        elif "flatbed" in token:
+            recognized.add(EQUIPMENT_FLATBED)
+    # Mixed/ambiguous values (e.g. "reefer, dry van") get no code.
+    return recognized.pop() if len(recognized) == 1 else None
+
+
+def coded_columns(values: Mapping[str, Any]) -> dict[str, int | str | None]:
+    """The coded columns for a call with the given free-text fields."""
+    return {
+        "outcome_code": outcome_code(values.get("call_outcome")),
+        "sentiment_label": sentiment_label(values.get("sentiment")),
+        "sentiment_score": sentiment_score(values.get("sentiment")),
+        "margin_pressure_level": margin_pressure_level(values.get("deal_margin_pressure")),
+        "equipment_code": equipment_code(values.get("equipment_type")),
+    }
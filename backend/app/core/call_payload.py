@@ -0,0 +1,59 @@
+"""Compact storage of `calls.analytics_payload`.
+
+Every `/log-call` field also has a typed column on `calls`, so storing the
+whole request again as JSON roughly doubles the row. In compact form the
+payload keeps only what the columns cannot reproduce: keys without a column,
+values that differ from their column's JSON form, and timestamps, which the
+database hands back in its own time zone rather than as they were sent.
+`rebuild_payload` merges both back into the full payload, and works on full and
+compact rows alike.
+"""
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+# The AI Extract fields stored as columns. Fixed here rather than read from the model
+# so that rows compacted earlier keep rebuilding the same keys.
+PAYLOAD_COLUMNS = (
+    "call_outcome",
+    "sentiment",
+    "mc_number",
+    "carrier_verified",
+    "verification_failure_reason",
+    "loads_returned_count",
+    "loads_presented_count",
+    "carrier_interest_level",
+    "load_id_discussed",
+    "initial_rate",
+    "carrier_counter_rate",
+    "final_rate",
+    "negotiation_rounds",
+    "deal_margin_pressure",
+    "equipment_type",
+    "origin_location",
+    "availability_time",
+    "driver_contact_collected",
+    "was_transferred",
+    "transfer_reason",
+)
+
+
+def compact_payload(payload: Mapping[str, Any], columns: Mapping[str, Any]) -> dict[str, Any]:
+    """`payload` without the keys whose column in `columns` already holds the same value."""
+    return {
+        key: value
+        for key, value in payload.items()
+        if key not in PAYLOAD_COLUMNS
+        or key not in columns
+        or isinstance(columns[key], datetime)
+        or to_jsonable_python(columns[key]) != value
+    }
+
+
+def rebuild_payload(columns: Mapping[str, Any], stored_payload: Mapping[str, Any] | None) -> dict[str, Any]:
+    """The full analytics payload: column values in JSON form, overlaid with the stored payload."""
+    payload = {key: to_jsonable_python(columns.get(key)) for key in PAYLOAD_COLUMNS}
+    payload.update(stored_payload or {})
+    return payload
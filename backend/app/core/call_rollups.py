@@ -0,0 +1,107 @@
+"""Daily rollups of calls for the dashboards.
+
+`call_daily_rollups` holds counts and sums per UTC day and combination of
+outcome, sentiment, verification and equipment; `call_lane_daily_rollups`
+holds booking and rate figures per day, discussed load (the lane) and
+equipment. Both are additive, so a batch of new calls is folded in by adding
+its `RollupAccumulator` rows to the stored ones, and a rebuild is one
+accumulator over every call.
+
+Rollup keys are part of a primary key and cannot be NULL, so missing values
+are stored as the sentinels below.
+"""
+from datetime import date
+from typing import Any
+
+from app.core.call_codes import OUTCOME_BOOKED
+from app.core.load_matching import to_utc_naive
+
+SENTIMENT_MISSING = ""
+VERIFIED = 1
+UNVERIFIED = 0
+VERIFICATION_UNKNOWN = 2
+EQUIPMENT_NONE = 0
+
+DAILY_KEYS = ("day", "outcome_code", "sentiment_label", "verification_key", "equipment_code")
+DAILY_MEASURES = (
+    "call_count",
+    "loads_presented_sum",
+    "negotiation_rounds_sum",
+    "negotiation_rounds_count",
+    "margin_pressure_sum",
+    "margin_pressure_count",
+)
+LANE_KEYS = ("day", "load_id", "equipment_code")
+LANE_MEASURES = ("call_count", "booked_count", "final_rate_sum", "final_rate_count")
+# The `calls` columns a rollup reads.
+CALL_COLUMNS = (
+    "created_at",
+    "outcome_code",
+    "sentiment_label",
+    "carrier_verified",
+    "equipment_code",
+    "loads_presented_count",
+    "negotiation_rounds",
+    "margin_pressure_level",
+    "load_id_discussed",
+    "final_rate",
+)
+
+
+def rollup_day(created_at: Any) -> date:
+    return to_utc_naive(created_at).date()
+
+
+def verification_key(carrier_verified: bool | None) -> int:
+    if carrier_verified is None:
+        return VERIFICATION_UNKNOWN
+    return VERIFIED if carrier_verified else UNVERIFIED
+
+
+class RollupAccumulator:
+    """Rollup rows for a set of calls.
+
+    `add` takes anything with the `Call` attributes the rollups read: an ORM
+    row or a result row from `RETURNING`/`SELECT` of those columns.
+    """
+
+    def __init__(self) -> None:
+        self.daily: dict[tuple, dict[str, float]] = {}
+        self.lanes: dict[tuple, dict[str, float]] = {}
+
+    def add(self, call: Any) -> None:
+        day = rollup_day(call.created_at)
+        key = (
+            day,
+            call.outcome_code,
+            call.sentiment_label if call.sentiment_label is not None else SENTIMENT_MISSING,
+            verification_key(call.carrier_verified),
+            call.equipment_code if call.equipment_code is not None else EQUIPMENT_NONE,
+        )
+        daily = self.daily.setdefault(key, dict.fromkeys(DAILY_MEASURES, 0))
+        daily["call_count"] += 1
+        daily["loads_presented_sum"] += call.loads_presented_count or 0
+        if call.negotiation_rounds is not None:
+            daily["negotiation_rounds_sum"] += call.negotiation_rounds
+            daily["negotiation_rounds_count"] += 1
+        if call.margin_pressure_level is not None:
+            daily["margin_pressure_sum"] += call.margin_pressure_level
+            daily["margin_pressure_count"] += 1
+
+        # Load performance only covers calls about a load with a recognized equipment type.
+        if call.load_id_discussed is None or call.equipment_code is None:
+            return
+        lane_key = (day, call.load_id_discussed, call.equipment_code)
+        lane = self.lanes.setdefault(lane_key, dict.fromkeys(LANE_MEASURES, 0))
+        lane["call_count"] += 1
+        lane["booked_count"] += int(call.outcome_code == OUTCOME_BOOKED)
+        if call.final_rate is not None:
+            lane["final_rate_sum"] += call.final_rate
+            lane["final_rate_count"] += 1
+
+    def daily_rows(self) -> list[dict]:
+        # Sorted so concurrent upserts touch rows in the same order and cannot deadlock.
+        return [{**dict(zip(DAILY_KEYS, key)), **self.daily[key]} for key in sorted(self.daily)]
+
+    def lane_rows(self) -> list[dict]:
+        return [{**dict(zip(LANE_KEYS, key)), **self.lanes[key]} for key in sorted(self.lanes)]
@@ -0,0 +1,134 @@
+"""Offline US city gazetteer used to geocode load origins and carrier locations."""
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from app.core.load_matching import normalize_text
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "us_cities.csv"
+EARTH_RADIUS_MILES = 3958.8
+
+STATE_NAMES = {
+    "alabama": "al",
+    "alaska": "ak",
+    "arizona": "az",
+    "arkansas": "ar",
+    "california": "ca",
+    "colorado": "co",
+    "connecticut": "ct",
+    "delaware": "de",
+    "district of columbia": "dc",
+    "florida": "fl",
+    "georgia": "ga",
+    "hawaii": "hi",
+    "idaho": "id",
+    "illinois": "il",
+    "indiana": "in",
+    "iowa": "ia",
+    "kansas": "ks",
+    "kentucky": "ky",
+    "louisiana": "la",
+    "maine": "me",
+    "maryland": "md",
+    "massachusetts": "ma",
+    "michigan": "mi",
+    "minnesota": "mn",
+    "mississippi": "ms",
+    "missouri": "mo",
+    "montana": "mt",
+    "nebraska": "ne",
+    "nevada": "nv",
+    "new hampshire": "nh",
+    "new jersey": "nj",
+    "new mexico": "nm",
+    "new york": "ny",
+    "north carolina": "nc",
+    "north dakota": "nd",
+    "ohio": "oh",
+    "oklahoma": "ok",
+    "oregon": "or",
+    "pennsylvania": "pa",
+    "rhode island": "ri",
+    "south carolina": "sc",
+    "south dakota": "sd",
+    "tennessee": "tn",
+    "texas": "tx",
+    "utah": "ut",
+    "vermont": "vt",
+    "virginia": "va",
+    "washington": "wa",
+    "west virginia": "wv",
+    "wisconsin": "wi",
+    "wyoming": "wy",
+}
+STATE_CODES = set(STATE_NAMES.values())
+CITY_WORD_ALIASES = {"st": "saint", "st.": "saint", "ft": "fort", "ft.": "fort", "mt": "mount", "mt.": "mount"}
+
+
+class GeoPoint(NamedTuple):
+    latitude: float
+    longitude: float
+
+
+@lru_cache(maxsize=1)
+def _load_gazetteer() -> tuple[dict[tuple[str, str], GeoPoint], dict[str, list[GeoPoint]]]:
+    by_city_state: dict[tuple[str, str], GeoPoint] = {}
+    by_city: dict[str, list[GeoPoint]] = {}
+    with GAZETTEER_PATH.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            city = normalize_text(row["city"])
+            point = GeoPoint(float(row["latitude"]), float(row["longitude"]))
+            by_city_state[(city, row["state"].lower())] = point
+            by_city.setdefault(city, []).append(point)
+    return by_city_state, by_city
+
+
+def _split_state(words: list[str]) -> tuple[list[str], str | None]:
+    if words and words[-1] in STATE_CODES and len(words) > 1:
+        return words[:-1], words[-1]
+    for size in (3, 2, 1):
+        if len(words) > size:
+            state_name = " ".join(words[-size:])
+            if state_name in STATE_NAMES:
+                return words[:-size], STATE_NAMES[state_name]
+    return words, None
+
+
+@lru_cache(maxsize=4096)
+def geocode(location: str) -> GeoPoint | None:
+    """Resolve "City, ST" / "City State" / "City" to coordinates.
+
+    A bare city name resolves only when it is unambiguous in the gazetteer.
+    """
+    words = [word for word in normalize_text(location).split() if not word.isdigit()]
+    city_words, state = _split_state(words)
+    city = " ".join(CITY_WORD_ALIASES.get(word, word) for word in city_words)
+    by_city_state, by_city = _load_gazetteer()
+    if state is not None:
+        return by_city_state.get((city, state))
+    candidates = by_city.get(city, [])
+    if len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+def haversine_miles(first: GeoPoint, second: GeoPoint) -> float:
+    lat1, lon1 = math.radians(first.latitude), math.radians(first.longitude)
+    lat2, lon2 = math.radians(second.latitude), math.radians(second.longitude)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def bounding_box(center: GeoPoint, radius_miles: float) -> tuple[float, float, float, float]:
+    """Return `(min_lat, max_lat, min_lon, max_lon)` enclosing the radius around `center`."""
+    lat_delta = math.degrees(radius_miles / EARTH_RADIUS_MILES)
+    cos_lat = max(math.cos(math.radians(center.latitude)), 1e-6)
+    lon_delta = min(math.degrees(radius_miles / (EARTH_RADIUS_MILES * cos_lat)), 180.0)
+    return (
+        center.latitude - lat_delta,
+        center.latitude + lat_delta,
+        center.longitude - lon_delta,
+        center.longitude + lon_delta,
+    )
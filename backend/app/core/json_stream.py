@@ -0,0 +1,136 @@
+"""Incremental decoding of JSON records from a streamed request body.
+
+Accepts either a JSON array of records or NDJSON (one record per line) and
+yields each record as soon as it is complete, so only the current chunk and
+the record being read are held in memory. A malformed NDJSON line is reported
+and skipped; a malformed array cannot be resynchronized, so decoding stops
+there.
+"""
+import codecs
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+MAX_RECORD_CHARS = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+@dataclass(frozen=True)
+class RecordError:
+    message: str
+    # A fatal error ends the stream; later records are not read.
+    fatal: bool = False
+
+
+class _Reader:
+    """Decoded text not consumed yet: `buffer[pos:]`."""
+
+    def __init__(self, chunks: AsyncIterable[bytes]) -> None:
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    @property
+    def pending(self) -> int:
+        return len(self.buffer) - self.pos
+
+    async def fill(self) -> bool:
+        """Append the next chunk; False once the body is exhausted."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            chunk, self.eof = b"", True
+        self.buffer = self.buffer[self.pos :] + self._decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    async def next_char(self) -> str | None:
+        """The next non-whitespace character, without consuming it; None at the end of the body."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not await self.fill():
+                return None
+
+
+async def iter_json_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any | RecordError]:
+    """Yield each record of a JSON array or NDJSON body, or a `RecordError` in its place."""
+    reader = _Reader(chunks)
+    try:
+        first = await reader.next_char()
+        if first is None:
+            return
+        if first == "[":
+            reader.pos += 1
+            async for record in _iter_array(reader):
+                yield record
+        else:
+            async for record in _iter_lines(reader):
+                yield record
+    except UnicodeDecodeError:
+        yield RecordError("Request body is not valid UTF-8", fatal=True)
+
+
+def _parse_line(line: str) -> Any | RecordError:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        return RecordError(f"Invalid JSON: {exc.msg}")
+
+
+async def _iter_lines(reader: _Reader) -> AsyncIterator[Any | RecordError]:
+    while True:
+        end = reader.buffer.rfind("\n", reader.pos)
+        if end != -1:
+            for line in reader.buffer[reader.pos : end].split("\n"):
+                if line.strip():
+                    yield _parse_line(line)
+            reader.pos = end + 1
+        if reader.pending > MAX_RECORD_CHARS:
+            yield RecordError(f"Record exceeds {MAX_RECORD_CHARS} characters", fatal=True)
+            return
+        if not await reader.fill():
+            if reader.buffer[reader.pos :].strip():
+                yield _parse_line(reader.buffer[reader.pos :])
+            return
+
+
+async def _iter_array(reader: _Reader) -> AsyncIterator[Any | RecordError]:
+    decoder = json.JSONDecoder()
+    expect_value = True
+    while True:
+        char = await reader.next_char()
+        if char is None:
+            yield RecordError("Unterminated JSON array", fatal=True)
+            return
+        if char == "]":
+            return
+        if not expect_value:
+            if char != ",":
+                yield RecordError("Expected ',' or ']' between array items", fatal=True)
+                return
+            reader.pos += 1
+            expect_value = True
+            continue
+
+        try:
+            record, end = decoder.raw_decode(reader.buffer, reader.pos)
+        except json.JSONDecodeError as exc:
+            # Most likely the record continues in the next chunk.
+            if reader.pending <= MAX_RECORD_CHARS and await reader.fill():
+                continue
+            yield RecordError(f"Invalid JSON: {exc.msg}", fatal=True)
+            return
+        if end == len(reader.buffer) and not isinstance(record, (dict, list, str)) and await reader.fill():
+            # A bare number or literal at the end of a chunk may be cut short.
+            continue
+        reader.pos = end
+        expect_value = False
+        yield record
@@ -0,0 +1,62 @@
+"""Normalization and scoring rules shared by every load search path."""
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+EQUIPMENT_ALIASES = {
+    "dryvan": "dry van",
+    "dry-van": "dry van",
+    "reefer": "reefer",
+    "flat bed": "flatbed",
+    "flat-bed": "flatbed",
+}
+EPOCH = datetime(1970, 1, 1)
+
+
+def normalize_text(value: str) -> str:
+    normalized = value.strip().lower().replace(",", " ")
+    return " ".join(normalized.split())
+
+
+def normalize_equipment(equipment_type: str) -> str:
+    normalized = normalize_text(equipment_type).replace(" ", "")
+    alias = EQUIPMENT_ALIASES.get(normalized)
+    if alias:
+        return alias
+    return normalize_text(equipment_type)
+
+
+def origin_words(normalized_origin: str) -> list[str]:
+    return list(dict.fromkeys(normalized_origin.split()))
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def epoch_microseconds(utc_naive: datetime) -> int:
+    return (utc_naive - EPOCH) // timedelta(microseconds=1)
+
+
+def origin_query_tokens(normalized_origin: str) -> list[str]:
+    return [token for token in normalized_origin.split() if len(token) >= 2]
+
+
+def equipment_score(requested_equipment: str, normalized_load_equipment: str) -> int:
+    if requested_equipment == normalized_load_equipment:
+        return 3
+    if requested_equipment in normalized_load_equipment or normalized_load_equipment in requested_equipment:
+        return 2
+    return 0
+
+
+def origin_score(normalized_origin: str, origin_tokens: Sequence[str], normalized_load_origin: str) -> int:
+    if normalized_origin and normalized_origin in normalized_load_origin:
+        return 3
+    token_matches = sum(1 for token in origin_tokens if token in normalized_load_origin)
+    if token_matches >= 2:
+        return 2
+    if token_matches == 1:
+        return 1
+    return 0
@@ -0,0 +1,114 @@
+"""Query model and scoring used to rank loads for `/search-loads`."""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.core import load_matching
+from app.core.gazetteer import GeoPoint, geocode, haversine_miles
+
+
+@dataclass(frozen=True)
+class LoadQuery:
+    equipment: str
+    origin: str
+    origin_tokens: tuple[str, ...]
+    availability_time: datetime
+    origin_point: GeoPoint | None = None
+    radius_miles: float | None = None
+    pickup_window: timedelta | None = None
+
+    @classmethod
+    def build(
+        cls,
+        equipment_type: str,
+        origin_location: str,
+        availability_time: datetime,
+        radius_miles: float | None = None,
+        pickup_window_hours: float | None = None,
+    ) -> "LoadQuery":
+        if availability_time.tzinfo is None:
+            availability_time = availability_time.replace(tzinfo=timezone.utc)
+        normalized_origin = load_matching.normalize_text(origin_location)
+        return cls(
+            equipment=load_matching.normalize_equipment(equipment_type),
+            origin=normalized_origin,
+            origin_tokens=tuple(load_matching.origin_query_tokens(normalized_origin)),
+            availability_time=load_matching.to_utc_naive(availability_time),
+            origin_point=geocode(normalized_origin) if radius_miles is not None else None,
+            radius_miles=radius_miles,
+            pickup_window=timedelta(hours=pickup_window_hours) if pickup_window_hours is not None else None,
+        )
+
+    @property
+    def pickup_window_bounds(self) -> tuple[datetime, datetime] | None:
+        """UTC-naive `[start, end]` pickup bounds, or None when the search is not windowed."""
+        if self.pickup_window is None:
+            return None
+        return self.availability_time - self.pickup_window, self.availability_time + self.pickup_window
+
+    @property
+    def is_radius_search(self) -> bool:
+        """Radius matching applies only when the carrier location resolves in the gazetteer."""
+        return self.origin_point is not None and self.radius_miles is not None
+
+
+@dataclass
+class LoadSearchStats:
+    """Per-search counters reported back to callers."""
+
+    pruned_by_pickup_window: int | None = None
+
+
+def proximity_score(distance_miles: float, radius_miles: float) -> int:
+    if distance_miles > radius_miles:
+        return 0
+    if distance_miles <= radius_miles / 3:
+        return 3
+    if distance_miles <= (radius_miles * 2) / 3:
+        return 2
+    return 1
+
+
+def score_load(
+    query: LoadQuery,
+    equipment_code: str,
+    origin_normalized: str,
+    origin_latitude: float | None = None,
+    origin_longitude: float | None = None,
+) -> int:
+    """Return `equipment_score * 2 + origin_score * 3`, or 0 when the load does not match.
+
+    In radius mode the origin score comes from distance and loads outside the
+    radius (or without coordinates) never match, whatever their equipment.
+    """
+    return combine_scores(
+        query,
+        load_matching.equipment_score(query.equipment, equipment_code),
+        origin_component_score(query, origin_normalized, origin_latitude, origin_longitude),
+    )
+
+
+def origin_component_score(
+    query: LoadQuery,
+    origin_normalized: str,
+    origin_latitude: float | None = None,
+    origin_longitude: float | None = None,
+) -> int:
+    """Origin half of `score_load`: text match, or distance band in radius mode."""
+    if query.is_radius_search:
+        if origin_latitude is None or origin_longitude is None:
+            return 0
+        distance = haversine_miles(query.origin_point, GeoPoint(origin_latitude, origin_longitude))
+        return proximity_score(distance, query.radius_miles)
+    return load_matching.origin_score(query.origin, query.origin_tokens, origin_normalized)
+
+
+def combine_scores(query: LoadQuery, equipment_score: int, origin_score: int) -> int:
+    if query.is_radius_search and origin_score == 0:
+        return 0
+    if equipment_score == 0 and origin_score == 0:
+        return 0
+    return (equipment_score * 2) + (origin_score * 3)
+
+
+def time_distance_seconds(query: LoadQuery, pickup_at_utc: datetime) -> float:
+    return abs((pickup_at_utc - query.availability_time).total_seconds())
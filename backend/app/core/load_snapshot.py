@@ -0,0 +1,222 @@
+"""Compact, array-backed snapshot of active loads for the search scoring loop.
+
+Scoring ORM instances pays for attribute instrumentation and an identity-map
+entry per load. The snapshot instead keeps parallel `array` columns: load ids,
+interned equipment and origin ids, and pickups as integer epoch microseconds.
+A query scores each distinct equipment code and origin once, so the per-load
+work is a table lookup and an integer subtraction.
+
+Loads can be replaced or removed in place, so one snapshot can be kept across
+requests and updated as loads change (see `LoadSnapshotStore`). Equipment and
+origin values stay interned after their last load is removed until the next
+rebuild.
+
+With NumPy installed (the optional `fast` extra) `rank(..., scorer="numpy")`
+runs the same lookup, windowing and top-N selection as array operations.
+"""
+import heapq
+from array import array
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from app.core import load_matching
+from app.core.load_ranking import LoadQuery, combine_scores, origin_component_score
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; callers fall back to the Python scorer.
+    np = None
+
+OriginKey = tuple[str, float | None, float | None]
+# Below this size the per-call NumPy overhead outweighs the vectorized loop.
+NUMPY_MIN_LOADS = 1024
+MAX_TOTAL_SCORE = 15
+# The packed top-N key keeps the score above 52 bits of time distance (~142 years in microseconds).
+DISTANCE_BITS = 52
+
+
+class LoadSnapshot:
+    __slots__ = (
+        "load_ids",
+        "equipment_ids",
+        "origin_ids",
+        "pickup_microseconds",
+        "equipment_values",
+        "origin_values",
+        "_positions",
+        "_equipment_lookup",
+        "_origin_lookup",
+        "_numpy_columns",
+    )
+
+    def __init__(self) -> None:
+        self.load_ids = array("q")
+        self.equipment_ids = array("I")
+        self.origin_ids = array("I")
+        self.pickup_microseconds = array("q")
+        self.equipment_values: list[str] = []
+        self.origin_values: list[OriginKey] = []
+        self._positions: dict[int, int] = {}
+        self._equipment_lookup: dict[str, int] = {}
+        self._origin_lookup: dict[OriginKey, int] = {}
+        self._numpy_columns = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "LoadSnapshot":
+        """Build from rows exposing the `SCORING_COLUMNS` attributes (ORM rows or narrow tuples)."""
+        snapshot = cls()
+        for row in rows:
+            snapshot.append(
+                row.id,
+                row.equipment_code,
+                row.origin_normalized,
+                row.origin_latitude,
+                row.origin_longitude,
+                row.pickup_at_utc,
+            )
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.load_ids)
+
+    def __contains__(self, load_pk: int) -> bool:
+        return load_pk in self._positions
+
+    def append(
+        self,
+        load_pk: int,
+        equipment_code: str,
+        origin_normalized: str,
+        origin_latitude: float | None,
+        origin_longitude: float | None,
+        pickup_at_utc: datetime,
+    ) -> None:
+        """Add a load, replacing any earlier entry with the same primary key."""
+        self.remove(load_pk)
+        equipment_id = self._equipment_lookup.get(equipment_code)
+        if equipment_id is None:
+            equipment_id = self._equipment_lookup[equipment_code] = len(self.equipment_values)
+            self.equipment_values.append(equipment_code)
+        origin_key = (origin_normalized, origin_latitude, origin_longitude)
+        origin_id = self._origin_lookup.get(origin_key)
+        if origin_id is None:
+            origin_id = self._origin_lookup[origin_key] = len(self.origin_values)
+            self.origin_values.append(origin_key)
+
+        self._numpy_columns = None
+        self._positions[load_pk] = len(self.load_ids)
+        self.load_ids.append(load_pk)
+        self.equipment_ids.append(equipment_id)
+        self.origin_ids.append(origin_id)
+        self.pickup_microseconds.append(load_matching.epoch_microseconds(pickup_at_utc))
+
+    def remove(self, load_pk: int) -> None:
+        position = self._positions.pop(load_pk, None)
+        if position is None:
+            return
+        self._numpy_columns = None
+        # Ranking never depends on row order, so the last row fills the gap and the arrays shrink by one.
+        last = len(self.load_ids) - 1
+        if position != last:
+            moved_pk = self.load_ids[last]
+            self.load_ids[position] = moved_pk
+            self.equipment_ids[position] = self.equipment_ids[last]
+            self.origin_ids[position] = self.origin_ids[last]
+            self.pickup_microseconds[position] = self.pickup_microseconds[last]
+            self._positions[moved_pk] = position
+        self.load_ids.pop()
+        self.equipment_ids.pop()
+        self.origin_ids.pop()
+        self.pickup_microseconds.pop()
+
+    def rank(self, query: LoadQuery, limit: int, scorer: str = "python") -> tuple[list[int], int | None]:
+        """Return the top `limit` load ids and how many loads the pickup window excluded.
+
+        Ordering matches every other search path: score desc, time distance,
+        pickup time, then id. The pruned count is None when the query has no window.
+        `scorer="numpy"` is honoured when NumPy is importable and the snapshot is
+        large enough to benefit; both scorers return identical results.
+        """
+        if scorer == "numpy" and np is not None and len(self) >= NUMPY_MIN_LOADS:
+            return self._rank_numpy(query, limit)
+        return self._rank_python(query, limit)
+
+    def _rank_python(self, query: LoadQuery, limit: int) -> tuple[list[int], int | None]:
+        score_table = self._score_table(query)
+        availability = load_matching.epoch_microseconds(query.availability_time)
+        window = query.pickup_window_bounds
+        window_start = window_end = None
+        if window is not None:
+            window_start = load_matching.epoch_microseconds(window[0])
+            window_end = load_matching.epoch_microseconds(window[1])
+
+        pruned = 0
+        scored: list[tuple[int, int, int, int]] = []
+        for load_pk, equipment_id, origin_id, pickup in zip(
+            self.load_ids, self.equipment_ids, self.origin_ids, self.pickup_microseconds
+        ):
+            if window_start is not None and not window_start <= pickup <= window_end:
+                pruned += 1
+                continue
+            total_score = score_table[equipment_id][origin_id]
+            if total_score:
+                scored.append((-total_score, abs(pickup - availability), pickup, load_pk))
+
+        ranked = [item[3] for item in heapq.nsmallest(limit, scored)]
+        return ranked, (pruned if window is not None else None)
+
+    def _rank_numpy(self, query: LoadQuery, limit: int) -> tuple[list[int], int | None]:
+        load_ids, equipment_ids, origin_ids, pickups = self._as_numpy()
+        scores = np.asarray(self._score_table(query), dtype=np.int64)[equipment_ids, origin_ids]
+        matches = scores > 0
+
+        pruned = None
+        window = query.pickup_window_bounds
+        if window is not None:
+            in_window = (pickups >= load_matching.epoch_microseconds(window[0])) & (
+                pickups <= load_matching.epoch_microseconds(window[1])
+            )
+            pruned = int(len(self) - np.count_nonzero(in_window))
+            matches &= in_window
+
+        positions = np.flatnonzero(matches)
+        if positions.size == 0 or limit <= 0:
+            return [], pruned
+        scores = scores[positions]
+        distances = np.abs(pickups[positions] - load_matching.epoch_microseconds(query.availability_time))
+
+        if positions.size > limit:
+            # Partition on (score desc, distance) packed into one int64, then keep every
+            # row tied with the boundary so the exact tiebreaks below see all of them.
+            capped_distances = np.minimum(distances, (1 << DISTANCE_BITS) - 1)
+            packed = ((MAX_TOTAL_SCORE - scores) << DISTANCE_BITS) | capped_distances
+            boundary = packed[np.argpartition(packed, limit - 1)[limit - 1]]
+            keep = packed <= boundary
+            positions, scores, distances = positions[keep], scores[keep], distances[keep]
+
+        order = np.lexsort((load_ids[positions], pickups[positions], distances, -scores))[:limit]
+        return load_ids[positions[order]].tolist(), pruned
+
+    def _as_numpy(self):
+        # Copies, not buffer views: a live view would stop the arrays from growing.
+        if self._numpy_columns is None:
+            self._numpy_columns = (
+                np.array(self.load_ids, dtype=np.int64),
+                np.array(self.equipment_ids, dtype=np.intp),
+                np.array(self.origin_ids, dtype=np.intp),
+                np.array(self.pickup_microseconds, dtype=np.int64),
+            )
+        return self._numpy_columns
+
+    def _score_table(self, query: LoadQuery) -> list[list[int]]:
+        """`table[equipment_id][origin_id]` holds `score_load` for that pair, computed once per query."""
+        origin_scores = [
+            origin_component_score(query, origin, latitude, longitude)
+            for origin, latitude, longitude in self.origin_values
+        ]
+        table: list[list[int]] = []
+        for equipment in self.equipment_values:
+            equipment_score = load_matching.equipment_score(query.equipment, equipment)
+            table.append([combine_scores(query, equipment_score, origin_score) for origin_score in origin_scores])
+        return table
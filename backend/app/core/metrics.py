@@ -0,0 +1,12 @@
+"""Process-local registry of counters exposed on `GET /metrics`."""
+from collections.abc import Callable
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict[str, dict]:
+    return {name: provider() for name, provider in sorted(_providers.items())}
@@ -0,0 +1,114 @@
+"""Circuit breaker and concurrency limiter for calls to flaky upstream services."""
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fail fast after `failure_threshold` consecutive failures.
+
+    While open, calls are rejected until `reset_timeout_seconds` has passed;
+    then up to `half_open_max_calls` probes are let through. A successful probe
+    closes the breaker and a failed one reopens it for another timeout.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0, half_open_max_calls: int = 1
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.reset()
+
+    def reset(self) -> None:
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self.half_open_probes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+            self._probes_in_flight += 1
+            self.half_open_probes += 1
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def still_allows_request(self) -> bool:
+        """Re-check a request admitted earlier, e.g. after it queued; it is rejected if the breaker opened since."""
+        if self.state == OPEN:
+            self.rejected_calls += 1
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._probes_in_flight = 0
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self.times_opened += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+            "half_open_probes": self.half_open_probes,
+        }
+
+
+class ConcurrencyLimiter:
+    """Bound the number of concurrent upstream calls; excess callers queue for a slot."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_use": self.in_use, "waiting": self.waiting, "peak_in_use": self.peak_in_use}
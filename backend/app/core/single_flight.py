@@ -0,0 +1,50 @@
+"""Coalesce concurrent calls for the same key into one in-flight task."""
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Run at most one `func()` per key at a time; concurrent callers share its result or error.
+
+    The work runs in its own task, so a caller being cancelled or timing out
+    (e.g. a client disconnecting, a caller deadline) does not cancel the lookup
+    the other callers are waiting on.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]], timeout: float | None = None) -> Any:
+        """Await the shared call for `key`; raises `TimeoutError` if this caller's `timeout` elapses first."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the error retrieved even if every waiter was cancelled.
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+        }
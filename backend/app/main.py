@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,17 +16,48 @@ from app.core.config import Settings, get_settings
 from app.db.seed import seed_loads_if_empty
 from app.db.session import SessionLocal
 from app.middleware.api_key_middleware import APIKeyMiddleware
+from app.services.call_log_writer import call_log_writer
+from app.services.carrier_prewarm import carrier_prewarmer
+from app.services.carrier_service import verification_refresher
+from app.services.fmcsa_client import build_fmcsa_client, build_fmcsa_http_client
+from app.services.negotiation_audit import negotiation_audit_writer
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
     app_settings = settings or get_settings()
 
     @asynccontextmanager
-    async def lifespan(_: FastAPI):
+    async def lifespan(app: FastAPI):
         if app_settings.seed_on_startup:
             async with SessionLocal() as session:
                 await seed_loads_if_empty(session)
-        yield
+        app.state.fmcsa_http_client = build_fmcsa_http_client(app_settings)
+        if app_settings.call_log_write_mode == "write_behind":
+            call_log_writer.start()
+        prewarm_task = None
+        if (
+            app_settings.carrier_prewarm_enabled
+            and app_settings.carrier_verification_cache_enabled
+            and app_settings.fmcsa_api_key
+        ):
+            prewarm_task = asyncio.create_task(
+                carrier_prewarmer.run_periodically(
+                    build_fmcsa_client(app_settings, app.state.fmcsa_http_client),
+                    app_settings.carrier_prewarm_interval_seconds,
+                )
+            )
+        try:
+            yield
+        finally:
+            if prewarm_task is not None:
+                prewarm_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await prewarm_task
+            await call_log_writer.stop()
+            await negotiation_audit_writer.wait_idle()
+            # Background refreshes still use the shared FMCSA client.
+            await verification_refresher.wait_idle()
+            await app.state.fmcsa_http_client.aclose()
 
     app = FastAPI(title=app_settings.app_name, lifespan=lifespan)
 
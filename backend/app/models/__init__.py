@@ -1,3 +1,3 @@
-from app.models.entities import Call, Load, Negotiation
+from app.models.entities import Call, CallDailyRollup, CallLaneDailyRollup, CarrierVerification, Load, Negotiation
 
-__all__ = ["Call", "Load", "Negotiation"]
+__all__ = ["Call", "CallDailyRollup", "CallLaneDailyRollup", "CarrierVerification", "Load", "Negotiation"]
@@ -1,9 +1,30 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, JSON, Numeric, String, Text, func
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    Numeric,
+    SmallInteger,
+    String,
+    Text,
+    event,
+    func,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core import load_matching
+from app.core.call_codes import coded_columns
+from app.core.call_payload import rebuild_payload
+from app.core.gazetteer import geocode
 from app.db.base import Base
 
 
@@ -26,16 +47,68 @@ class Load(Base):
     num_of_pieces: Mapped[int] = mapped_column(Integer, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Search columns derived from origin/equipment_type/pickup_datetime on every insert and update.
+    origin_normalized: Mapped[str] = mapped_column(String(255), nullable=False)
+    origin_tokens: Mapped[list[str]] = mapped_column(
+        JSON().with_variant(postgresql.ARRAY(String(255)), "postgresql"), nullable=False
+    )
+    equipment_code: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    pickup_at_utc: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, index=True)
+    # Geocoded from the bundled gazetteer; NULL when the origin is not a known city.
+    origin_latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    origin_longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     negotiations: Mapped[list["Negotiation"]] = relationship(back_populates="load")
 
+    __table_args__ = (
+        # Serves the `origin_normalized LIKE '%word%'` prefilter of the SQL search path.
+        Index(
+            "ix_loads_origin_normalized_trgm",
+            "origin_normalized",
+            postgresql_using="gin",
+            postgresql_ops={"origin_normalized": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_loads_origin_tokens", "origin_tokens", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_loads_origin_coordinates", "origin_latitude", "origin_longitude"),
+        # SQLite has no trigram support; a covering index lets it score without reading table rows.
+        Index(
+            "ix_loads_search_covering",
+            "is_active",
+            "equipment_code",
+            "origin_normalized",
+            "pickup_at_utc",
+        ).ddl_if(dialect="sqlite"),
+    )
+
+    def refresh_search_columns(self) -> None:
+        self.origin_normalized = load_matching.normalize_text(self.origin)
+        self.origin_tokens = load_matching.origin_words(self.origin_normalized)
+        self.equipment_code = load_matching.normalize_equipment(self.equipment_type)
+        self.pickup_at_utc = load_matching.to_utc_naive(self.pickup_datetime)
+        point = geocode(self.origin_normalized)
+        self.origin_latitude = point.latitude if point else None
+        self.origin_longitude = point.longitude if point else None
+
+
+@event.listens_for(Load, "before_insert")
+@event.listens_for(Load, "before_update")
+def _populate_load_search_columns(_mapper, _connection, target: Load) -> None:
+    target.refresh_search_columns()
+
+
+event.listen(
+    Load.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 
 class Call(Base):
     __tablename__ = "calls"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    call_outcome: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
-    sentiment: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    call_outcome: Mapped[str] = mapped_column(String(64), nullable=False)
+    sentiment: Mapped[str | None] = mapped_column(String(32), nullable=True)
     mc_number: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
     carrier_verified: Mapped[bool | None] = mapped_column(Boolean, nullable=True, index=True)
     verification_failure_reason: Mapped[str | None] = mapped_column(String(128), nullable=True)
@@ -54,16 +127,52 @@ class Call(Base):
     driver_contact_collected: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
     was_transferred: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
     transfer_reason: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    analytics_payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Full request, or with CALL_LOG_PAYLOAD_MODE=compact (or after `app.services.call_payloads compact`)
+    # only what the columns above cannot reproduce; read it through full_analytics_payload().
+    analytics_payload: Mapped[dict] = mapped_column(
+        JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=False, default=dict
+    )
     server_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Coded from call_outcome/sentiment/deal_margin_pressure/equipment_type on every write (see app.core.call_codes).
+    outcome_code: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0, server_default="0", index=True)
+    sentiment_label: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    sentiment_score: Mapped[int | None] = mapped_column(SmallInteger, nullable=True, index=True)
+    margin_pressure_level: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    equipment_code: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+
+    def refresh_coded_columns(self) -> None:
+        for key, value in coded_columns(
+            {
+                "call_outcome": self.call_outcome,
+                "sentiment": self.sentiment,
+                "deal_margin_pressure": self.deal_margin_pressure,
+                "equipment_type": self.equipment_type,
+            }
+        ).items():
+            setattr(self, key, value)
+
+    def full_analytics_payload(self) -> dict:
+        return rebuild_payload(
+            {key: getattr(self, key) for key in self.__table__.columns.keys()}, self.analytics_payload
+        )
+
+
+@event.listens_for(Call, "before_insert")
+@event.listens_for(Call, "before_update")
+def _populate_call_coded_columns(_mapper, _connection, target: Call) -> None:
+    target.refresh_coded_columns()
 
 
 class Negotiation(Base):
     __tablename__ = "negotiations"
+    __table_args__ = (
+        # Serves a session's "latest counter before round N" lookup; its leading column covers call_sid lookups.
+        Index("ix_negotiations_session_round", "call_sid", "load_id", "round_number"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    call_sid: Mapped[str | None] = mapped_column(String(128), nullable=True, index=True)
+    call_sid: Mapped[str | None] = mapped_column(String(128), nullable=True)
     load_id: Mapped[str] = mapped_column(String(64), ForeignKey("loads.load_id"), nullable=False, index=True)
     carrier_offer: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     round_number: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -73,3 +182,48 @@ class Negotiation(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     load: Mapped[Load] = relationship(back_populates="negotiations")
+
+
+class CarrierVerification(Base):
+    """Last FMCSA verification per normalized MC number, reused until `expires_at`."""
+
+    __tablename__ = "carrier_verifications"
+
+    mc_number: Mapped[str] = mapped_column(String(32), primary_key=True)
+    eligible: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    verification: Mapped[str] = mapped_column(String(32), nullable=False)
+    legal_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    verified_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class CallDailyRollup(Base):
+    """Call counts and sums per UTC day and dimension; see `app.core.call_rollups`."""
+
+    __tablename__ = "call_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    outcome_code: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    sentiment_label: Mapped[str] = mapped_column(String(32), primary_key=True)
+    verification_key: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    equipment_code: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    loads_presented_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    negotiation_rounds_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    negotiation_rounds_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    margin_pressure_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    margin_pressure_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CallLaneDailyRollup(Base):
+    """Booking and rate figures per UTC day, discussed load and equipment; see `app.core.call_rollups`."""
+
+    __tablename__ = "call_lane_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    load_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    equipment_code: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    booked_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    final_rate_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    final_rate_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
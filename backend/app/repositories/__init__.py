@@ -1,5 +1,13 @@
 from app.repositories.call_repository import CallRepository
+from app.repositories.call_rollup_repository import CallRollupRepository
+from app.repositories.carrier_verification_repository import CarrierVerificationRepository
 from app.repositories.load_repository import LoadRepository
 from app.repositories.negotiation_repository import NegotiationRepository
 
-__all__ = ["CallRepository", "LoadRepository", "NegotiationRepository"]
+__all__ = [
+    "CallRepository",
+    "CallRollupRepository",
+    "CarrierVerificationRepository",
+    "LoadRepository",
+    "NegotiationRepository",
+]
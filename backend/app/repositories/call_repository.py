@@ -1,9 +1,19 @@
-import re
+from datetime import datetime
 
-from sqlalchemy import Numeric, case, cast, func, literal_column, select
+from sqlalchemy import Numeric, case, cast, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Call, Load
+from app.core.call_codes import EQUIPMENT_LABELS, OUTCOME_BOOKED, SENTIMENT_SCORES, coded_columns
+from app.core.call_payload import compact_payload
+from app.core.config import get_settings
+from app.core.call_rollups import (
+    CALL_COLUMNS as ROLLUP_CALL_COLUMNS,
+    SENTIMENT_MISSING,
+    UNVERIFIED,
+    VERIFIED,
+)
+from app.models import Call, CallDailyRollup, CallLaneDailyRollup, Load
+from app.repositories.call_rollup_repository import CallRollupRepository
 
 
 class CallRepository:
@@ -11,78 +21,85 @@ class CallRepository:
         self.session = session
 
     async def create_call(self, payload: dict) -> Call:
-        payload_copy = dict(payload)
-        analytics_payload = payload_copy.pop("analytics_payload", None)
-        call = Call(**payload_copy, analytics_payload=analytics_payload or payload_copy)
-        self.session.add(call)
-        await self.session.flush()
+        # INSERT ... RETURNING hands back the id and server defaults, so no refresh SELECT is needed.
+        call = await self.session.scalar(insert(Call).values(**self.row_values(payload)).returning(Call))
+        await CallRollupRepository(self.session).add_calls([call])
         await self.session.commit()
-        await self.session.refresh(call)
         return call
 
-    async def overview_stats(self) -> dict:
-        metrics_query = select(
-            func.count(Call.id).label("total_calls"),
-            func.sum(case((Call.carrier_verified.is_(True), 1), else_=0)).label("verified"),
-            func.sum(case((Call.carrier_verified.is_(False), 1), else_=0)).label("unverified"),
-            func.sum(case((func.lower(Call.call_outcome) == "booked", 1), else_=0)).label("booked"),
-            func.coalesce(func.avg(Call.negotiation_rounds), 0.0).label("avg_negotiation_rounds"),
-            func.coalesce(
-                func.avg(
-                    case(
-                        (func.lower(Call.deal_margin_pressure) == "high", 3.0),
-                        (func.lower(Call.deal_margin_pressure) == "medium", 2.0),
-                        (func.lower(Call.deal_margin_pressure) == "low", 1.0),
-                        else_=None,
-                    )
-                ),
-                0.0,
-            ).label("avg_margin_pressure"),
+    async def create_calls(self, payloads: list[dict]) -> int:
+        """Insert many call logs as one multi-row INSERT in one transaction.
+
+        Every payload must carry the same keys. Postgres allows 32767 bind parameters per
+        statement, so with ~25 columns a batch stays well under 1000 rows.
+        """
+        if not payloads:
+            return 0
+        inserted = await self.session.execute(
+            insert(Call)
+            .values([self.row_values(payload) for payload in payloads])
+            .returning(*(getattr(Call, column) for column in ROLLUP_CALL_COLUMNS))
         )
-        metrics = (await self.session.execute(metrics_query)).one()
+        await CallRollupRepository(self.session).add_calls(inserted.all())
+        await self.session.commit()
+        return len(payloads)
+
+    @staticmethod
+    def row_values(payload: dict) -> dict:
+        """Column values for one call log, including its coded columns; `analytics_payload` defaults to the payload.
+
+        With `CALL_LOG_PAYLOAD_MODE=compact` it is stripped of what the columns already hold.
+        Idempotent, so rows built ahead of time (as the write-behind queue does) pass through unchanged.
+        """
+        payload_copy = dict(payload)
+        analytics_payload = payload_copy.pop("analytics_payload", None)
+        if analytics_payload is None:
+            analytics_payload = payload_copy
+        if get_settings().call_log_payload_mode == "compact":
+            analytics_payload = compact_payload(analytics_payload, payload_copy)
+        return {**payload_copy, **coded_columns(payload_copy), "analytics_payload": analytics_payload}
+
+    async def top_mc_numbers(self, limit: int, since: datetime | None = None) -> list[tuple[str, int]]:
+        """Most frequent caller MC numbers with their call counts, busiest first, optionally since `since`."""
+        call_count = func.count(Call.id)
+        query = (
+            select(Call.mc_number, call_count)
+            .where(Call.mc_number.is_not(None), Call.mc_number != "")
+            .group_by(Call.mc_number)
+            .order_by(call_count.desc(), Call.mc_number)
+            .limit(limit)
+        )
+        if since is not None:
+            query = query.where(Call.created_at >= since)
+        return [(row[0], int(row[1])) for row in (await self.session.execute(query)).all()]
+
+    # The dashboard reads below aggregate the daily rollups, so they cost O(days) rows rather than O(calls).
+
+    async def overview_stats(self) -> dict:
+        metrics = (await self.session.execute(select(*self._rollup_totals()))).one()
         total_calls = int(metrics.total_calls or 0)
         verified = int(metrics.verified or 0)
         unverified = int(metrics.unverified or 0)
         booked = int(metrics.booked or 0)
         booking_rate = round((booked / total_calls) * 100.0, 2) if total_calls else 0.0
         verified_ratio = round((verified / unverified), 2) if unverified else float(verified)
-
-        sentiment_score_q = select(
-            func.coalesce(
-                func.avg(
-                    case(
-                        (func.lower(Call.sentiment) == "positive", 1.0),
-                        (func.lower(Call.sentiment) == "neutral", 0.0),
-                        (func.lower(Call.sentiment) == "negative", -1.0),
-                        else_=None,
-                    )
-                ),
-                0.0,
-            )
-        )
-        avg_sentiment = float((await self.session.execute(sentiment_score_q)).scalar_one())
+        avg_negotiation_rounds = _ratio(metrics.negotiation_rounds_sum, metrics.negotiation_rounds_count)
 
         return {
             "total_calls": total_calls,
             "verified_carriers": verified,
             "booked_loads": booked,
-            "avg_sentiment": round(avg_sentiment, 2),
+            "avg_sentiment": round(_ratio(metrics.sentiment_sum, metrics.sentiment_count), 2),
             "booking_rate": booking_rate,
-            "avg_negotiation_rounds": round(float(metrics.avg_negotiation_rounds or 0.0), 2),
-            "avg_margin_pressure": round(float(metrics.avg_margin_pressure or 0.0), 2),
+            "avg_negotiation_rounds": round(avg_negotiation_rounds, 2),
+            "avg_margin_pressure": round(_ratio(metrics.margin_pressure_sum, metrics.margin_pressure_count), 2),
             "verified_vs_unverified_ratio": verified_ratio,
             "verified_count": verified,
             "unverified_count": unverified,
         }
 
     async def funnel_breakdown(self) -> list[dict]:
-        stage_query = select(
-            func.count(Call.id).label("total_calls"),
-            func.sum(case((Call.carrier_verified.is_(True), 1), else_=0)).label("verified"),
-            func.sum(func.coalesce(Call.loads_presented_count, 0)).label("loads_pitched"),
-            func.sum(case((func.lower(Call.call_outcome) == "booked", 1), else_=0)).label("booked"),
-        )
-        result = (await self.session.execute(stage_query)).one()
+        result = (await self.session.execute(select(*self._rollup_totals()))).one()
         return [
             {"stage": "Calls Received", "value": int(result.total_calls or 0)},
             {"stage": "Verified", "value": int(result.verified or 0)},
@@ -90,105 +107,87 @@ class CallRepository:
             {"stage": "Booked", "value": int(result.booked or 0)},
         ]
 
+    @staticmethod
+    def _rollup_totals() -> list:
+        rollup = CallDailyRollup
+        return [
+            func.sum(rollup.call_count).label("total_calls"),
+            func.sum(case((rollup.verification_key == VERIFIED, rollup.call_count), else_=0)).label("verified"),
+            func.sum(case((rollup.verification_key == UNVERIFIED, rollup.call_count), else_=0)).label("unverified"),
+            func.sum(case((rollup.outcome_code == OUTCOME_BOOKED, rollup.call_count), else_=0)).label("booked"),
+            func.sum(rollup.loads_presented_sum).label("loads_pitched"),
+            func.sum(rollup.negotiation_rounds_sum).label("negotiation_rounds_sum"),
+            func.sum(rollup.negotiation_rounds_count).label("negotiation_rounds_count"),
+            func.sum(rollup.margin_pressure_sum).label("margin_pressure_sum"),
+            func.sum(rollup.margin_pressure_count).label("margin_pressure_count"),
+            *_sentiment_sums(rollup),
+        ]
+
     async def sentiment_timeseries(self) -> list[dict]:
-        date_bucket = func.date(Call.created_at)
-        sentiment_avg_raw = func.coalesce(
-            func.avg(
-                case(
-                    (func.lower(Call.sentiment) == "positive", 1.0),
-                    (func.lower(Call.sentiment) == "neutral", 0.0),
-                    (func.lower(Call.sentiment) == "negative", -1.0),
-                    else_=None,
-                )
-            ),
-            0.0,
-        )
+        rollup = CallDailyRollup
         query = (
-            select(
-                date_bucket.label("date"),
-                func.round(cast(sentiment_avg_raw, Numeric(6, 2)), 2).label("avg_sentiment"),
-            )
-            .group_by(date_bucket)
-            .order_by(date_bucket)
+            select(rollup.day, *_sentiment_sums(rollup))
+            .group_by(rollup.day)
+            .order_by(rollup.day)
         )
         rows = (await self.session.execute(query)).all()
-        return [{"date": str(row.date), "avg_sentiment": float(row.avg_sentiment)} for row in rows]
+        return [
+            {"date": str(row.day), "avg_sentiment": round(_ratio(row.sentiment_sum, row.sentiment_count), 2)}
+            for row in rows
+        ]
 
     async def sentiment_distribution(self) -> list[dict]:
-        sentiment_expr = func.coalesce(func.lower(Call.sentiment), literal_column("'unknown'"))
+        call_count = func.sum(CallDailyRollup.call_count)
         query = (
-            select(
-                sentiment_expr.label("sentiment"),
-                func.count(Call.id).label("count"),
-            )
-            .where(sentiment_expr != "unknown")
-            .group_by(sentiment_expr)
-            .order_by(func.count(Call.id).desc())
+            select(CallDailyRollup.sentiment_label, call_count.label("count"))
+            # Calls without a sentiment, or with an explicit "unknown", are not a category.
+            .where(CallDailyRollup.sentiment_label.not_in((SENTIMENT_MISSING, "unknown")))
+            .group_by(CallDailyRollup.sentiment_label)
+            .order_by(call_count.desc())
         )
         rows = (await self.session.execute(query)).all()
-        return [{"sentiment": row.sentiment, "count": int(row.count)} for row in rows]
+        return [{"sentiment": row.sentiment_label, "count": int(row.count)} for row in rows]
 
     async def load_performance_insights(self) -> list[dict]:
-        equipment_expr = func.lower(Call.equipment_type)
+        lane = CallLaneDailyRollup
+        total_calls = func.sum(lane.call_count)
+        # Loadboard rate and miles are averaged per call, as if joined to every call; calls whose load no
+        # longer exists count toward totals but not toward these averages.
+        joined_calls = func.sum(case((Load.id.is_not(None), lane.call_count), else_=0))
         query = (
             select(
-                equipment_expr.label("equipment_type_raw"),
+                lane.equipment_code,
                 Load.origin.label("origin"),
                 Load.destination.label("destination"),
-                func.count(Call.id).label("total_calls"),
-                func.sum(case((func.lower(Call.call_outcome) == "booked", 1), else_=0)).label("booked_calls"),
-                func.round(cast(func.coalesce(func.avg(Call.final_rate), 0.0), Numeric(10, 2)), 2).label("avg_final_rate"),
-                func.round(
-                    cast(func.coalesce(func.avg(cast(Load.loadboard_rate, Numeric(10, 2))), 0.0), Numeric(10, 2)),
-                    2,
-                ).label("avg_loadboard_rate"),
-                func.round(cast(func.coalesce(func.avg(Load.miles), 0.0), Numeric(10, 2)), 2).label("avg_miles"),
+                total_calls.label("total_calls"),
+                func.sum(lane.booked_count).label("booked_calls"),
+                func.sum(lane.final_rate_sum).label("final_rate_sum"),
+                func.sum(lane.final_rate_count).label("final_rate_count"),
+                func.sum(cast(Load.loadboard_rate, Numeric(10, 2)) * lane.call_count).label("loadboard_rate_sum"),
+                func.sum(Load.miles * lane.call_count).label("miles_sum"),
+                joined_calls.label("joined_calls"),
             )
-            .select_from(Call)
-            .join(Load, Load.load_id == Call.load_id_discussed, isouter=True)
-            .where(Call.load_id_discussed.is_not(None), Call.equipment_type.is_not(None))
-            .group_by(equipment_expr, Load.origin, Load.destination)
-            .order_by(func.count(Call.id).desc())
+            .select_from(lane)
+            .join(Load, Load.load_id == lane.load_id, isouter=True)
+            .group_by(lane.equipment_code, Load.origin, Load.destination)
+            .order_by(total_calls.desc())
             .limit(40)
         )
         rows = (await self.session.execute(query)).all()
 
-        def normalize_equipment(raw: str | None) -> str | None:
-            if raw is None:
-                return None
-            value = raw.strip().lower()
-            if not value:
-                return None
-            tokens = [token.strip() for token in re.split(r"[,/&;|]+", value) if token.strip()]
-            recognized: list[str] = []
-            for token in tokens:
-                if "dry" in token and "van" in token:
-                    recognized.append("Dry Van")
-                elif "reefer" in token:
-                    recognized.append("Reefer")
-                elif "flatbed" in token:
-                    recognized.append("Flatbed")
-            # Ignore mixed/ambiguous values (e.g. "reefer, dry van").
-            if len(set(recognized)) != 1:
-                return None
-            return recognized[0]
-
         insights: list[dict] = []
         for row in rows:
-            equipment_type = normalize_equipment(row.equipment_type_raw)
-            if equipment_type is None:
-                continue
             total_calls = int(row.total_calls or 0)
             booked_calls = int(row.booked_calls or 0)
             booking_rate = round((booked_calls / total_calls) * 100.0, 2) if total_calls else 0.0
-            avg_final_rate = float(row.avg_final_rate or 0.0)
-            avg_loadboard_rate = float(row.avg_loadboard_rate or 0.0)
+            avg_final_rate = round(_ratio(row.final_rate_sum, row.final_rate_count), 2)
+            avg_loadboard_rate = round(_ratio(row.loadboard_rate_sum, row.joined_calls), 2)
             market_gap_pct = (
                 round(((avg_final_rate - avg_loadboard_rate) / avg_loadboard_rate) * 100.0, 2) if avg_loadboard_rate else 0.0
             )
             insights.append(
                 {
-                    "equipment_type": equipment_type,
+                    "equipment_type": EQUIPMENT_LABELS[row.equipment_code],
                     "origin": row.origin or "Unknown",
                     "destination": row.destination or "Unknown",
                     "total_calls": total_calls,
@@ -196,8 +195,25 @@ class CallRepository:
                     "booking_rate": booking_rate,
                     "avg_final_rate": avg_final_rate,
                     "avg_loadboard_rate": avg_loadboard_rate,
-                    "avg_miles": float(row.avg_miles or 0.0),
+                    "avg_miles": round(_ratio(row.miles_sum, row.joined_calls), 2),
                     "market_gap_pct": market_gap_pct,
                 }
             )
         return insights
+
+
+def _ratio(total, count) -> float:
+    return float(total) / float(count) if count else 0.0
+
+
+def _sentiment_sums(rollup) -> list:
+    """Score sum and scored-call count of rollup rows; only positive/neutral/negative carry a score."""
+    score = case(
+        *((rollup.sentiment_label == label, value) for label, value in SENTIMENT_SCORES.items()),
+        else_=0,
+    )
+    scored = rollup.sentiment_label.in_(list(SENTIMENT_SCORES))
+    return [
+        func.sum(score * rollup.call_count).label("sentiment_sum"),
+        func.sum(case((scored, rollup.call_count), else_=0)).label("sentiment_count"),
+    ]
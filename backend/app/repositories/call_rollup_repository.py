@@ -0,0 +1,44 @@
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.call_rollups import DAILY_KEYS, DAILY_MEASURES, LANE_KEYS, LANE_MEASURES, RollupAccumulator
+from app.models import CallDailyRollup, CallLaneDailyRollup
+
+
+class CallRollupRepository:
+    """Writes to the daily rollup tables; callers commit."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add_calls(self, calls: Iterable[Any]) -> None:
+        """Fold newly inserted calls into the rollups, in the caller's transaction."""
+        accumulator = RollupAccumulator()
+        for call in calls:
+            accumulator.add(call)
+        await self._increment(CallDailyRollup, accumulator.daily_rows(), DAILY_KEYS, DAILY_MEASURES)
+        await self._increment(CallLaneDailyRollup, accumulator.lane_rows(), LANE_KEYS, LANE_MEASURES)
+
+    async def replace_all(self, accumulator: RollupAccumulator) -> None:
+        await self.session.execute(delete(CallDailyRollup))
+        await self.session.execute(delete(CallLaneDailyRollup))
+        if accumulator.daily:
+            await self.session.execute(insert(CallDailyRollup), accumulator.daily_rows())
+        if accumulator.lanes:
+            await self.session.execute(insert(CallLaneDailyRollup), accumulator.lane_rows())
+
+    async def _increment(self, model, rows: list[dict], keys: tuple[str, ...], measures: tuple[str, ...]) -> None:
+        if not rows:
+            return
+        # INSERT ... ON CONFLICT DO UPDATE adds atomically, so concurrent writers cannot lose increments.
+        dialect_insert = postgresql.insert if self.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = dialect_insert(model).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={measure: getattr(model, measure) + getattr(statement.excluded, measure) for measure in measures},
+        )
+        await self.session.execute(statement)
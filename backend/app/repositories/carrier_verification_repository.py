@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import CarrierVerification
+
+
+class CarrierVerificationRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_expiring_after(self, mc_number: str, cutoff: datetime) -> CarrierVerification | None:
+        query = select(CarrierVerification).where(
+            CarrierVerification.mc_number == mc_number,
+            CarrierVerification.expires_at > cutoff,
+        )
+        return (await self.session.execute(query)).scalar_one_or_none()
+
+    async def list_expiring_after(self, mc_numbers: list[str], cutoff: datetime) -> list[CarrierVerification]:
+        if not mc_numbers:
+            return []
+        query = select(CarrierVerification).where(
+            CarrierVerification.mc_number.in_(mc_numbers),
+            CarrierVerification.expires_at > cutoff,
+        )
+        return list((await self.session.execute(query)).scalars())
+
+    async def upsert(
+        self,
+        mc_number: str,
+        eligible: bool,
+        verification: str,
+        legal_name: str | None,
+        verified_at: datetime,
+        expires_at: datetime,
+    ) -> None:
+        values = {
+            "mc_number": mc_number,
+            "eligible": eligible,
+            "verification": verification,
+            "legal_name": legal_name,
+            "verified_at": verified_at,
+            "expires_at": expires_at,
+        }
+        # One INSERT ... ON CONFLICT DO UPDATE: no read first, and concurrent writers of one MC number
+        # cannot fail each other; whichever verified last wins.
+        dialect_insert = postgresql.insert if self.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = dialect_insert(CarrierVerification).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CarrierVerification.mc_number],
+            set_={key: getattr(statement.excluded, key) for key in values if key != "mc_number"},
+            where=CarrierVerification.verified_at <= statement.excluded.verified_at,
+        )
+        # RETURNING with populate_existing refreshes an entry this session already loaded.
+        await self.session.execute(
+            statement.returning(CarrierVerification).execution_options(populate_existing=True)
+        )
+        await self.session.commit()
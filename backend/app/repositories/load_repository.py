@@ -1,22 +1,38 @@
-from datetime import datetime, timezone
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import Integer, cast, case, func, literal, not_, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import Subquery
 
+from app.core import load_matching, load_snapshot
+from app.core.config import get_settings
+from app.core.gazetteer import bounding_box
+from app.core.load_ranking import LoadQuery, LoadSearchStats, score_load, time_distance_seconds
 from app.models import Load
+from app.repositories.load_search_index import IndexedLoad, LoadSearchIndex, load_search_index
+from app.repositories.load_snapshot_store import SCORING_COLUMNS, LoadSnapshotStore, load_snapshot_store
 
 
 class LoadRepository:
-    EQUIPMENT_ALIASES = {
-        "dryvan": "dry van",
-        "dry-van": "dry van",
-        "reefer": "reefer",
-        "flat bed": "flatbed",
-        "flat-bed": "flatbed",
-    }
-
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        search_strategy: str | None = None,
+        search_index: LoadSearchIndex | None = None,
+        scorer: str | None = None,
+        snapshot_store: LoadSnapshotStore | None = None,
+    ) -> None:
         self.session = session
+        settings = get_settings()
+        self.search_strategy = search_strategy or settings.load_search_strategy
+        self.scorer = scorer or settings.load_search_scorer
+        self.search_index = search_index or load_search_index
+        self.snapshot_store = snapshot_store or load_snapshot_store
+        self.last_search_stats = LoadSearchStats()
+        self.last_batch_stats: list[LoadSearchStats] = []
 
     async def search_loads(
         self,
@@ -24,34 +40,278 @@ class LoadRepository:
         origin_location: str,
         availability_time: datetime,
         limit: int = 15,
+        origin_radius_miles: float | None = None,
+        pickup_window_hours: float | None = None,
     ) -> list[Load]:
-        if availability_time.tzinfo is None:
-            availability_time = availability_time.replace(tzinfo=timezone.utc)
-        availability_time = self._normalize_datetime(availability_time)
+        """Rank active loads for a carrier query; counters land in `last_search_stats`."""
+        query = LoadQuery.build(
+            equipment_type, origin_location, availability_time, origin_radius_miles, pickup_window_hours
+        )
+        self.last_search_stats = LoadSearchStats()
+
+        if self.search_strategy == "index" and not self._ranks_with_numpy:
+            return await self._search_with_index(query, limit)
+        if self.search_strategy == "sql":
+            if query.is_radius_search:
+                return await self._search_radius_in_database(query, limit)
+            return await self._search_in_database(query, limit)
+
+        # Scoring ranks the process-wide snapshot of the narrow search columns; full rows
+        # (including `notes`) are fetched by primary key for the winners alone.
+        snapshot = await self.snapshot_store.ensure_loaded(self.session)
+        ranked_pks, self.last_search_stats.pruned_by_pickup_window = snapshot.rank(query, limit, self.scorer)
+        return await self._fetch_in_order(ranked_pks)
+
+    async def search_loads_batch(self, queries: Sequence[LoadQuery], limit: int = 15) -> list[list[Load]]:
+        """Rank several queries together; per-query counters land in `last_batch_stats`.
 
-        query_result = await self.session.execute(select(Load).where(Load.is_active.is_(True)))
-        active_loads = list(query_result.scalars().all())
-        if not active_loads:
+        The index and scan strategies read and score the candidate set once for
+        the whole batch. The SQL strategy already ranks on the server, so it runs
+        one bounded statement per query on the same session.
+        """
+        self.last_batch_stats = [LoadSearchStats() for _ in queries]
+        if not queries:
             return []
+        if self.search_strategy == "index" and not self._ranks_with_numpy:
+            return await self._search_batch_with_index(queries, limit)
+        if self.search_strategy == "sql":
+            results = []
+            for position, query in enumerate(queries):
+                self.last_search_stats = LoadSearchStats()
+                if query.is_radius_search:
+                    results.append(await self._search_radius_in_database(query, limit))
+                else:
+                    results.append(await self._search_in_database(query, limit))
+                self.last_batch_stats[position] = self.last_search_stats
+            return results
+        return await self._search_batch_with_scan(queries, limit)
+
+    @property
+    def _ranks_with_numpy(self) -> bool:
+        """Whether the kept snapshot is ranked with NumPy; the index strategy then ranks it too.
+
+        A vectorized pass over the whole snapshot costs less than scoring the
+        index's candidates one by one in Python, and returns the same ranking.
+        """
+        return self.scorer == "numpy" and load_snapshot.np is not None
+
+    async def _search_with_index(self, query: LoadQuery, limit: int) -> list[Load]:
+        self.last_batch_stats = [self.last_search_stats]
+        results = await self._search_batch_with_index([query], limit)
+        return results[0]
+
+    async def _search_batch_with_index(self, queries: Sequence[LoadQuery], limit: int) -> list[list[Load]]:
+        await self.search_index.ensure_loaded(self.session)
+        candidates: dict[int, IndexedLoad] = {}
+        windows: list[set[int] | None] = []
+        window_ids_by_bounds: dict[tuple[datetime, datetime], set[int]] = {}
+        for position, query in enumerate(queries):
+            if query.is_radius_search:
+                matches = self.search_index.candidates_near(query.origin_point, query.radius_miles)
+            else:
+                matches = self.search_index.candidates(query.equipment, query.origin)
+            candidates.update((entry.id, entry) for entry in matches)
+
+            window = query.pickup_window_bounds
+            if window is None:
+                windows.append(None)
+                continue
+            if window not in window_ids_by_bounds:
+                window_ids_by_bounds[window] = set(self.search_index.ids_in_pickup_range(*window))
+            in_window_ids = window_ids_by_bounds[window]
+            self.last_batch_stats[position].pruned_by_pickup_window = len(self.search_index) - len(in_window_ids)
+            windows.append(in_window_ids)
+
+        scored: list[list[tuple[int, float, datetime, int]]] = [[] for _ in queries]
+        for entry in candidates.values():
+            for position, query in enumerate(queries):
+                in_window_ids = windows[position]
+                if in_window_ids is not None and entry.id not in in_window_ids:
+                    continue
+                total_score = score_load(query, entry.equipment, entry.origin, entry.latitude, entry.longitude)
+                if total_score == 0:
+                    continue
+                scored[position].append(
+                    (total_score, time_distance_seconds(query, entry.pickup), entry.pickup, entry.id)
+                )
+        return await self._fetch_ranked(scored, limit)
+
+    async def _search_batch_with_scan(self, queries: Sequence[LoadQuery], limit: int) -> list[list[Load]]:
+        """Rank every query against the shared snapshot of the active board.
+
+        Pickup windows are applied per query by the snapshot, since it has to
+        serve queries with different (or no) windows.
+        """
+        snapshot = await self.snapshot_store.ensure_loaded(self.session)
+        ranked_pks: list[list[int]] = []
+        for position, query in enumerate(queries):
+            query_pks, pruned = snapshot.rank(query, limit, self.scorer)
+            ranked_pks.append(query_pks)
+            self.last_batch_stats[position].pruned_by_pickup_window = pruned
+        return await self._fetch_batch_in_order(ranked_pks)
+
+    async def _fetch_ranked(
+        self, scored: list[list[tuple[int, float, datetime, int]]], limit: int
+    ) -> list[list[Load]]:
+        """Sort each query's scored rows and load the winners of the whole batch in one statement."""
+        ranked_pks: list[list[int]] = []
+        for query_scores in scored:
+            query_scores.sort(key=lambda item: (-item[0], item[1], item[2], item[3]))
+            ranked_pks.append([item[3] for item in query_scores[:limit]])
+        return await self._fetch_batch_in_order(ranked_pks)
+
+    async def _fetch_batch_in_order(self, ranked_pks: list[list[int]]) -> list[list[Load]]:
+        loads_by_pk = await self._fetch_by_pk({load_pk for load_pks in ranked_pks for load_pk in load_pks})
+        return [[loads_by_pk[load_pk] for load_pk in load_pks if load_pk in loads_by_pk] for load_pks in ranked_pks]
 
-        normalized_equipment = self._normalize_equipment(equipment_type)
-        normalized_origin = self._normalize_text(origin_location)
-        origin_tokens = [token for token in normalized_origin.split() if len(token) >= 2]
+    async def _search_in_database(self, query: LoadQuery, limit: int) -> list[Load]:
+        """Score, order and limit on the database server so only `limit` rows are returned.
 
-        scored: list[tuple[int, float, Load]] = []
-        for load in active_loads:
-            equipment_score = self._equipment_score(normalized_equipment, load.equipment_type)
-            origin_score = self._origin_score(normalized_origin, origin_tokens, load.origin)
-            if equipment_score == 0 and origin_score == 0:
+        The equipment prefilter is an `IN` over the (small, indexed) set of distinct
+        equipment codes that can match, and the origin prefilter is a `LIKE` per
+        query word on `origin_normalized`, which the pg_trgm GIN index serves on Postgres.
+        Both are exact supersets of the rows the score expressions keep. The equipment
+        codes and the pickup-window count are subqueries, so a search is one round trip.
+        """
+        candidates = aliased(Load)
+        matching_equipment = (
+            select(candidates.equipment_code)
+            .where(candidates.is_active.is_(True), self._sql_equipment_score(query.equipment, candidates) > 0)
+            .distinct()
+        )
+        prefilters = [Load.origin_normalized.contains(word, autoescape=True) for word in query.origin.split()]
+        prefilters.append(Load.equipment_code.in_(matching_equipment))
+
+        equipment_score = self._sql_equipment_score(query.equipment)
+        origin_score = self._sql_origin_score(query.origin, query.origin_tokens)
+        total_score = (equipment_score * 2) + (origin_score * 3)
+        time_distance = func.abs(
+            self._sql_epoch_microseconds(Load.pickup_at_utc) - load_matching.epoch_microseconds(query.availability_time)
+        )
+        ranked = (
+            select(Load.id, total_score.label("total_score"), time_distance.label("time_distance"), Load.pickup_at_utc)
+            .where(Load.is_active.is_(True), *self._sql_window_filter(query), or_(*prefilters), total_score > 0)
+            .order_by(total_score.desc(), time_distance.asc(), Load.pickup_at_utc.asc(), Load.id.asc())
+            .limit(limit)
+            .subquery("ranked")
+        )
+        ordering = (ranked.c.total_score.desc(), ranked.c.time_distance, ranked.c.pickup_at_utc, ranked.c.id)
+
+        pruned = self._pruned_by_window(query)
+        if pruned is None:
+            statement = select(Load).join(ranked, Load.id == ranked.c.id).order_by(*ordering)
+            return list((await self.session.execute(statement)).scalars().all())
+        # The pruned count comes back on every ranked row, or on a single row of NULL loads when none matched.
+        statement = (
+            select(Load, pruned.c.pruned)
+            .select_from(pruned)
+            .outerjoin(ranked, true())
+            .outerjoin(Load, Load.id == ranked.c.id)
+            .order_by(*ordering)
+        )
+        rows = (await self.session.execute(statement)).all()
+        self.last_search_stats.pruned_by_pickup_window = int(rows[0].pruned)
+        return [row.Load for row in rows if row.Load is not None]
+
+    async def _search_radius_in_database(self, query: LoadQuery, limit: int) -> list[Load]:
+        """Prefilter on the coordinate index with the radius' bounding box, then rank the narrow rows.
+
+        Great-circle distance is not portable SQL, so the exact radius check and the
+        proximity score run in Python over the boxed rows only.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(query.origin_point, query.radius_miles)
+        boxed = select(*SCORING_COLUMNS).where(
+            Load.is_active.is_(True),
+            *self._sql_window_filter(query),
+            Load.origin_latitude.between(min_lat, max_lat),
+            Load.origin_longitude.between(min_lon, max_lon),
+        )
+        pruned = self._pruned_by_window(query)
+        if pruned is None:
+            rows = (await self.session.execute(boxed)).all()
+        else:
+            boxed = boxed.subquery("boxed")
+            rows = (
+                await self.session.execute(
+                    select(boxed, pruned.c.pruned).select_from(pruned).outerjoin(boxed, true())
+                )
+            ).all()
+            self.last_search_stats.pruned_by_pickup_window = int(rows[0].pruned)
+            rows = [row for row in rows if row.id is not None]
+
+        scored: list[tuple[int, float, datetime, int]] = []
+        for row in rows:
+            total_score = score_load(
+                query, row.equipment_code, row.origin_normalized, row.origin_latitude, row.origin_longitude
+            )
+            if total_score == 0:
                 continue
+            scored.append((total_score, time_distance_seconds(query, row.pickup_at_utc), row.pickup_at_utc, row.id))
+
+        scored.sort(key=lambda item: (-item[0], item[1], item[2], item[3]))
+        return await self._fetch_in_order([item[3] for item in scored[:limit]])
+
+    def _sql_window_filter(self, query: LoadQuery) -> list[ColumnElement]:
+        window = query.pickup_window_bounds
+        if window is None:
+            return []
+        return [Load.pickup_at_utc.between(*window)]
 
-            total_score = (equipment_score * 2) + (origin_score * 3)
-            pickup_time = self._normalize_datetime(load.pickup_datetime)
-            time_distance = abs((pickup_time - availability_time).total_seconds())
-            scored.append((total_score, time_distance, load))
+    def _pruned_by_window(self, query: LoadQuery) -> Subquery | None:
+        """A one-row subquery counting the active loads the pickup window excludes before scoring."""
+        window_filter = self._sql_window_filter(query)
+        if not window_filter:
+            return None
+        return (
+            select(func.count(Load.id).label("pruned"))
+            .where(Load.is_active.is_(True), not_(window_filter[0]))
+            .subquery("pruned_by_window")
+        )
 
-        scored.sort(key=lambda item: (-item[0], item[1], item[2].pickup_datetime))
-        return [item[2] for item in scored[:limit]]
+    def _sql_equipment_score(self, normalized_equipment: str, loads=Load) -> ColumnElement:
+        requested = literal(normalized_equipment)
+        partial_match = or_(
+            self._sql_contains(loads.equipment_code, requested),
+            self._sql_contains(requested, loads.equipment_code),
+        )
+        return case((loads.equipment_code == requested, 3), (partial_match, 2), else_=0)
+
+    def _sql_origin_score(self, normalized_origin: str, origin_tokens: tuple[str, ...]) -> ColumnElement:
+        token_matches: ColumnElement = literal(0)
+        for token in origin_tokens:
+            token_match = self._sql_contains(Load.origin_normalized, literal(token))
+            token_matches = token_matches + case((token_match, 1), else_=0)
+        whens = []
+        if normalized_origin:
+            whens.append((self._sql_contains(Load.origin_normalized, literal(normalized_origin)), 3))
+        whens.extend([(token_matches >= 2, 2), (token_matches == 1, 1)])
+        return case(*whens, else_=0)
+
+    def _sql_contains(self, haystack: ColumnElement, needle: ColumnElement) -> ColumnElement:
+        if self._dialect_name == "postgresql":
+            return func.strpos(haystack, needle) > 0
+        return func.instr(haystack, needle) > 0
+
+    def _sql_epoch_microseconds(self, column: ColumnElement) -> ColumnElement:
+        if self._dialect_name == "postgresql":
+            return func.extract("epoch", column) * 1_000_000
+        # SQLite stores DateTime values as "YYYY-MM-DD HH:MM:SS.ffffff".
+        return cast(func.strftime("%s", column), Integer) * 1_000_000 + cast(func.substr(column, 21, 6), Integer)
+
+    @property
+    def _dialect_name(self) -> str:
+        return self.session.bind.dialect.name
+
+    async def _fetch_in_order(self, load_pks: list[int]) -> list[Load]:
+        loads_by_pk = await self._fetch_by_pk(load_pks)
+        return [loads_by_pk[load_pk] for load_pk in load_pks if load_pk in loads_by_pk]
+
+    async def _fetch_by_pk(self, load_pks: Iterable[int]) -> dict[int, Load]:
+        load_pks = list(load_pks)
+        if not load_pks:
+            return {}
+        result = await self.session.execute(select(Load).where(Load.id.in_(load_pks), Load.is_active.is_(True)))
+        return {load.id: load for load in result.scalars().all()}
 
     async def get_by_load_id(self, load_id: str) -> Load | None:
         result = await self.session.execute(select(Load).where(Load.load_id == load_id))
@@ -60,38 +320,3 @@ class LoadRepository:
     async def all_loads(self) -> list[Load]:
         result = await self.session.execute(select(Load).order_by(Load.pickup_datetime.asc()))
         return list(result.scalars().all())
-
-    def _normalize_text(self, value: str) -> str:
-        normalized = value.strip().lower().replace(",", " ")
-        return " ".join(normalized.split())
-
-    def _normalize_equipment(self, equipment_type: str) -> str:
-        normalized = self._normalize_text(equipment_type).replace(" ", "")
-        alias = self.EQUIPMENT_ALIASES.get(normalized)
-        if alias:
-            return alias
-        return self._normalize_text(equipment_type)
-
-    def _equipment_score(self, requested_equipment: str, load_equipment: str) -> int:
-        normalized_load_equipment = self._normalize_equipment(load_equipment)
-        if requested_equipment == normalized_load_equipment:
-            return 3
-        if requested_equipment in normalized_load_equipment or normalized_load_equipment in requested_equipment:
-            return 2
-        return 0
-
-    def _origin_score(self, normalized_origin: str, origin_tokens: list[str], load_origin: str) -> int:
-        normalized_load_origin = self._normalize_text(load_origin)
-        if normalized_origin and normalized_origin in normalized_load_origin:
-            return 3
-        token_matches = sum(1 for token in origin_tokens if token in normalized_load_origin)
-        if token_matches >= 2:
-            return 2
-        if token_matches == 1:
-            return 1
-        return 0
-
-    def _normalize_datetime(self, value: datetime) -> datetime:
-        if value.tzinfo is None:
-            return value
-        return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,266 @@
+"""Process-local inverted index over active loads for `/search-loads`.
+
+The index keeps one narrow entry per active load plus posting lists keyed by
+normalized equipment and by origin word, and a uniform lat/lon grid over geocoded
+origins, so a search only scores loads that can possibly match instead of reading
+the whole `loads` table.
+
+Changes made through the ORM are applied incrementally when the owning session
+commits. Writes that bypass the ORM unit of work (bulk `update()` statements,
+other processes such as the seed CLI) are picked up by the periodic full
+rebuild controlled by `max_age_seconds`.
+"""
+import asyncio
+import math
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.gazetteer import GeoPoint, bounding_box
+from app.core.load_matching import equipment_score, to_utc_naive
+from app.models import Load
+
+_PENDING_CHANGES_KEY = "load_search_index_changes"
+GRID_CELL_DEGREES = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedLoad:
+    id: int
+    equipment: str
+    origin: str
+    origin_tokens: tuple[str, ...]
+    pickup: datetime
+    latitude: float | None = None
+    longitude: float | None = None
+
+    @property
+    def grid_cell(self) -> tuple[int, int] | None:
+        if self.latitude is None or self.longitude is None:
+            return None
+        return _grid_cell(self.latitude, self.longitude)
+
+
+def _grid_cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return math.floor(latitude / GRID_CELL_DEGREES), math.floor(longitude / GRID_CELL_DEGREES)
+
+
+class LoadSearchIndex:
+    def __init__(self, max_age_seconds: float = 300.0) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._lock = asyncio.Lock()
+        self._reset_structures()
+        self._loaded_at: float | None = None
+        self._rebuilding = False
+        self._changes_during_rebuild: list[tuple[int, IndexedLoad | None]] = []
+
+    def _reset_structures(self) -> None:
+        self._entries: dict[int, IndexedLoad] = {}
+        self._by_equipment: dict[str, set[int]] = {}
+        self._by_origin_word: dict[str, set[int]] = {}
+        self._pickup_order: list[tuple[datetime, int]] = []
+        self._by_grid_cell: dict[tuple[int, int], set[int]] = {}
+
+    @property
+    def is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return (time.monotonic() - self._loaded_at) < self.max_age_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self) -> None:
+        self._reset_structures()
+        self._loaded_at = None
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self.is_fresh:
+            return
+        async with self._lock:
+            if self.is_fresh:
+                return
+            await self._rebuild(session)
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        self._rebuilding = True
+        self._changes_during_rebuild = []
+        try:
+            query = select(
+                Load.id,
+                Load.equipment_code,
+                Load.origin_normalized,
+                Load.origin_tokens,
+                Load.pickup_at_utc,
+                Load.origin_latitude,
+                Load.origin_longitude,
+            ).where(Load.is_active.is_(True))
+            rows = (await session.execute(query)).all()
+            self._reset_structures()
+            for row in rows:
+                self._add(
+                    IndexedLoad(
+                        row.id,
+                        row.equipment_code,
+                        row.origin_normalized,
+                        tuple(row.origin_tokens),
+                        row.pickup_at_utc,
+                        row.origin_latitude,
+                        row.origin_longitude,
+                    )
+                )
+            # Commits that landed while the snapshot was being read are replayed on top of it.
+            for load_pk, entry in self._changes_during_rebuild:
+                self._apply(load_pk, entry)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._rebuilding = False
+            self._changes_during_rebuild = []
+
+    def apply_changes(self, changes: list[tuple[int, IndexedLoad | None]]) -> None:
+        """Apply committed changes; an entry of `None` removes the load from the index."""
+        for load_pk, entry in changes:
+            if self._rebuilding:
+                self._changes_during_rebuild.append((load_pk, entry))
+            self._apply(load_pk, entry)
+
+    def _apply(self, load_pk: int, entry: IndexedLoad | None) -> None:
+        self._remove(load_pk)
+        if entry is not None:
+            self._add(entry)
+
+    def _add(self, entry: IndexedLoad) -> None:
+        self._entries[entry.id] = entry
+        self._by_equipment.setdefault(entry.equipment, set()).add(entry.id)
+        for word in entry.origin_tokens:
+            self._by_origin_word.setdefault(word, set()).add(entry.id)
+        insort(self._pickup_order, (entry.pickup, entry.id))
+        cell = entry.grid_cell
+        if cell is not None:
+            self._by_grid_cell.setdefault(cell, set()).add(entry.id)
+
+    def _remove(self, load_pk: int) -> None:
+        entry = self._entries.pop(load_pk, None)
+        if entry is None:
+            return
+        self._discard_posting(self._by_equipment, entry.equipment, load_pk)
+        for word in entry.origin_tokens:
+            self._discard_posting(self._by_origin_word, word, load_pk)
+        position = bisect_left(self._pickup_order, (entry.pickup, load_pk))
+        if position < len(self._pickup_order) and self._pickup_order[position] == (entry.pickup, load_pk):
+            del self._pickup_order[position]
+        cell = entry.grid_cell
+        if cell is not None:
+            self._discard_posting(self._by_grid_cell, cell, load_pk)
+
+    @staticmethod
+    def _discard_posting(postings: dict, key, load_pk: int) -> None:
+        ids = postings.get(key)
+        if ids is None:
+            return
+        ids.discard(load_pk)
+        if not ids:
+            del postings[key]
+
+    def candidates(self, normalized_equipment: str, normalized_origin: str) -> list[IndexedLoad]:
+        """Return every indexed load that can score above zero for the query.
+
+        Query words never contain spaces, so any substring match against a load's
+        normalized origin falls inside a single origin word. Scanning the word and
+        equipment vocabularies therefore yields a superset of the matching loads
+        without touching loads that cannot match.
+        """
+        candidate_ids: set[int] = set()
+        for equipment, ids in self._by_equipment.items():
+            if equipment_score(normalized_equipment, equipment) > 0:
+                candidate_ids |= ids
+
+        query_words = normalized_origin.split()
+        if query_words:
+            for word, ids in self._by_origin_word.items():
+                if any(query_word in word for query_word in query_words):
+                    candidate_ids |= ids
+
+        return [self._entries[load_pk] for load_pk in candidate_ids]
+
+    def candidates_near(self, center: GeoPoint, radius_miles: float) -> list[IndexedLoad]:
+        """Return loads in grid cells overlapping the radius' bounding box.
+
+        Only cells intersecting the box are visited, so the cost scales with the
+        loads near `center` rather than with the size of the board. Callers apply
+        the exact great-circle distance check.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(center, radius_miles)
+        min_row, min_col = _grid_cell(min_lat, min_lon)
+        max_row, max_col = _grid_cell(max_lat, max_lon)
+        matches: list[IndexedLoad] = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for load_pk in self._by_grid_cell.get((row, col), ()):
+                    matches.append(self._entries[load_pk])
+        return matches
+
+    def ids_in_pickup_range(self, start: datetime, end: datetime) -> list[int]:
+        """Return ids of loads whose UTC pickup falls within `[start, end]`, in pickup order."""
+        lower = bisect_left(self._pickup_order, (to_utc_naive(start), -1))
+        upper = bisect_right(self._pickup_order, (to_utc_naive(end), float("inf")))
+        return [load_pk for _, load_pk in self._pickup_order[lower:upper]]
+
+
+load_search_index = LoadSearchIndex(max_age_seconds=get_settings().load_index_max_age_seconds)
+
+LoadChanges = list[tuple[int, IndexedLoad | None]]
+_change_subscribers: list[Callable[[LoadChanges], None]] = [load_search_index.apply_changes]
+
+
+def subscribe_to_load_changes(callback: Callable[[LoadChanges], None]) -> None:
+    """Call `callback` with every committed batch of load inserts, updates and deactivations."""
+    _change_subscribers.append(callback)
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_load_changes(session: Session, _flush_context) -> None:
+    changes: LoadChanges = session.info.setdefault(_PENDING_CHANGES_KEY, [])
+    for instance in session.new:
+        if isinstance(instance, Load):
+            changes.append((instance.id, _entry_for(instance)))
+    for instance in session.dirty:
+        if isinstance(instance, Load) and session.is_modified(instance):
+            changes.append((instance.id, _entry_for(instance)))
+    for instance in session.deleted:
+        if isinstance(instance, Load):
+            changes.append((instance.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_load_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_CHANGES_KEY, None)
+    if changes:
+        for callback in _change_subscribers:
+            callback(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_load_changes(session: Session) -> None:
+    session.info.pop(_PENDING_CHANGES_KEY, None)
+
+
+def _entry_for(load: Load) -> IndexedLoad | None:
+    if not load.is_active:
+        return None
+    return IndexedLoad(
+        load.id,
+        load.equipment_code,
+        load.origin_normalized,
+        tuple(load.origin_tokens),
+        load.pickup_at_utc,
+        load.origin_latitude,
+        load.origin_longitude,
+    )
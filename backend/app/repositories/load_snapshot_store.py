@@ -0,0 +1,87 @@
+"""Process-local `LoadSnapshot` of active loads, kept across `/search-loads` requests.
+
+The snapshot is read from the narrow search columns once and then updated from
+the load-change feed, like `LoadSearchIndex`, so a scan search ranks it without
+reading the `loads` table. Writes that bypass the ORM unit of work are picked up
+by the periodic full rebuild controlled by `max_age_seconds`.
+"""
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.load_snapshot import LoadSnapshot
+from app.models import Load
+from app.repositories.load_search_index import IndexedLoad, LoadChanges, subscribe_to_load_changes
+
+# Everything `score_load` and the ranking tiebreaks read, and nothing else.
+SCORING_COLUMNS = (
+    Load.id,
+    Load.equipment_code,
+    Load.origin_normalized,
+    Load.origin_latitude,
+    Load.origin_longitude,
+    Load.pickup_at_utc,
+)
+
+
+class LoadSnapshotStore:
+    def __init__(self, max_age_seconds: float = 300.0) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._lock = asyncio.Lock()
+        self.snapshot = LoadSnapshot()
+        self._loaded_at: float | None = None
+        self._rebuilding = False
+        self._changes_during_rebuild: LoadChanges = []
+
+    @property
+    def is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return (time.monotonic() - self._loaded_at) < self.max_age_seconds
+
+    def invalidate(self) -> None:
+        self.snapshot = LoadSnapshot()
+        self._loaded_at = None
+
+    async def ensure_loaded(self, session: AsyncSession) -> LoadSnapshot:
+        if not self.is_fresh:
+            async with self._lock:
+                if not self.is_fresh:
+                    await self._rebuild(session)
+        return self.snapshot
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        self._rebuilding = True
+        self._changes_during_rebuild = []
+        try:
+            rows = await session.execute(select(*SCORING_COLUMNS).where(Load.is_active.is_(True)))
+            snapshot = LoadSnapshot.from_rows(rows)
+            # Commits that landed while the rows were being read are replayed on top of them.
+            for load_pk, entry in self._changes_during_rebuild:
+                self._apply(snapshot, load_pk, entry)
+            self.snapshot = snapshot
+            self._loaded_at = time.monotonic()
+        finally:
+            self._rebuilding = False
+            self._changes_during_rebuild = []
+
+    def apply_changes(self, changes: LoadChanges) -> None:
+        """Apply committed changes; an entry of `None` removes the load from the snapshot."""
+        for load_pk, entry in changes:
+            if self._rebuilding:
+                self._changes_during_rebuild.append((load_pk, entry))
+            self._apply(self.snapshot, load_pk, entry)
+
+    @staticmethod
+    def _apply(snapshot: LoadSnapshot, load_pk: int, entry: IndexedLoad | None) -> None:
+        if entry is None:
+            snapshot.remove(load_pk)
+            return
+        snapshot.append(entry.id, entry.equipment, entry.origin, entry.latitude, entry.longitude, entry.pickup)
+
+
+load_snapshot_store = LoadSnapshotStore(max_age_seconds=get_settings().load_index_max_age_seconds)
+subscribe_to_load_changes(load_snapshot_store.apply_changes)
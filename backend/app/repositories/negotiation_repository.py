@@ -1,9 +1,9 @@
 from decimal import Decimal
 
-from sqlalchemy import Numeric, case, cast, func, select
+from sqlalchemy import Numeric, case, cast, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Negotiation
+from app.models import Load, Negotiation
 
 
 class NegotiationRepository:
@@ -20,34 +20,57 @@ class NegotiationRepository:
         counter_rate: Decimal | None,
         reasoning: str,
     ) -> Negotiation:
-        entry = Negotiation(
-            call_sid=call_sid,
-            load_id=load_id,
-            carrier_offer=carrier_offer,
-            round_number=round_number,
-            decision=decision,
-            counter_rate=counter_rate,
-            reasoning=reasoning,
+        # INSERT ... RETURNING hands back the id and server defaults, so no refresh SELECT is needed.
+        entry = await self.session.scalar(
+            insert(Negotiation)
+            .values(
+                call_sid=call_sid,
+                load_id=load_id,
+                carrier_offer=carrier_offer,
+                round_number=round_number,
+                decision=decision,
+                counter_rate=counter_rate,
+                reasoning=reasoning,
+            )
+            .returning(Negotiation)
         )
-        self.session.add(entry)
-        await self.session.flush()
         await self.session.commit()
-        await self.session.refresh(entry)
         return entry
 
-    async def latest_counter_before_round(self, load_id: str, round_number: int) -> Decimal | None:
-        query = (
-            select(Negotiation.counter_rate)
-            .where(
-                Negotiation.load_id == load_id,
-                Negotiation.round_number < round_number,
-                Negotiation.counter_rate.is_not(None),
-            )
-            .order_by(Negotiation.round_number.desc(), Negotiation.created_at.desc(), Negotiation.id.desc())
-            .limit(1)
-        )
+    async def load_with_latest_counter(
+        self, load_id: str, round_number: int, call_sid: str | None = None
+    ) -> tuple[Load | None, Decimal | None]:
+        """The load and the latest counter before `round_number`, in a single query."""
+        previous_counter = self._latest_counter_query(load_id, round_number, call_sid).scalar_subquery()
+        query = select(Load, previous_counter.label("previous_counter_rate")).where(Load.load_id == load_id)
+        row = (await self.session.execute(query)).one_or_none()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
+    async def latest_counter_before_round(
+        self, load_id: str, round_number: int, call_sid: str | None = None
+    ) -> Decimal | None:
+        query = self._latest_counter_query(load_id, round_number, call_sid)
         return (await self.session.execute(query)).scalar_one_or_none()
 
+    @staticmethod
+    def _latest_counter_query(load_id: str, round_number: int, call_sid: str | None):
+        """Latest non-null counter before `round_number`, within the `call_sid` session when one is given.
+
+        Without a `call_sid` every negotiation on the load counts, as for clients that predate sessions.
+        """
+        query = select(Negotiation.counter_rate).where(
+            Negotiation.load_id == load_id,
+            Negotiation.round_number < round_number,
+            Negotiation.counter_rate.is_not(None),
+        )
+        if call_sid is not None:
+            query = query.where(Negotiation.call_sid == call_sid)
+        return query.order_by(
+            Negotiation.round_number.desc(), Negotiation.created_at.desc(), Negotiation.id.desc()
+        ).limit(1)
+
     async def decision_breakdown(self) -> list[dict]:
         query = (
             select(
@@ -1,4 +1,4 @@
-from app.schemas.call import LogCallRequest, LogCallResponse
+from app.schemas.call import LogCallBulkError, LogCallBulkResponse, LogCallRequest, LogCallResponse
 from app.schemas.dashboard import (
     FunnelStage,
     NegotiationInsight,
@@ -6,23 +6,49 @@ from app.schemas.dashboard import (
     SentimentDistributionPoint,
     SentimentPoint,
 )
-from app.schemas.load import LoadOut, SearchLoadsRequest, SearchLoadsResponse
-from app.schemas.negotiation import EvaluateOfferRequest, EvaluateOfferResponse
-from app.schemas.verification import VerifyCarrierRequest, VerifyCarrierResponse
+from app.schemas.load import (
+    LoadOut,
+    SearchLoadsBatchRequest,
+    SearchLoadsBatchResponse,
+    SearchLoadsRequest,
+    SearchLoadsResponse,
+)
+from app.schemas.negotiation import (
+    EvaluateOfferRequest,
+    EvaluateOfferResponse,
+    NegotiationLadderRequest,
+    NegotiationLadderResponse,
+    NegotiationLadderRound,
+)
+from app.schemas.verification import (
+    VerifyCarrierRequest,
+    VerifyCarrierResponse,
+    VerifyCarriersBulkRequest,
+    VerifyCarriersBulkResponse,
+)
 
 __all__ = [
     "EvaluateOfferRequest",
     "EvaluateOfferResponse",
     "FunnelStage",
     "LoadOut",
+    "LogCallBulkError",
+    "LogCallBulkResponse",
     "LogCallRequest",
     "LogCallResponse",
     "NegotiationInsight",
+    "NegotiationLadderRequest",
+    "NegotiationLadderResponse",
+    "NegotiationLadderRound",
     "OverviewStats",
+    "SearchLoadsBatchRequest",
+    "SearchLoadsBatchResponse",
     "SearchLoadsRequest",
     "SearchLoadsResponse",
     "SentimentDistributionPoint",
     "SentimentPoint",
     "VerifyCarrierRequest",
     "VerifyCarrierResponse",
+    "VerifyCarriersBulkRequest",
+    "VerifyCarriersBulkResponse",
 ]
@@ -107,4 +107,20 @@ class LogCallRequest(BaseModel):
 
 class LogCallResponse(BaseModel):
     status: str
-    call_id: int
+    # None when the log was queued for a write-behind flush and has no id yet.
+    call_id: int | None = None
+
+
+class LogCallBulkError(BaseModel):
+    # Zero-based position of the record in the request body.
+    index: int
+    error: str
+
+
+class LogCallBulkResponse(BaseModel):
+    status: str
+    received: int
+    inserted: int
+    errors: list[LogCallBulkError]
+    # False when a malformed body stopped reading before its end.
+    complete: bool = True
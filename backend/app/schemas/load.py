@@ -8,6 +8,8 @@ class SearchLoadsRequest(BaseModel):
     equipment_type: str = Field(min_length=1, max_length=50)
     origin_location: str = Field(min_length=1, max_length=255)
     availability_time: datetime
+    origin_radius_miles: float | None = Field(default=None, gt=0, le=500)
+    pickup_window_hours: float | None = Field(default=None, gt=0, le=336)
 
 
 class LoadOut(BaseModel):
@@ -32,3 +34,12 @@ class LoadOut(BaseModel):
 
 class SearchLoadsResponse(BaseModel):
     loads: list[LoadOut]
+    pruned_by_pickup_window: int | None = None
+
+
+class SearchLoadsBatchRequest(BaseModel):
+    queries: list[SearchLoadsRequest] = Field(min_length=1, max_length=20)
+
+
+class SearchLoadsBatchResponse(BaseModel):
+    results: list[SearchLoadsResponse]
@@ -4,10 +4,14 @@ from typing import Literal
 from pydantic import BaseModel, Field, field_serializer
 
 
+MAX_CARRIER_OFFER = Decimal("1000000")
+
+
 class EvaluateOfferRequest(BaseModel):
     load_id: str = Field(min_length=1, max_length=64)
-    carrier_offer: Decimal = Field(gt=0)
+    carrier_offer: Decimal = Field(gt=0, le=MAX_CARRIER_OFFER)
     round_number: int = Field(ge=1, le=10)
+    call_sid: str | None = Field(default=None, min_length=1, max_length=128)
 
 
 class EvaluateOfferResponse(BaseModel):
@@ -18,3 +22,29 @@ class EvaluateOfferResponse(BaseModel):
     @field_serializer("counter_rate")
     def serialize_counter_rate(self, value: Decimal | None) -> float | None:
         return float(value) if value is not None else None
+
+
+class NegotiationLadderRequest(BaseModel):
+    load_id: str = Field(min_length=1, max_length=64)
+
+
+class NegotiationLadderRound(BaseModel):
+    round_number: int
+    reject_at_or_above: Decimal
+    reject_above: Decimal | None = None
+
+    @field_serializer("reject_at_or_above", "reject_above")
+    def serialize_rate(self, value: Decimal | None) -> float | None:
+        return float(value) if value is not None else None
+
+
+class NegotiationLadderResponse(BaseModel):
+    load_id: str
+    loadboard_rate: Decimal
+    accept_at_or_below: Decimal
+    counter_cap: Decimal
+    rounds: list[NegotiationLadderRound]
+
+    @field_serializer("loadboard_rate", "accept_at_or_below", "counter_cap")
+    def serialize_rate(self, value: Decimal) -> float:
+        return float(value)
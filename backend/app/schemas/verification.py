@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -12,3 +12,13 @@ class VerifyCarrierResponse(BaseModel):
     verification: Literal["verified", "not_authorized", "invalid_mc", "verification_unavailable"]
     legal_name: str | None = None
     mc_number: str
+    cached: bool = False
+    cache_age_seconds: float | None = None
+
+
+class VerifyCarriersBulkRequest(BaseModel):
+    mc_numbers: list[Annotated[str, Field(min_length=1, max_length=32)]] = Field(min_length=1, max_length=100)
+
+
+class VerifyCarriersBulkResponse(BaseModel):
+    results: list[VerifyCarrierResponse]
@@ -0,0 +1,77 @@
+"""Bulk ingestion of call logs for `POST /log-call/bulk`.
+
+Records are validated one at a time as the body streams in and written in
+transactions of `CALL_LOG_BULK_BATCH_ROWS` rows, so memory stays bounded by one
+batch. When a batch's INSERT fails, its rows are retried one by one so only the
+offending records are reported.
+"""
+from collections.abc import AsyncIterable
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.json_stream import RecordError
+from app.repositories.call_repository import CallRepository
+from app.schemas.call import LogCallBulkError, LogCallBulkResponse, LogCallRequest
+
+
+def call_log_payload(request: LogCallRequest) -> dict:
+    payload = request.model_dump()
+    payload["analytics_payload"] = request.model_dump(mode="json")
+    return payload
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def ingest_call_logs(
+    records: AsyncIterable, repository: CallRepository, batch_rows: int
+) -> LogCallBulkResponse:
+    received = 0
+    inserted = 0
+    complete = True
+    errors: list[LogCallBulkError] = []
+    batch: list[tuple[int, dict]] = []
+
+    async def flush() -> None:
+        nonlocal inserted
+        try:
+            inserted += await repository.create_calls([payload for _, payload in batch])
+        except SQLAlchemyError:
+            await repository.session.rollback()
+            for index, payload in batch:
+                try:
+                    inserted += await repository.create_calls([payload])
+                except SQLAlchemyError as exc:
+                    await repository.session.rollback()
+                    cause = getattr(exc, "orig", None) or exc
+                    errors.append(LogCallBulkError(index=index, error=f"Database error: {type(cause).__name__}"))
+        batch.clear()
+
+    async for record in records:
+        index = received
+        received += 1
+        if isinstance(record, RecordError):
+            errors.append(LogCallBulkError(index=index, error=record.message))
+            if record.fatal:
+                complete = False
+                break
+            continue
+        try:
+            request = LogCallRequest.model_validate(record)
+        except ValidationError as exc:
+            errors.append(LogCallBulkError(index=index, error=_validation_message(exc)))
+            continue
+        batch.append((index, call_log_payload(request)))
+        if len(batch) >= batch_rows:
+            await flush()
+    if batch:
+        await flush()
+
+    errors.sort(key=lambda error: error.index)
+    return LogCallBulkResponse(
+        status="logged", received=received, inserted=inserted, errors=errors, complete=complete
+    )
@@ -0,0 +1,186 @@
+"""Write-behind ingestion for `/log-call`.
+
+With `CALL_LOG_WRITE_MODE=write_behind`, validated call logs go onto a bounded
+in-process queue and the route answers `queued` at once. A flusher task
+commits them as multi-row INSERTs whenever `CALL_LOG_BATCH_MAX_ROWS` rows are
+waiting or the oldest has waited `CALL_LOG_FLUSH_INTERVAL_MS`. The app drains
+the queue at shutdown.
+
+Durability tradeoff: a queued log is acknowledged before it is committed, so a
+crash or kill -9 loses up to one batch window of logs. A failed flush is
+retried once, then written row by row so that only rows that still fail are
+dropped (counted in `failed_rows`) while the flusher carries on. When the queue
+is full, or the writer is not running, the route falls back to the synchronous
+insert, which commits before answering.
+"""
+import asyncio
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+from app.db.session import SessionLocal
+from app.repositories.call_repository import CallRepository
+
+
+class CallLogWriter:
+    def __init__(
+        self, max_batch_rows: int = 100, flush_interval_ms: float = 250.0, max_queue_size: int = 10000
+    ) -> None:
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval_ms = flush_interval_ms
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue[dict] | None = None
+        self._flusher: asyncio.Task | None = None
+        self.queued = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_rows = 0
+        self.retried_flushes = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting logs and flush everything already queued."""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._flusher
+        self._flusher = None
+        while self._queue is not None and not self._queue.empty():
+            await self._flush(self._take(self.max_batch_rows))
+        self._queue = None
+
+    def submit(self, payload: dict) -> bool:
+        """Queue one call log; False when the writer is not running or the queue is full."""
+        if not self.running:
+            return False
+        # Stamp the receipt time, not the flush time.
+        received_at = datetime.now(timezone.utc)
+        try:
+            self._queue.put_nowait(
+                {**CallRepository.row_values(payload), "server_timestamp": received_at, "created_at": received_at}
+            )
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.queued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def wait_flushed(self) -> None:
+        """Wait until every queued log has been flushed (or dropped)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _run(self) -> None:
+        batch: list[dict] = []
+        flush: asyncio.Future | None = None
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval_ms / 1000
+                while len(batch) < self.max_batch_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        async with asyncio.timeout(remaining):
+                            batch.append(await self._queue.get())
+                    except TimeoutError:
+                        break
+                flush = asyncio.ensure_future(self._flush(batch))
+                batch = []
+                # Shielded so that stop() cannot interrupt a batch halfway through its commit.
+                await asyncio.shield(flush)
+        finally:
+            # On stop(): let the in-flight batch finish and write the one still being collected.
+            if flush is not None:
+                await flush
+            if batch:
+                await self._flush(batch)
+
+    def _take(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: list[dict]) -> None:
+        started = time.perf_counter()
+        try:
+            try:
+                await self._insert(batch)
+            except Exception:
+                # Most failures (a dropped connection, a deadlock) clear up on a second attempt.
+                self.retried_flushes += 1
+                try:
+                    await self._insert(batch)
+                except Exception:
+                    # Still failing: write row by row, as bulk ingestion does, so one bad row
+                    # cannot take the rest of its batch down with it.
+                    await self._insert_rows(batch)
+                    return
+            self.flushed_rows += len(batch)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _insert(self, rows: list[dict]) -> None:
+        async with SessionLocal() as session:
+            await CallRepository(session).create_calls(rows)
+
+    async def _insert_rows(self, rows: list[dict]) -> None:
+        for row in rows:
+            try:
+                await self._insert([row])
+            except Exception:
+                # Whatever the failure (database, network, a bad row), drop the row but keep the flusher alive.
+                self.failed_rows += 1
+            else:
+                self.flushed_rows += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "retried_flushes": self.retried_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+_settings = get_settings()
+call_log_writer = CallLogWriter(
+    max_batch_rows=_settings.call_log_batch_max_rows,
+    flush_interval_ms=_settings.call_log_flush_interval_ms,
+    max_queue_size=_settings.call_log_queue_max_size,
+)
+register_metrics("call_log_writer", call_log_writer.stats)
@@ -0,0 +1,68 @@
+"""Compact existing `calls.analytics_payload` rows, or expand them back to full payloads.
+
+`CALL_LOG_PAYLOAD_MODE` only decides how new calls are written. Rows already in
+the table are rewritten by hand, in batches that each commit on their own, so
+the command can be stopped and re-run:
+
+    python -m app.services.call_payloads compact
+    python -m app.services.call_payloads expand
+
+Run `expand` before downgrading below migration `20261018_0008` if rows were compacted.
+"""
+import argparse
+import asyncio
+from typing import Literal
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.call_payload import compact_payload
+from app.db.session import SessionLocal
+from app.models import Call
+
+REWRITE_BATCH_SIZE = 1000
+
+
+async def rewrite_call_payloads(
+    session: AsyncSession, mode: Literal["compact", "expand"], batch_size: int = REWRITE_BATCH_SIZE
+) -> dict:
+    """Rewrite every call's payload in compact or full form; rows already in that form are skipped."""
+    calls = 0
+    rewritten = 0
+    last_id = 0
+    while True:
+        rows = (await session.scalars(select(Call).where(Call.id > last_id).order_by(Call.id).limit(batch_size))).all()
+        if not rows:
+            break
+        changes = []
+        for call in rows:
+            payload = call.full_analytics_payload()
+            if mode == "compact":
+                payload = compact_payload(payload, {key: getattr(call, key) for key in call.__table__.columns.keys()})
+            if payload != call.analytics_payload:
+                changes.append({"id": call.id, "analytics_payload": payload})
+        calls += len(rows)
+        last_id = rows[-1].id
+        if changes:
+            # One executemany UPDATE by primary key per batch.
+            await session.execute(update(Call), changes)
+            rewritten += len(changes)
+        await session.commit()
+    return {"calls": calls, "rewritten": rewritten}
+
+
+async def _run_cli(mode: Literal["compact", "expand"]) -> None:
+    async with SessionLocal() as session:
+        summary = await rewrite_call_payloads(session, mode)
+    print(f"payload {mode} complete: " + " ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact or expand stored call analytics payloads")
+    parser.add_argument("mode", choices=["compact", "expand"])
+    args = parser.parse_args()
+    asyncio.run(_run_cli(args.mode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Recompute the dashboard rollups from the raw `calls` table.
+
+Every call written through `CallRepository` updates the rollups in its own
+transaction, so a rebuild is only needed after calls are inserted, edited or
+deleted some other way (manual SQL, restores), or to verify the rollups:
+
+    python -m app.services.call_rollups
+"""
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.call_rollups import CALL_COLUMNS, RollupAccumulator
+from app.db.session import SessionLocal
+from app.models import Call
+from app.repositories.call_rollup_repository import CallRollupRepository
+
+REBUILD_BATCH_SIZE = 1000
+
+
+async def rebuild_call_rollups(session: AsyncSession, batch_size: int = REBUILD_BATCH_SIZE) -> dict:
+    """Replace both rollup tables with aggregates of every call, in one transaction."""
+    if session.get_bind().dialect.name == "postgresql":
+        # Holds off concurrent call inserts, whose increments would otherwise be lost or counted twice.
+        await session.execute(text("LOCK TABLE calls IN SHARE MODE"))
+    accumulator = RollupAccumulator()
+    calls = 0
+    last_id = 0
+    columns = [getattr(Call, column) for column in CALL_COLUMNS]
+    while True:
+        rows = (
+            await session.execute(
+                select(Call.id, *columns).where(Call.id > last_id).order_by(Call.id).limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            accumulator.add(row)
+        calls += len(rows)
+        last_id = rows[-1].id
+
+    await CallRollupRepository(session).replace_all(accumulator)
+    await session.commit()
+    return {"calls": calls, "daily_rows": len(accumulator.daily), "lane_rows": len(accumulator.lanes)}
+
+
+async def _run_cli() -> None:
+    async with SessionLocal() as session:
+        summary = await rebuild_call_rollups(session)
+    print("rollup rebuild complete: " + " ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+def main() -> None:
+    asyncio.run(_run_cli())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Keep the carriers that call most often warm in the verification cache.
+
+The pre-warmer ranks `calls.mc_number` by frequency over a lookback window and
+re-verifies every hot carrier whose cache entry is missing or would expire
+before the next run, so live calls for repeat carriers stay cache hits. The
+app runs it periodically from its lifespan; it also runs once from the CLI:
+
+    python -m app.services.carrier_prewarm --top 200
+    python -m app.services.carrier_prewarm --mc 123456 MC-654321 --file mc_numbers.txt
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+from app.db.session import SessionLocal
+from app.repositories.call_repository import CallRepository
+from app.repositories.carrier_verification_repository import CarrierVerificationRepository
+from app.services.carrier_service import cached_verification, verify_carriers
+from app.services.carrier_verification_cache import CarrierVerificationCache, carrier_verification_cache
+from app.services.fmcsa_client import (
+    FMCSAClient,
+    FMCSAServiceError,
+    build_fmcsa_client,
+    build_fmcsa_http_client,
+    normalize_mc_number,
+)
+
+
+class CarrierPrewarmer:
+    def __init__(
+        self,
+        top_n: int,
+        lookback_days: int,
+        max_concurrency: int,
+        cache: CarrierVerificationCache | None = None,
+    ) -> None:
+        self.top_n = top_n
+        self.lookback_days = lookback_days
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else carrier_verification_cache
+        self.runs = 0
+        self.failed_runs = 0
+        self.refreshed = 0
+        self.failures = 0
+        self.last_run_at: datetime | None = None
+
+    async def hot_mc_numbers(self, now: datetime) -> list[str]:
+        since = now - timedelta(days=self.lookback_days) if self.lookback_days > 0 else None
+        # Calls store the MC as spoken ("MC-123456"), so one carrier may have several spellings;
+        # over-fetch, then merge their counts before taking the top N.
+        async with SessionLocal() as session:
+            raw_counts = await CallRepository(session).top_mc_numbers(self.top_n * 2, since)
+        counts: dict[str, int] = {}
+        for mc_number, call_count in raw_counts:
+            normalized_mc = normalize_mc_number(mc_number)
+            counts[normalized_mc] = counts.get(normalized_mc, 0) + call_count
+        return sorted(counts, key=lambda mc_number: (-counts[mc_number], mc_number))[: self.top_n]
+
+    async def load_stored(self, mc_numbers: list[str], refresh_before: datetime) -> int:
+        """Copy database entries that outlive `refresh_before` into the in-process tier.
+
+        After a restart, or in another worker, the LRU is cold while `carrier_verifications`
+        still holds fresh results; those carriers are not due for an FMCSA call.
+        """
+        cold = [mc_number for mc_number in mc_numbers if self._expires_before(mc_number, refresh_before)]
+        async with SessionLocal() as session:
+            stored = await CarrierVerificationRepository(session).list_expiring_after(cold, refresh_before)
+        for row in stored:
+            self.cache.put(cached_verification(row))
+        return len(stored)
+
+    def _expires_before(self, mc_number: str, refresh_before: datetime) -> bool:
+        entry = self.cache.peek(mc_number)
+        return entry is None or entry.expires_at <= refresh_before
+
+    def due_for_refresh(self, mc_numbers: list[str], refresh_before: datetime) -> list[str]:
+        return [mc_number for mc_number in mc_numbers if self._expires_before(mc_number, refresh_before)]
+
+    async def run_once(self, fmcsa_client: FMCSAClient, refresh_ahead_seconds: float = 0.0) -> dict:
+        """Re-verify hot carriers whose entry is missing or expires within `refresh_ahead_seconds`."""
+        now = datetime.now(timezone.utc)
+        refresh_before = now + timedelta(seconds=refresh_ahead_seconds)
+        hot = await self.hot_mc_numbers(now)
+        await self.load_stored(hot, refresh_before)
+        due = self.due_for_refresh(hot, refresh_before)
+        results = await verify_carriers(due, fmcsa_client, self.max_concurrency, force_refresh=True)
+        failures = sum(isinstance(result, FMCSAServiceError) for result in results)
+
+        self.runs += 1
+        self.refreshed += len(results) - failures
+        self.failures += failures
+        self.last_run_at = now
+        return {"hot": len(hot), "due": len(due), "refreshed": len(results) - failures, "failures": failures}
+
+    async def run_periodically(self, fmcsa_client: FMCSAClient, interval_seconds: float) -> None:
+        while True:
+            try:
+                # Refresh anything that would otherwise expire before the next run.
+                await self.run_once(fmcsa_client, refresh_ahead_seconds=interval_seconds)
+            except Exception:
+                # Keep the background task alive; a failed run is retried on the next interval.
+                self.failed_runs += 1
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "refreshed": self.refreshed,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+_settings = get_settings()
+carrier_prewarmer = CarrierPrewarmer(
+    top_n=_settings.carrier_prewarm_top_n,
+    lookback_days=_settings.carrier_prewarm_lookback_days,
+    max_concurrency=_settings.carrier_bulk_verify_max_concurrency,
+)
+register_metrics("carrier_prewarm", carrier_prewarmer.stats)
+
+
+async def _run_cli(mc_numbers: list[str], top_n: int | None, max_concurrency: int) -> None:
+    settings = get_settings()
+    http_client = build_fmcsa_http_client(settings)
+    fmcsa_client = build_fmcsa_client(settings, http_client)
+    try:
+        if mc_numbers:
+            results = await verify_carriers(mc_numbers, fmcsa_client, max_concurrency)
+            for mc_number, result in zip(mc_numbers, results):
+                if isinstance(result, FMCSAServiceError):
+                    print(f"{mc_number}: verification_unavailable ({result})")
+                else:
+                    print(f"{mc_number}: {result.verification} {result.legal_name or ''}".rstrip())
+        if top_n is not None:
+            prewarmer = CarrierPrewarmer(top_n, settings.carrier_prewarm_lookback_days, max_concurrency)
+            summary = await prewarmer.run_once(fmcsa_client)
+            print("prewarm complete: " + " ".join(f"{key}={value}" for key, value in summary.items()))
+    finally:
+        await http_client.aclose()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Verify carriers in bulk and pre-warm the verification cache")
+    parser.add_argument("--mc", nargs="+", default=[], help="MC numbers to verify")
+    parser.add_argument("--file", help="file with one MC number per line")
+    parser.add_argument("--top", type=int, help="re-verify the N most frequent MC numbers from call history")
+    parser.add_argument("--concurrency", type=int, default=settings.carrier_bulk_verify_max_concurrency)
+    args = parser.parse_args()
+
+    mc_numbers = list(args.mc)
+    if args.file:
+        with open(args.file, encoding="utf-8") as handle:
+            mc_numbers.extend(line.strip() for line in handle if line.strip())
+    if not mc_numbers and args.top is None:
+        parser.error("pass --mc, --file or --top")
+    asyncio.run(_run_cli(mc_numbers, args.top, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,183 @@
-from app.services.fmcsa_client import FMCSAClient, FMCSAResult
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+from app.db.session import SessionLocal
+from app.models import CarrierVerification
+from app.repositories.carrier_verification_repository import CarrierVerificationRepository
+from app.services.carrier_verification_cache import (
+    CachedVerification,
+    CarrierVerificationCache,
+    carrier_verification_cache,
+)
+from app.services.fmcsa_client import FMCSAClient, FMCSAResult, FMCSAServiceError, normalize_mc_number
 
 
 class CarrierService:
-    def __init__(self, fmcsa_client: FMCSAClient) -> None:
+    def __init__(
+        self,
+        fmcsa_client: FMCSAClient,
+        verification_repo: CarrierVerificationRepository | None = None,
+        cache: CarrierVerificationCache | None = None,
+        refresher: "VerificationRefresher | None" = None,
+    ) -> None:
         self.fmcsa_client = fmcsa_client
+        self.verification_repo = verification_repo
+        if cache is None and get_settings().carrier_verification_cache_enabled:
+            cache = carrier_verification_cache
+        self.cache = cache
+        self.refresher = refresher or verification_refresher
+
+    async def verify(self, mc_number: str, force_refresh: bool = False) -> FMCSAResult:
+        """Answer from the cache when possible, serving stale entries while they refresh in the background.
+
+        `force_refresh` skips both cache tiers and stores the live result, as the pre-warm job does.
+        """
+        if self.cache is None:
+            return await self.fmcsa_client.verify_carrier(mc_number)
+
+        normalized_mc = normalize_mc_number(mc_number)
+        now = datetime.now(timezone.utc)
+        if force_refresh:
+            return await self._verify_live(mc_number, now)
+        entry = self.cache.get(normalized_mc, now)
+        if entry is None and self.verification_repo is not None:
+            entry = await self._load_stored(normalized_mc, now)
+        if entry is not None:
+            if not entry.is_fresh(now):
+                self.refresher.schedule(normalized_mc, self.fmcsa_client, self.cache)
+            return entry.served_at(now)
+
+        return await self._verify_live(mc_number, now)
+
+    async def _verify_live(self, mc_number: str, now: datetime) -> FMCSAResult:
+        # FMCSAServiceError propagates uncached, so a transient outage is retried on the next call.
+        result = await self.fmcsa_client.verify_carrier(mc_number)
+        await store_verification(result, self.cache, self.verification_repo, now)
+        return result
+
+    async def _load_stored(self, normalized_mc: str, now: datetime) -> CachedVerification | None:
+        stored = await self.verification_repo.get_expiring_after(
+            normalized_mc, now - timedelta(seconds=self.cache.max_stale_seconds)
+        )
+        if stored is None:
+            return None
+        entry = cached_verification(stored)
+        self.cache.put(entry)
+        return entry
+
+
+async def store_verification(
+    result: FMCSAResult,
+    cache: CarrierVerificationCache,
+    verification_repo: CarrierVerificationRepository | None,
+    verified_at: datetime,
+) -> None:
+    """Write a live FMCSA result to both cache tiers, if its status is cacheable."""
+    ttl_seconds = cache.ttl_for(result.verification)
+    if ttl_seconds <= 0:
+        return
+    expires_at = verified_at + timedelta(seconds=ttl_seconds)
+    cache.put(CachedVerification(result=result, verified_at=verified_at, expires_at=expires_at))
+    if verification_repo is not None:
+        await verification_repo.upsert(
+            mc_number=result.mc_number,
+            eligible=result.eligible,
+            verification=result.verification,
+            legal_name=result.legal_name,
+            verified_at=verified_at,
+            expires_at=expires_at,
+        )
+
+
+async def verify_carriers(
+    mc_numbers: Sequence[str],
+    fmcsa_client: FMCSAClient,
+    max_concurrency: int,
+    force_refresh: bool = False,
+) -> list[FMCSAResult | FMCSAServiceError]:
+    """Verify many MC numbers, at most `max_concurrency` at a time, in input order.
+
+    Each verification gets its own session, since one `AsyncSession` cannot be
+    shared by concurrent tasks. Failures are returned in place rather than
+    raised, so one unavailable lookup does not sink the batch. Upstream calls
+    are still bounded by the FMCSA concurrency limiter and circuit breaker.
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def verify_one(mc_number: str) -> FMCSAResult | FMCSAServiceError:
+        async with semaphore:
+            try:
+                async with SessionLocal() as session:
+                    service = CarrierService(fmcsa_client, CarrierVerificationRepository(session))
+                    return await service.verify(mc_number, force_refresh=force_refresh)
+            except FMCSAServiceError as exc:
+                return exc
+
+    return list(await asyncio.gather(*(verify_one(mc_number) for mc_number in mc_numbers)))
+
+
+class VerificationRefresher:
+    """Background refreshes of stale cache entries, at most one per MC number at a time."""
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.refreshes = 0
+        self.failures = 0
+
+    def schedule(self, mc_number: str, fmcsa_client: FMCSAClient, cache: CarrierVerificationCache) -> None:
+        if mc_number in self._tasks:
+            return
+        task = asyncio.ensure_future(self._refresh(mc_number, fmcsa_client, cache))
+        self._tasks[mc_number] = task
+        task.add_done_callback(lambda _: self._tasks.pop(mc_number, None))
+
+    async def _refresh(self, mc_number: str, fmcsa_client: FMCSAClient, cache: CarrierVerificationCache) -> None:
+        try:
+            # Not bound by a live call, so the refresh may use the whole transport timeout.
+            result = await fmcsa_client.verify_carrier(mc_number, deadline_seconds=fmcsa_client.timeout_seconds)
+            # The request's session is gone by now, so the refresh writes through its own.
+            async with SessionLocal() as session:
+                await store_verification(
+                    result, cache, CarrierVerificationRepository(session), datetime.now(timezone.utc)
+                )
+            self.refreshes += 1
+        except (FMCSAServiceError, SQLAlchemyError):
+            # The stale entry keeps being served until the hard staleness limit.
+            self.failures += 1
+
+    async def wait_idle(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._tasks), "refreshes": self.refreshes, "failures": self.failures}
+
+
+def cached_verification(stored: CarrierVerification) -> CachedVerification:
+    """The in-process cache entry for a `carrier_verifications` row."""
+    return CachedVerification(
+        result=FMCSAResult(
+            eligible=stored.eligible,
+            verification=stored.verification,
+            legal_name=stored.legal_name,
+            mc_number=stored.mc_number,
+        ),
+        verified_at=_as_utc(stored.verified_at),
+        expires_at=_as_utc(stored.expires_at),
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive; values are always written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
 
-    async def verify(self, mc_number: str) -> FMCSAResult:
-        return await self.fmcsa_client.verify_carrier(mc_number)
+verification_refresher = VerificationRefresher()
+register_metrics("carrier_verification_refresh", verification_refresher.stats)
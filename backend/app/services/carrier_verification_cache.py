@@ -0,0 +1,119 @@
+"""In-process LRU tier of the carrier verification cache.
+
+Entries are FMCSA results keyed by normalized MC number. Each is fresh until
+the TTL for its `verification` status runs out, then may still be served
+stale, while a background refresh runs, for up to `max_stale_seconds` more
+(never more than `MAX_STALE_SECONDS`).
+The database tier (`carrier_verifications`) is read on a miss here and
+survives restarts; `CarrierService` keeps both tiers in step. Lookup errors
+are never cached.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+from app.services.fmcsa_client import FMCSAResult
+
+# Hard cap on serving an expired entry: a stale "verified" answer keeps a carrier eligible
+# even if its authority was revoked since, so staleness is bounded whatever the settings say.
+MAX_STALE_SECONDS = 3600.0
+
+
+@dataclass(frozen=True)
+class CachedVerification:
+    result: FMCSAResult
+    verified_at: datetime
+    expires_at: datetime
+
+    def is_fresh(self, now: datetime) -> bool:
+        return now < self.expires_at
+
+    def served_at(self, now: datetime) -> FMCSAResult:
+        """The cached result, flagged as cached and stamped with its age."""
+        return replace(self.result, cached=True, cache_age_seconds=max((now - self.verified_at).total_seconds(), 0.0))
+
+
+class CarrierVerificationCache:
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds_by_status: dict[str, float] | None = None,
+        max_stale_seconds: float = 0.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds_by_status = dict(ttl_seconds_by_status or {})
+        self.max_stale_seconds = min(max_stale_seconds, MAX_STALE_SECONDS)
+        self._entries: OrderedDict[str, CachedVerification] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, verification: str) -> float:
+        """Seconds a result with this status stays fresh; 0 means do not cache it."""
+        return self.ttl_seconds_by_status.get(verification, 0.0)
+
+    def is_servable(self, entry: CachedVerification, now: datetime) -> bool:
+        return now < entry.expires_at + timedelta(seconds=self.max_stale_seconds)
+
+    def get(self, mc_number: str, now: datetime) -> CachedVerification | None:
+        """Return the entry while it is fresh or within the staleness limit."""
+        entry = self._entries.get(mc_number)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not self.is_servable(entry, now):
+            del self._entries[mc_number]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(mc_number)
+        if entry.is_fresh(now):
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    def peek(self, mc_number: str) -> CachedVerification | None:
+        """The entry, if any, without touching recency or the hit counters."""
+        return self._entries.get(mc_number)
+
+    def put(self, entry: CachedVerification) -> None:
+        mc_number = entry.result.mc_number
+        self._entries[mc_number] = entry
+        self._entries.move_to_end(mc_number)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_settings = get_settings()
+carrier_verification_cache = CarrierVerificationCache(
+    max_entries=_settings.carrier_verification_cache_max_entries,
+    ttl_seconds_by_status={
+        "verified": _settings.carrier_verification_ttl_verified_seconds,
+        "not_authorized": _settings.carrier_verification_ttl_not_authorized_seconds,
+        "invalid_mc": _settings.carrier_verification_ttl_invalid_mc_seconds,
+    },
+    max_stale_seconds=(
+        _settings.carrier_verification_max_stale_seconds
+        if _settings.carrier_verification_stale_while_revalidate
+        else 0.0
+    ),
+)
+register_metrics("carrier_verification_cache", carrier_verification_cache.stats)
@@ -2,40 +2,122 @@ from dataclasses import dataclass
 
 import httpx
 
+from app.core.config import Settings, get_settings
+from app.core.metrics import register_metrics
+from app.core.resilience import CircuitBreaker, ConcurrencyLimiter
+from app.core.single_flight import SingleFlight
+
 
 class FMCSAServiceError(RuntimeError):
     pass
 
 
+class FMCSACircuitOpenError(FMCSAServiceError):
+    pass
+
+
 @dataclass
 class FMCSAResult:
     eligible: bool
     verification: str
     legal_name: str | None
     mc_number: str
+    cached: bool = False
+    cache_age_seconds: float | None = None
+
+
+def build_fmcsa_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Create the long-lived, pooled client shared by every FMCSA verification.
+
+    The app creates one in its lifespan and closes it at shutdown, so repeated
+    verifications reuse warm keep-alive connections instead of paying DNS, TCP
+    and TLS setup per call. HTTP/2 needs the optional `http2` extra.
+    """
+    return httpx.AsyncClient(
+        timeout=settings.fmcsa_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.fmcsa_max_connections,
+            max_keepalive_connections=settings.fmcsa_max_keepalive_connections,
+            keepalive_expiry=settings.fmcsa_keepalive_expiry_seconds,
+        ),
+        http2=settings.fmcsa_http2,
+    )
 
 
 class FMCSAClient:
     BASE_URL = "https://mobile.fmcsa.dot.gov/qc/services"
 
-    def __init__(self, api_key: str, timeout_seconds: float = 8.0) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        timeout_seconds: float = 8.0,
+        http_client: httpx.AsyncClient | None = None,
+        base_url: str | None = None,
+        breaker: CircuitBreaker | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+        deadline_seconds: float | None = None,
+    ) -> None:
         self.api_key = api_key
         self.timeout_seconds = timeout_seconds
-
-    async def verify_carrier(self, mc_number: str) -> FMCSAResult:
+        self.http_client = http_client
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.breaker = breaker or fmcsa_breaker
+        self.limiter = limiter or fmcsa_limiter
+        self.deadline_seconds = deadline_seconds
+
+    async def verify_carrier(self, mc_number: str, deadline_seconds: float | None = None) -> FMCSAResult:
+        """Verify `mc_number`, giving up after the caller's deadline.
+
+        `deadline_seconds` defaults to the client's; it should be shorter than the
+        transport timeout so a degraded FMCSA fails the call early.
+        """
         if not self.api_key:
             raise FMCSAServiceError("FMCSA_API_KEY is not configured")
+        if deadline_seconds is None:
+            deadline_seconds = self.deadline_seconds
 
         normalized_mc = self._normalize_mc_number(mc_number)
-        endpoint = f"{self.BASE_URL}/carriers/docket-number/{normalized_mc}"
-        async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-            try:
-                response = await client.get(endpoint, params={"webKey": self.api_key})
-                response.raise_for_status()
-                payload = response.json()
-                return self._parse_payload(payload, normalized_mc)
-            except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
-                raise FMCSAServiceError(f"Unable to verify carrier from FMCSA: {exc}") from exc
+        # Concurrent verifications of one carrier share a single upstream lookup and its outcome;
+        # a caller hitting its deadline stops waiting without cancelling the lookup for the others.
+        try:
+            return await fmcsa_lookups.run(
+                normalized_mc, lambda: self._fetch_carrier(normalized_mc), timeout=deadline_seconds
+            )
+        except TimeoutError as exc:
+            raise FMCSAServiceError(f"FMCSA lookup exceeded the {deadline_seconds}s deadline") from exc
+
+    async def _fetch_carrier(self, normalized_mc: str) -> FMCSAResult:
+        if not self.breaker.allow_request():
+            raise FMCSACircuitOpenError("FMCSA circuit breaker is open")
+        endpoint = f"{self.base_url}/carriers/docket-number/{normalized_mc}"
+        try:
+            async with self.limiter.slot():
+                # The breaker may have opened while this call queued for a slot.
+                if not self.breaker.still_allows_request():
+                    raise FMCSACircuitOpenError("FMCSA circuit breaker is open")
+                if self.http_client is not None:
+                    result = await self._request(self.http_client, endpoint, normalized_mc)
+                else:
+                    async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
+                        result = await self._request(client, endpoint, normalized_mc)
+        except FMCSACircuitOpenError:
+            raise
+        except BaseException:
+            # Any failure, including an unexpected error or a cancelled probe, must release a half-open
+            # probe slot; otherwise the breaker would never let another request through.
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _request(self, client: httpx.AsyncClient, endpoint: str, mc_number: str) -> FMCSAResult:
+        try:
+            response = await client.get(endpoint, params={"webKey": self.api_key})
+            response.raise_for_status()
+            payload = response.json()
+            return self._parse_payload(payload, mc_number)
+        except (httpx.HTTPError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise FMCSAServiceError(f"Unable to verify carrier from FMCSA: {exc}") from exc
 
     def _parse_payload(self, payload: dict, mc_number: str) -> FMCSAResult:
         content = payload.get("content")
@@ -74,5 +156,31 @@ class FMCSAClient:
         )
 
     def _normalize_mc_number(self, mc_number: str) -> str:
-        normalized = "".join(ch for ch in mc_number if ch.isdigit())
-        return normalized or mc_number.strip()
+        return normalize_mc_number(mc_number)
+
+
+def build_fmcsa_client(settings: Settings, http_client: httpx.AsyncClient | None = None) -> FMCSAClient:
+    return FMCSAClient(
+        api_key=settings.fmcsa_api_key,
+        timeout_seconds=settings.fmcsa_timeout_seconds,
+        http_client=http_client,
+        base_url=settings.fmcsa_base_url,
+        deadline_seconds=settings.fmcsa_request_deadline_seconds,
+    )
+
+
+def normalize_mc_number(mc_number: str) -> str:
+    normalized = "".join(ch for ch in mc_number if ch.isdigit())
+    return normalized or mc_number.strip()
+
+
+_settings = get_settings()
+fmcsa_lookups = SingleFlight()
+fmcsa_breaker = CircuitBreaker(
+    failure_threshold=_settings.fmcsa_breaker_failure_threshold,
+    reset_timeout_seconds=_settings.fmcsa_breaker_reset_seconds,
+)
+fmcsa_limiter = ConcurrencyLimiter(_settings.fmcsa_max_concurrency)
+register_metrics("fmcsa_lookups", fmcsa_lookups.stats)
+register_metrics("fmcsa_circuit_breaker", fmcsa_breaker.stats)
+register_metrics("fmcsa_concurrency", fmcsa_limiter.stats)
@@ -0,0 +1,81 @@
+"""Bounded LRU/TTL cache of `/search-loads` results.
+
+Keys are the normalized query with `availability_time` floored to a time bucket,
+so carriers asking about the same lane within a few minutes share one result.
+Rankings inside a bucket reflect the availability time of the request that
+filled the entry. Any committed load insert, update or deactivation clears the
+cache.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from datetime import datetime
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+from app.repositories.load_search_index import LoadChanges, subscribe_to_load_changes
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class LoadSearchCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0, bucket_seconds: int = 300) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bucket_seconds = bucket_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def time_bucket(self, availability_time_utc: datetime) -> int:
+        return int((availability_time_utc - EPOCH).total_seconds()) // self.bucket_seconds
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, _changes: LoadChanges | None = None) -> None:
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_settings = get_settings()
+load_search_cache = LoadSearchCache(
+    max_entries=_settings.load_search_cache_max_entries,
+    ttl_seconds=_settings.load_search_cache_ttl_seconds,
+    bucket_seconds=_settings.load_search_cache_bucket_seconds,
+)
+subscribe_to_load_changes(load_search_cache.invalidate)
+register_metrics("load_search_cache", load_search_cache.stats)
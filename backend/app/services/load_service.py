@@ -1,28 +1,105 @@
+from collections.abc import Sequence
+
+from app.core.config import get_settings
+from app.core.load_ranking import LoadQuery, LoadSearchStats
 from app.repositories.load_repository import LoadRepository
-from app.schemas.load import LoadOut
+from app.schemas.load import LoadOut, SearchLoadsRequest
+from app.services.load_search_cache import LoadSearchCache, load_search_cache
 
 
 class LoadService:
-    def __init__(self, repo: LoadRepository) -> None:
+    def __init__(self, repo: LoadRepository, cache: LoadSearchCache | None = None) -> None:
         self.repo = repo
+        if cache is None and get_settings().load_search_cache_enabled:
+            cache = load_search_cache
+        self.cache = cache
+        self.last_search_stats = LoadSearchStats()
+
+    async def search(
+        self,
+        equipment_type: str,
+        origin_location: str,
+        availability_time,
+        origin_radius_miles: float | None = None,
+        pickup_window_hours: float | None = None,
+    ):
+        query = LoadQuery.build(
+            equipment_type, origin_location, availability_time, origin_radius_miles, pickup_window_hours
+        )
+        cache_key = self._cache_key(query)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                loads, self.last_search_stats = cached
+                return list(loads)
+
+        rows = await self.repo.search_loads(
+            equipment_type,
+            origin_location,
+            availability_time,
+            origin_radius_miles=origin_radius_miles,
+            pickup_window_hours=pickup_window_hours,
+        )
+        loads = [self._to_load_out(row) for row in rows]
+        self.last_search_stats = self.repo.last_search_stats
+        if cache_key is not None:
+            self.cache.put(cache_key, (tuple(loads), self.last_search_stats))
+        return loads
 
-    async def search(self, equipment_type: str, origin_location: str, availability_time):
-        rows = await self.repo.search_loads(equipment_type, origin_location, availability_time)
-        return [
-            LoadOut(
-                load_id=row.load_id,
-                origin=row.origin,
-                destination=row.destination,
-                pickup_datetime=row.pickup_datetime,
-                delivery_datetime=row.delivery_datetime,
-                equipment_type=row.equipment_type,
-                loadboard_rate=row.loadboard_rate,
-                notes=row.notes,
-                weight=row.weight,
-                commodity_type=row.commodity_type,
-                miles=row.miles,
-                dimensions=row.dimensions,
-                num_of_pieces=row.num_of_pieces,
+    async def search_batch(self, requests: Sequence[SearchLoadsRequest]) -> list[tuple[list[LoadOut], LoadSearchStats]]:
+        """Answer each request from the cache when possible and rank the rest in one repository pass."""
+        results: list[tuple[list[LoadOut], LoadSearchStats] | None] = [None] * len(requests)
+        pending: list[tuple[int, LoadQuery, tuple | None]] = []
+        for position, request in enumerate(requests):
+            query = LoadQuery.build(
+                request.equipment_type,
+                request.origin_location,
+                request.availability_time,
+                request.origin_radius_miles,
+                request.pickup_window_hours,
             )
-            for row in rows
-        ]
+            cache_key = self._cache_key(query)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                loads, stats = cached
+                results[position] = (list(loads), stats)
+            else:
+                pending.append((position, query, cache_key))
+
+        if pending:
+            batch_rows = await self.repo.search_loads_batch([query for _, query, _ in pending])
+            for (position, _, cache_key), rows, stats in zip(pending, batch_rows, self.repo.last_batch_stats):
+                loads = [self._to_load_out(row) for row in rows]
+                results[position] = (loads, stats)
+                if cache_key is not None:
+                    self.cache.put(cache_key, (tuple(loads), stats))
+        return results
+
+    def _cache_key(self, query: LoadQuery) -> tuple | None:
+        if self.cache is None:
+            return None
+        return (
+            query.equipment,
+            query.origin,
+            query.radius_miles,
+            query.pickup_window,
+            self.cache.time_bucket(query.availability_time),
+        )
+
+    @staticmethod
+    def _to_load_out(row) -> LoadOut:
+        return LoadOut(
+            load_id=row.load_id,
+            origin=row.origin,
+            destination=row.destination,
+            pickup_datetime=row.pickup_datetime,
+            delivery_datetime=row.delivery_datetime,
+            equipment_type=row.equipment_type,
+            loadboard_rate=row.loadboard_rate,
+            notes=row.notes,
+            weight=row.weight,
+            commodity_type=row.commodity_type,
+            miles=row.miles,
+            dimensions=row.dimensions,
+            num_of_pieces=row.num_of_pieces,
+        )
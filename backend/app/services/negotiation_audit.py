@@ -0,0 +1,92 @@
+import asyncio
+from decimal import Decimal
+
+from app.core.metrics import register_metrics
+from app.db.session import SessionLocal
+from app.repositories.negotiation_repository import NegotiationRepository
+
+
+class NegotiationAuditWriter:
+    """Writes negotiation audit rows after `/evaluate-offer` has already answered.
+
+    Used when `NEGOTIATION_AUDIT_WRITE_MODE=deferred`: the decision is returned
+    before its row is durable, and each write commits through its own session
+    since the request's session is closed by then. A failed write is counted,
+    not retried. The app drains pending writes at shutdown.
+
+    Only offers with a `call_sid` are deferred. Without one the next round has
+    no session-cache entry and reads its previous counter from this table, so
+    a deferred row could still be pending when that read runs; the route writes
+    those synchronously instead. A round that misses the session cache (another
+    process answered the last one, or its entry was evicted or expired) calls
+    `wait_for_session` before reading. That only covers this process's writes,
+    so deferred mode needs every turn of a call routed to the same worker.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: set[asyncio.Task] = set()
+        self._by_session: dict[tuple[str, str], set[asyncio.Task]] = {}
+        self.written = 0
+        self.failures = 0
+
+    def schedule(
+        self,
+        call_sid: str | None,
+        load_id: str,
+        carrier_offer: Decimal,
+        round_number: int,
+        decision: str,
+        counter_rate: Decimal | None,
+        reasoning: str,
+    ) -> None:
+        task = asyncio.ensure_future(
+            self._write(
+                call_sid=call_sid,
+                load_id=load_id,
+                carrier_offer=carrier_offer,
+                round_number=round_number,
+                decision=decision,
+                counter_rate=counter_rate,
+                reasoning=reasoning,
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if call_sid is not None:
+            key = (call_sid, load_id)
+            self._by_session.setdefault(key, set()).add(task)
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+    def _forget(self, key: tuple[str, str], task: asyncio.Task) -> None:
+        tasks = self._by_session.get(key)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._by_session[key]
+
+    async def _write(self, **entry) -> None:
+        try:
+            async with SessionLocal() as session:
+                await NegotiationRepository(session).create_entry(**entry)
+            self.written += 1
+        except Exception:
+            # Nothing awaits this task, so any failure is counted here rather than lost.
+            self.failures += 1
+
+    async def wait_for_session(self, call_sid: str | None, load_id: str) -> None:
+        """Wait until this process's pending writes for one negotiation session have finished."""
+        if call_sid is None:
+            return
+        while tasks := self._by_session.get((call_sid, load_id)):
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def wait_idle(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._tasks), "written": self.written, "failures": self.failures}
+
+
+negotiation_audit_writer = NegotiationAuditWriter()
+register_metrics("negotiation_audit", negotiation_audit_writer.stats)
@@ -1,48 +1,208 @@
-from decimal import Decimal, ROUND_HALF_UP
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
 from typing import Literal
 
+from app.core.config import get_settings
 from app.models import Load
 
+CENT = Decimal("0.01")
+ACCEPT_PREMIUM = Decimal("1.02")
+HARD_REJECT_PREMIUM = Decimal("1.15")
+COUNTER_CAP_PREMIUM = Decimal("1.06")
+FINAL_ROUND = 3
+FINAL_ROUND_PREMIUM = Decimal("1.10")
+MAX_ROUNDS = 10
+# The same premiums as integer percentages, for the fixed-point engine.
+ACCEPT_PERCENT = 102
+HARD_REJECT_PERCENT = 115
+COUNTER_CAP_PERCENT = 106
+FINAL_ROUND_PERCENT = 110
 
-class NegotiationService:
-    def evaluate_offer(
+Decision = Literal["accept", "counter", "reject", "needs_more_info"]
+
+
+@dataclass(frozen=True)
+class NegotiationLadder:
+    """Every threshold `evaluate_offer` applies for one loadboard rate.
+
+    Offers at or below `accept_at_or_below` are accepted; offers at or above
+    `reject_at_or_above` are rejected in any round, and from `FINAL_ROUND` on
+    so is anything above `final_round_reject_above`. Everything else is
+    countered at the midpoint of the offer and the anchor (the loadboard rate,
+    or the previous counter if higher), capped at `counter_cap` and never
+    below the previous counter.
+    """
+
+    loadboard_rate: Decimal
+    accept_at_or_below: Decimal
+    reject_at_or_above: Decimal
+    final_round_reject_above: Decimal
+    counter_cap: Decimal
+
+    @classmethod
+    def for_rate(cls, loadboard_rate: Decimal) -> "NegotiationLadder":
+        target_rate = Decimal(loadboard_rate)
+        return cls(
+            loadboard_rate=target_rate,
+            accept_at_or_below=(target_rate * ACCEPT_PREMIUM).quantize(CENT, rounding=ROUND_HALF_UP),
+            reject_at_or_above=(target_rate * HARD_REJECT_PREMIUM).quantize(CENT, rounding=ROUND_HALF_UP),
+            final_round_reject_above=target_rate * FINAL_ROUND_PREMIUM,
+            counter_cap=target_rate * COUNTER_CAP_PREMIUM,
+        )
+
+    def reject_above(self, round_number: int) -> Decimal | None:
+        """The round's strict reject bound, or None before the final round."""
+        return self.final_round_reject_above if round_number >= FINAL_ROUND else None
+
+    def evaluate(
         self,
-        load: Load | None,
         carrier_offer: Decimal,
         round_number: int,
         previous_counter_rate: Decimal | None = None,
-    ) -> tuple[Literal["accept", "counter", "reject", "needs_more_info"], Decimal | None, str]:
-        if load is None:
-            return "needs_more_info", None, "Unknown load_id; cannot evaluate without a valid load context."
-
-        if carrier_offer <= 0:
-            return "needs_more_info", None, "Carrier offer must be a positive amount."
-
-        target_rate = Decimal(load.loadboard_rate)
-        accept_threshold = (target_rate * Decimal("1.02")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        hard_reject_threshold = (target_rate * Decimal("1.15")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-        if carrier_offer <= accept_threshold:
+    ) -> tuple[Decision, Decimal | None, str]:
+        if carrier_offer <= self.accept_at_or_below:
             return "accept", None, "Offer is within accepted rate tolerance."
 
-        if round_number >= 3 and carrier_offer > (target_rate * Decimal("1.10")):
+        if round_number >= FINAL_ROUND and carrier_offer > self.final_round_reject_above:
             return "reject", None, "Final negotiation round exceeded acceptable premium threshold."
 
-        if carrier_offer >= hard_reject_threshold:
+        if carrier_offer >= self.reject_at_or_above:
             return "reject", None, "Offer is materially above market baseline."
 
         # Keep negotiation progression monotonic across rounds:
         # when available, anchor midpoint to the last counter rather than resetting to loadboard rate.
-        anchor_rate = target_rate
+        anchor_rate = self.loadboard_rate
         if previous_counter_rate is not None:
-            anchor_rate = max(target_rate, Decimal(previous_counter_rate))
+            anchor_rate = max(self.loadboard_rate, Decimal(previous_counter_rate))
 
         counter_raw = (carrier_offer + anchor_rate) / 2
-        counter_cap = (target_rate * Decimal("1.06"))
-        counter_rate = min(counter_raw, counter_cap).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        counter_rate = min(counter_raw, self.counter_cap).quantize(CENT, rounding=ROUND_HALF_UP)
 
         if previous_counter_rate is not None:
-            prior_counter = Decimal(previous_counter_rate).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            prior_counter = Decimal(previous_counter_rate).quantize(CENT, rounding=ROUND_HALF_UP)
             counter_rate = max(counter_rate, prior_counter)
 
         return "counter", counter_rate, "Countering toward indexed market rate."
+
+
+@dataclass(frozen=True)
+class CentsLadder:
+    """`NegotiationLadder` in integer cents, for offers and counters with at most two decimals.
+
+    Quantized thresholds are whole cents; the unquantized ones (the final-round
+    bound and the counter cap) are kept scaled so every comparison is exact.
+    `ROUND_HALF_UP` on positive amounts is `floor(x + 1/2)`, i.e. `(n + d // 2) // d`.
+    """
+
+    loadboard_cents: int
+    accept_at_or_below: int
+    reject_at_or_above: int
+    # The final-round bound and the counter cap, in hundredths and half-hundredths of a cent.
+    final_round_reject_above_x100: int
+    counter_cap_x200: int
+
+    @classmethod
+    def for_cents(cls, loadboard_cents: int) -> "CentsLadder":
+        return cls(
+            loadboard_cents=loadboard_cents,
+            accept_at_or_below=(loadboard_cents * ACCEPT_PERCENT + 50) // 100,
+            reject_at_or_above=(loadboard_cents * HARD_REJECT_PERCENT + 50) // 100,
+            final_round_reject_above_x100=loadboard_cents * FINAL_ROUND_PERCENT,
+            counter_cap_x200=loadboard_cents * COUNTER_CAP_PERCENT * 2,
+        )
+
+    def evaluate(
+        self, offer_cents: int, round_number: int, previous_counter_cents: int | None = None
+    ) -> tuple[Decision, int | None, str]:
+        if offer_cents <= self.accept_at_or_below:
+            return "accept", None, "Offer is within accepted rate tolerance."
+
+        if round_number >= FINAL_ROUND and offer_cents * 100 > self.final_round_reject_above_x100:
+            return "reject", None, "Final negotiation round exceeded acceptable premium threshold."
+
+        if offer_cents >= self.reject_at_or_above:
+            return "reject", None, "Offer is materially above market baseline."
+
+        anchor_cents = self.loadboard_cents
+        if previous_counter_cents is not None:
+            anchor_cents = max(self.loadboard_cents, previous_counter_cents)
+
+        # (offer + anchor) / 2 in half-hundredths of a cent, capped, then rounded half-up to a cent.
+        counter_x200 = min((offer_cents + anchor_cents) * 100, self.counter_cap_x200)
+        counter_cents = (counter_x200 + 100) // 200
+
+        if previous_counter_cents is not None:
+            counter_cents = max(counter_cents, previous_counter_cents)
+
+        return "counter", counter_cents, "Countering toward indexed market rate."
+
+
+@lru_cache(maxsize=4096)
+def cents_ladder(loadboard_rate: Decimal) -> CentsLadder | None:
+    """Thresholds precomputed once per loadboard rate and shared by every turn on loads at that rate.
+
+    None when the rate has sub-cent precision.
+    """
+    loadboard_cents = to_cents(loadboard_rate)
+    return CentsLadder.for_cents(loadboard_cents) if loadboard_cents is not None else None
+
+
+def to_cents(amount: Decimal) -> int | None:
+    """`amount` in whole cents, or None when it has sub-cent precision or more digits than the context holds."""
+    try:
+        if amount != amount.quantize(CENT):
+            return None
+    except InvalidOperation:
+        # Quantizing needs room for two decimal places; the Decimal ladder handles such amounts.
+        return None
+    return int(amount * 100)
+
+
+class NegotiationService:
+    def __init__(self, engine: str | None = None) -> None:
+        self.engine = engine or get_settings().negotiation_engine
+
+    def evaluate_offer(
+        self,
+        load: Load | None,
+        carrier_offer: Decimal,
+        round_number: int,
+        previous_counter_rate: Decimal | None = None,
+    ) -> tuple[Decision, Decimal | None, str]:
+        if load is None:
+            return "needs_more_info", None, "Unknown load_id; cannot evaluate without a valid load context."
+
+        if carrier_offer <= 0:
+            return "needs_more_info", None, "Carrier offer must be a positive amount."
+
+        if self.engine == "cents":
+            decided = self._evaluate_cents(load, carrier_offer, round_number, previous_counter_rate)
+            if decided is not None:
+                return decided
+        return self.ladder(load).evaluate(carrier_offer, round_number, previous_counter_rate)
+
+    @staticmethod
+    def _evaluate_cents(
+        load: Load,
+        carrier_offer: Decimal,
+        round_number: int,
+        previous_counter_rate: Decimal | None,
+    ) -> tuple[Decision, Decimal | None, str] | None:
+        """Evaluate in integer cents; None when an amount has sub-cent precision and needs the Decimal path."""
+        ladder = cents_ladder(load.loadboard_rate)
+        offer_cents = to_cents(carrier_offer)
+        previous_counter_cents = to_cents(previous_counter_rate) if previous_counter_rate is not None else None
+        if ladder is None or offer_cents is None:
+            return None
+        if previous_counter_rate is not None and previous_counter_cents is None:
+            return None
+
+        decision, counter_cents, reasoning = ladder.evaluate(
+            offer_cents, round_number, previous_counter_cents
+        )
+        counter_rate = Decimal(counter_cents).scaleb(-2) if counter_cents is not None else None
+        return decision, counter_rate, reasoning
+
+    def ladder(self, load: Load) -> NegotiationLadder:
+        return NegotiationLadder.for_rate(load.loadboard_rate)
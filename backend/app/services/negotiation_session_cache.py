@@ -0,0 +1,82 @@
+"""In-process cache of each negotiation session's last counter.
+
+A session is one call (`call_sid`) negotiating one load. After every turn the
+cache records the round and the latest counter offered so far, so the next
+round takes its anchor from memory instead of the `negotiations` table. An
+entry is trusted only for the round right after it: a gap means another worker
+may have handled the rounds in between, so the lookup falls back to the
+database.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from app.core.config import get_settings
+from app.core.metrics import register_metrics
+
+
+@dataclass(frozen=True)
+class SessionTurn:
+    round_number: int
+    last_counter_rate: Decimal | None
+
+
+class NegotiationSessionCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, SessionTurn]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def previous_turn(self, call_sid: str | None, load_id: str, round_number: int) -> SessionTurn | None:
+        """The session's turn for `round_number - 1`, if this process recorded it."""
+        if call_sid is None or round_number <= 1:
+            return None
+        key = (call_sid, load_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, turn = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        if turn.round_number != round_number - 1:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return turn
+
+    def record(self, call_sid: str, load_id: str, round_number: int, last_counter_rate: Decimal | None) -> None:
+        key = (call_sid, load_id)
+        self._entries[key] = (time.monotonic(), SessionTurn(round_number, last_counter_rate))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_settings = get_settings()
+negotiation_session_cache = NegotiationSessionCache(
+    max_entries=_settings.negotiation_session_cache_max_entries,
+    ttl_seconds=_settings.negotiation_session_ttl_seconds,
+)
+register_metrics("negotiation_session_cache", negotiation_session_cache.stats)
@@ -0,0 +1,91 @@
+"""Benchmark: per-call `httpx.AsyncClient` vs the shared pooled FMCSA client.
+
+Starts a local stand-in for the FMCSA docket endpoint (HTTP/1.1 keep-alive,
+optional artificial latency) and times sequential verifications both ways.
+Run from `backend/`:
+
+    python -m benchmarks.fmcsa_client --calls 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.core.config import Settings
+from app.services.fmcsa_client import FMCSAClient, build_fmcsa_http_client
+
+PAYLOAD = json.dumps(
+    {"content": [{"carrier": {"legalName": "Stand-in Carrier", "allowedToOperate": "Y", "statusCode": "A"}}]}
+).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_delay_seconds = 0.0
+
+    def do_GET(self) -> None:
+        if self.server_delay_seconds:
+            time.sleep(self.server_delay_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+def start_stand_in(delay_seconds: float) -> ThreadingHTTPServer:
+    StandInHandler.server_delay_seconds = delay_seconds
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def time_calls(client: FMCSAClient, calls: int) -> list[float]:
+    latencies = []
+    for idx in range(calls):
+        started = time.perf_counter()
+        await client.verify_carrier(str(100000 + idx))
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def summarize(label: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<22} mean {statistics.fmean(latencies) * 1000:7.2f} ms   "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms"
+    )
+
+
+async def run(calls: int, delay_seconds: float) -> None:
+    server = start_stand_in(delay_seconds)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/qc/services"
+    try:
+        per_call = FMCSAClient(api_key="bench", base_url=base_url)
+        summarize("client per call", await time_calls(per_call, calls))
+
+        async with build_fmcsa_http_client(Settings()) as http_client:
+            shared = FMCSAClient(api_key="bench", http_client=http_client, base_url=base_url)
+            summarize("shared pooled client", await time_calls(shared, calls))
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FMCSA client connection reuse")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--server-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.server_delay_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Microbenchmark: per-request cost of ranking a scan search.
+
+Compares the narrow-tuple scoring loop (score every `SCORING_COLUMNS` row, then
+sort), building a `LoadSnapshot` from those rows and ranking it, and ranking a
+snapshot kept across requests (what the scan strategy does). Reading the rows
+from the database is not timed; the first two pay it on every request, the kept
+snapshot only on a rebuild. Applying one load change to the kept snapshot is
+reported per size. The NumPy column ranks the kept snapshot and is reported
+when NumPy is installed (`pip install -e ".[fast]"`).
+
+Run from `backend/`:
+
+    python -m benchmarks.load_scoring --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.core.load_ranking import LoadQuery, score_load, time_distance_seconds
+from app.core import load_snapshot
+from app.core.load_snapshot import LoadSnapshot
+from app.models import Load
+
+BASE_TIME = datetime(2026, 3, 2, 12, 0)
+ORIGIN_CITIES = [
+    "Chicago, IL",
+    "Joliet, IL",
+    "Dallas, TX",
+    "Fort Worth, TX",
+    "Houston, TX",
+    "Los Angeles, CA",
+    "Kansas City, MO",
+    "Newark, NJ",
+    "Denver, CO",
+    "Atlanta, GA",
+    "Memphis, TN",
+    "Columbus, OH",
+]
+EQUIPMENT_TYPES = ["Dry Van", "DryVan", "Reefer", "Flatbed", "Power Only", "Step Deck"]
+# Stand-in for the narrow `SCORING_COLUMNS` rows the repository reads.
+ScoringRow = namedtuple(
+    "ScoringRow", "id equipment_code origin_normalized origin_latitude origin_longitude pickup_at_utc"
+)
+QUERIES = [
+    ("Dry Van", "Chicago, IL", None),
+    ("Reefer", "Dallas", None),
+    ("Flatbed", "Kansas City, MO", 150),
+]
+
+
+def build_loads(count: int, seed: int = 7) -> list[Load]:
+    rng = random.Random(seed)
+    loads = []
+    for idx in range(count):
+        pickup = BASE_TIME + timedelta(minutes=rng.randint(-7 * 24 * 60, 7 * 24 * 60))
+        load = Load(
+            id=idx + 1,
+            load_id=f"BENCH-{idx:06d}",
+            origin=rng.choice(ORIGIN_CITIES),
+            destination="Atlanta, GA",
+            pickup_datetime=pickup,
+            delivery_datetime=pickup + timedelta(hours=12),
+            equipment_type=rng.choice(EQUIPMENT_TYPES),
+            loadboard_rate=Decimal("2000.00"),
+            notes="Benchmark fixture " * 8,
+            weight=30000,
+            commodity_type="General Freight",
+            miles=600,
+            dimensions="53ft trailer",
+            num_of_pieces=10,
+            is_active=True,
+        )
+        load.refresh_search_columns()
+        loads.append(load)
+    return loads
+
+
+def tuple_loop(rows: list[ScoringRow], query: LoadQuery, limit: int = 15) -> list[int]:
+    scored = []
+    for row in rows:
+        total_score = score_load(
+            query, row.equipment_code, row.origin_normalized, row.origin_latitude, row.origin_longitude
+        )
+        if total_score == 0:
+            continue
+        scored.append((total_score, time_distance_seconds(query, row.pickup_at_utc), row.pickup_at_utc, row.id))
+    scored.sort(key=lambda item: (-item[0], item[1], item[2], item[3]))
+    return [item[3] for item in scored[:limit]]
+
+
+def build_and_rank(rows: list[ScoringRow], query: LoadQuery, limit: int = 15) -> list[int]:
+    return LoadSnapshot.from_rows(rows).rank(query, limit)[0]
+
+
+def replace_load(snapshot: LoadSnapshot, row: ScoringRow) -> None:
+    snapshot.remove(row.id)
+    snapshot.append(*row)
+
+
+def replace_load_and_rank_numpy(snapshot: LoadSnapshot, row: ScoringRow, query: LoadQuery) -> None:
+    # A change drops the NumPy column copies, so the next NumPy ranking re-copies them.
+    replace_load(snapshot, row)
+    snapshot.rank(query, 15, "numpy")
+
+
+def best_of(repeat: int, func, *args) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(sizes: list[int], repeat: int) -> None:
+    queries = [LoadQuery.build(equipment, origin, BASE_TIME, radius) for equipment, origin, radius in QUERIES]
+    with_numpy = load_snapshot.np is not None
+    header = f"{'loads':>8} {'query':<34} {'tuple loop ms':>14} {'build+rank ms':>14} {'kept ms':>9} {'speedup':>8}"
+    print(header + (f" {'numpy ms':>10} {'speedup':>8}" if with_numpy else ""))
+    for size in sizes:
+        loads = build_loads(size)
+        rows = [
+            ScoringRow(
+                load.id,
+                load.equipment_code,
+                load.origin_normalized,
+                load.origin_latitude,
+                load.origin_longitude,
+                load.pickup_at_utc,
+            )
+            for load in loads
+        ]
+        snapshot = LoadSnapshot.from_rows(rows)
+        for query, (equipment, origin, radius) in zip(queries, QUERIES):
+            tuple_seconds, tuple_ranked = best_of(repeat, tuple_loop, rows, query)
+            build_seconds, built_ranked = best_of(repeat, build_and_rank, rows, query)
+            kept_seconds, (kept_ranked, _) = best_of(repeat, snapshot.rank, query, 15)
+            assert built_ranked == kept_ranked == tuple_ranked, "snapshot ranking diverged from the tuple loop"
+            label = f"{equipment} / {origin}" + (f" r={radius}" if radius else "")
+            line = (
+                f"{size:>8} {label:<34} {tuple_seconds * 1000:>14.1f} {build_seconds * 1000:>14.1f} "
+                f"{kept_seconds * 1000:>9.1f} {tuple_seconds / kept_seconds:>7.1f}x"
+            )
+            if with_numpy:
+                numpy_seconds, (numpy_ranked, _) = best_of(repeat, snapshot.rank, query, 15, "numpy")
+                assert numpy_ranked == tuple_ranked, "NumPy ranking diverged from the tuple loop"
+                line += f" {numpy_seconds * 1000:>10.1f} {tuple_seconds / numpy_seconds:>7.1f}x"
+            print(line)
+        update_seconds, _ = best_of(repeat, replace_load, snapshot, rows[len(rows) // 2])
+        print(f"{size:>8} {'(apply one load change to kept)':<34} {'':>14} {'':>14} {update_seconds * 1000:>9.3f}")
+        if with_numpy:
+            changed_seconds, _ = best_of(repeat, replace_load_and_rank_numpy, snapshot, rows[0], queries[0])
+            label = "(one change, then NumPy rank)"
+            print(f"{size:>8} {label:<34} {'':>14} {'':>14} {'':>9} {'':>8} {changed_seconds * 1000:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark load search scoring loops")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
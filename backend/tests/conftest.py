@@ -17,6 +17,12 @@ from app.core.config import Settings, get_settings
 from app.db.base import Base
 from app.db.session import SessionLocal, engine
 from app.main import create_app
+from app.repositories.load_search_index import load_search_index
+from app.repositories.load_snapshot_store import load_snapshot_store
+from app.services.carrier_verification_cache import carrier_verification_cache
+from app.services.fmcsa_client import fmcsa_breaker
+from app.services.load_search_cache import load_search_cache
+from app.services.negotiation_session_cache import negotiation_session_cache
 
 
 @pytest.fixture(autouse=True)
@@ -24,6 +30,12 @@ async def prepare_database() -> AsyncIterator[None]:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    load_search_index.invalidate()
+    load_snapshot_store.invalidate()
+    load_search_cache.invalidate()
+    carrier_verification_cache.clear()
+    fmcsa_breaker.reset()
+    negotiation_session_cache.clear()
     yield
 
 
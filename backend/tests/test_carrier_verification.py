@@ -0,0 +1,579 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.core.config import Settings
+from app.core.resilience import CircuitBreaker, ConcurrencyLimiter
+from app.db.session import engine
+from app.main import create_app
+from app.models import Call, CarrierVerification
+from app.repositories import CarrierVerificationRepository
+from app.services import CarrierService
+from app.services.carrier_prewarm import CarrierPrewarmer
+from app.services.carrier_service import VerificationRefresher, verification_refresher, verify_carriers
+from app.services.carrier_verification_cache import (
+    MAX_STALE_SECONDS,
+    CachedVerification,
+    CarrierVerificationCache,
+)
+from app.services.fmcsa_client import (
+    FMCSACircuitOpenError,
+    FMCSAClient,
+    FMCSAResult,
+    FMCSAServiceError,
+    fmcsa_lookups,
+)
+
+API_HEADERS = {"x-api-key": "test-api-key"}
+
+
+def fmcsa_payload(legal_name: str = "Carrier One", allowed: str = "Y", status: str = "A") -> dict:
+    return {"content": [{"carrier": {"legalName": legal_name, "allowedToOperate": allowed, "statusCode": status}}]}
+
+
+class StandInFMCSA:
+    """Mock transport recording the docket numbers it was asked for."""
+
+    def __init__(self, payload: dict | None = None) -> None:
+        self.payload = payload or fmcsa_payload()
+        self.requested: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requested.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=self.payload)
+
+
+@pytest.mark.asyncio
+async def test_fmcsa_client_reuses_shared_http_client():
+    upstream = StandInFMCSA()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http_client:
+        client = FMCSAClient(api_key="key", http_client=http_client, base_url="http://fmcsa.test/qc/services/")
+
+        first = await client.verify_carrier("MC-123456")
+        second = await client.verify_carrier("654321")
+
+        assert not http_client.is_closed
+    assert (first.verification, first.legal_name, first.mc_number) == ("verified", "Carrier One", "123456")
+    assert second.eligible is True
+    assert upstream.requested == ["123456", "654321"]
+
+
+@pytest.mark.asyncio
+async def test_verify_carrier_route_uses_app_http_client(app, client):
+    upstream = StandInFMCSA(fmcsa_payload(allowed="N"))
+    app.state.fmcsa_http_client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    try:
+        response = await client.post("/verify-carrier", json={"mc_number": "777"}, headers=API_HEADERS)
+    finally:
+        await app.state.fmcsa_http_client.aclose()
+
+    assert response.status_code == 200
+    assert response.json()["verification"] == "not_authorized"
+    assert upstream.requested == ["777"]
+
+
+@pytest.mark.asyncio
+async def test_verification_cache_serves_repeat_lookups_and_survives_restart(db_session, monkeypatch):
+    calls: list[str] = []
+
+    async def mock_verify(self, mc_number: str):
+        calls.append(mc_number)
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number="123456")
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+    cache = CarrierVerificationCache(ttl_seconds_by_status={"verified": 3600})
+    service = CarrierService(FMCSAClient(api_key="key"), CarrierVerificationRepository(db_session), cache=cache)
+
+    first = await service.verify("MC-123456")
+    second = await service.verify("123456")
+    assert (first.cached, second.cached) == (False, True)
+    assert 0 <= second.cache_age_seconds < 5
+    assert calls == ["MC-123456"]
+
+    stored = await db_session.get(CarrierVerification, "123456")
+    assert stored.verification == "verified"
+
+    # A fresh process starts with an empty LRU tier and falls back to the table.
+    restarted = CarrierService(
+        FMCSAClient(api_key="key"),
+        CarrierVerificationRepository(db_session),
+        cache=CarrierVerificationCache(ttl_seconds_by_status={"verified": 3600}),
+    )
+    after_restart = await restarted.verify("123456")
+    assert (after_restart.eligible, after_restart.legal_name) == (True, "Carrier One")
+    assert calls == ["MC-123456"]
+
+
+@pytest.mark.asyncio
+async def test_verification_cache_applies_per_status_ttls_and_skips_errors(db_session, monkeypatch):
+    outcomes = {
+        "1": FMCSAResult(eligible=False, verification="not_authorized", legal_name="Lapsed LLC", mc_number="1"),
+        "2": FMCSAResult(eligible=False, verification="invalid_mc", legal_name=None, mc_number="2"),
+    }
+    calls: list[str] = []
+
+    async def mock_verify(self, mc_number: str):
+        calls.append(mc_number)
+        if mc_number == "3":
+            raise FMCSAServiceError("upstream timeout")
+        return outcomes[mc_number]
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+    cache = CarrierVerificationCache(ttl_seconds_by_status={"not_authorized": 60, "invalid_mc": 0})
+    service = CarrierService(FMCSAClient(api_key="key"), CarrierVerificationRepository(db_session), cache=cache)
+
+    for _ in range(2):
+        await service.verify("1")
+        await service.verify("2")
+        with pytest.raises(FMCSAServiceError):
+            await service.verify("3")
+
+    assert calls == ["1", "2", "3", "2", "3"]
+    assert await db_session.get(CarrierVerification, "2") is None
+
+    stored = await db_session.get(CarrierVerification, "1")
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+    cache.clear()
+    await service.verify("1")
+    assert calls[-1] == "1"
+
+
+@pytest.mark.asyncio
+async def test_verification_upsert_is_one_statement_and_keeps_the_latest_result(db_session):
+    repository = CarrierVerificationRepository(db_session)
+    now = datetime.now(timezone.utc)
+    await repository.upsert("555", True, "verified", "Carrier One", now, now + timedelta(hours=1))
+    loaded = await db_session.get(CarrierVerification, "555")
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        later = now + timedelta(minutes=5)
+        await repository.upsert("555", False, "not_authorized", "Carrier One", later, later + timedelta(hours=1))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert len(statements) == 1 and "ON CONFLICT" in statements[0]
+    # The entry this session had already loaded is refreshed in place.
+    assert loaded.verification == "not_authorized"
+
+    # A result verified earlier than the stored one, e.g. from a slower concurrent request, does not win.
+    await repository.upsert("555", True, "verified", "Carrier One", now, now + timedelta(hours=1))
+    await db_session.refresh(loaded)
+    assert loaded.verification == "not_authorized"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_for_one_carrier_share_a_single_request():
+    release = asyncio.Event()
+    requested: list[str] = []
+
+    async def slow_upstream(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path.rsplit("/", 1)[-1])
+        await release.wait()
+        if requested[-1] == "500":
+            return httpx.Response(503)
+        return httpx.Response(200, json=fmcsa_payload())
+
+    coalesced_before = fmcsa_lookups.coalesced
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream)) as http_client:
+        client = FMCSAClient(api_key="key", http_client=http_client, base_url="http://fmcsa.test")
+        lookups = [asyncio.create_task(client.verify_carrier(mc)) for mc in ("MC 42", "42", "042", "500", "MC500")]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*lookups, return_exceptions=True)
+
+    assert sorted(requested) == ["042", "42", "500"]
+    assert results[0] is results[1]
+    assert results[2].mc_number == "042"
+    assert all(isinstance(result, FMCSAServiceError) for result in results[3:])
+    assert results[3] is results[4]
+    assert fmcsa_lookups.coalesced == coalesced_before + 2
+    assert fmcsa_lookups.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_then_probes_half_open(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.core.resilience.time.monotonic", lambda: clock[0])
+    healthy = [False]
+    requested: list[str] = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=fmcsa_payload()) if healthy[0] else httpx.Response(502)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http_client:
+        client = FMCSAClient(api_key="key", http_client=http_client, base_url="http://fmcsa.test", breaker=breaker)
+
+        for mc in ("1", "2"):
+            with pytest.raises(FMCSAServiceError):
+                await client.verify_carrier(mc)
+        with pytest.raises(FMCSACircuitOpenError):
+            await client.verify_carrier("3")
+        assert requested == ["1", "2"]
+        assert breaker.stats()["state"] == "open"
+
+        clock[0] += 30
+        assert breaker.stats()["state"] == "half_open"
+        with pytest.raises(FMCSAServiceError):
+            await client.verify_carrier("4")
+        assert breaker.stats()["state"] == "open"
+
+        clock[0] += 30
+        healthy[0] = True
+        assert (await client.verify_carrier("5")).verification == "verified"
+
+    assert requested == ["1", "2", "4", "5"]
+    assert breaker.stats() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "times_opened": 2,
+        "rejected_calls": 1,
+        "half_open_probes": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_recovers_after_probes_fail_with_unexpected_errors(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.core.resilience.time.monotonic", lambda: clock[0])
+    responses = iter(["list_body", "crash", "healthy"])
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        response = next(responses)
+        if response == "crash":
+            raise RuntimeError("transport bug")
+        return httpx.Response(200, json=[] if response == "list_body" else fmcsa_payload())
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30)
+    breaker.record_failure()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http_client:
+        client = FMCSAClient(api_key="key", http_client=http_client, base_url="http://fmcsa.test", breaker=breaker)
+
+        # A body that is not an object is a parse failure, not an AttributeError escaping the breaker.
+        clock[0] += 30
+        with pytest.raises(FMCSAServiceError):
+            await client.verify_carrier("21")
+        assert breaker.stats()["state"] == "open"
+
+        # Any other exception still releases the half-open probe.
+        clock[0] += 30
+        with pytest.raises(RuntimeError):
+            await client.verify_carrier("22")
+        assert breaker.stats()["state"] == "open"
+
+        clock[0] += 30
+        assert (await client.verify_carrier("23")).verification == "verified"
+    assert breaker.stats()["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_caller_deadline_and_concurrency_cap_bound_upstream_calls():
+    release = asyncio.Event()
+
+    async def stalled_upstream(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, json=fmcsa_payload())
+
+    limiter = ConcurrencyLimiter(limit=1)
+    timeouts_before = fmcsa_lookups.timeouts
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stalled_upstream)) as http_client:
+        client = FMCSAClient(
+            api_key="key",
+            http_client=http_client,
+            base_url="http://fmcsa.test",
+            breaker=CircuitBreaker(),
+            limiter=limiter,
+            deadline_seconds=0.05,
+        )
+        results = await asyncio.gather(client.verify_carrier("11"), client.verify_carrier("12"), return_exceptions=True)
+        assert all(isinstance(result, FMCSAServiceError) for result in results)
+        assert fmcsa_lookups.timeouts == timeouts_before + 2
+        assert (limiter.in_use, limiter.waiting) == (1, 1)
+
+        # The abandoned lookups still complete in the background, one at a time.
+        release.set()
+        patient = await client.verify_carrier("11", deadline_seconds=5)
+        await client.verify_carrier("12", deadline_seconds=5)
+
+    assert patient.verification == "verified"
+    assert limiter.stats() == {"limit": 1, "in_use": 0, "waiting": 0, "peak_in_use": 1}
+
+
+@pytest.mark.asyncio
+async def test_calls_queued_for_a_slot_fail_fast_if_the_breaker_opens_meanwhile():
+    release = asyncio.Event()
+    requested: list[str] = []
+
+    async def failing_upstream(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path.rsplit("/", 1)[-1])
+        await release.wait()
+        return httpx.Response(502)
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30)
+    limiter = ConcurrencyLimiter(limit=1)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(failing_upstream)) as http_client:
+        client = FMCSAClient(
+            api_key="key", http_client=http_client, base_url="http://fmcsa.test", breaker=breaker, limiter=limiter
+        )
+        first = asyncio.create_task(client.verify_carrier("31"))
+        queued = asyncio.create_task(client.verify_carrier("32"))
+        while limiter.waiting < 1:
+            await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(FMCSAServiceError):
+            await first
+        with pytest.raises(FMCSACircuitOpenError):
+            await queued
+
+    assert requested == ["31"]
+    assert breaker.stats()["rejected_calls"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_refreshing_in_background(db_session, monkeypatch):
+    calls: list[str] = []
+
+    async def mock_verify(self, mc_number: str, deadline_seconds: float | None = None):
+        calls.append(mc_number)
+        return FMCSAResult(eligible=False, verification="not_authorized", legal_name="Renamed LLC", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+    cache = CarrierVerificationCache(
+        ttl_seconds_by_status={"verified": 60, "not_authorized": 60}, max_stale_seconds=600
+    )
+    refresher = VerificationRefresher()
+    service = CarrierService(
+        FMCSAClient(api_key="key"), CarrierVerificationRepository(db_session), cache=cache, refresher=refresher
+    )
+    now = datetime.now(timezone.utc)
+    for mc_number, verified_minutes_ago in (("100", 5), ("200", 20)):
+        verified_at = now - timedelta(minutes=verified_minutes_ago)
+        cache.put(
+            CachedVerification(
+                result=FMCSAResult(eligible=True, verification="verified", legal_name="Old LLC", mc_number=mc_number),
+                verified_at=verified_at,
+                expires_at=verified_at + timedelta(seconds=60),
+            )
+        )
+
+    stale = await service.verify("100")
+    assert (stale.verification, stale.cached) == ("verified", True)
+    assert 300 <= stale.cache_age_seconds < 310
+    await refresher.wait_idle()
+    assert calls == ["100"]
+    assert refresher.refreshes == 1
+
+    refreshed = await service.verify("100")
+    assert (refreshed.verification, refreshed.legal_name, refreshed.cached) == ("not_authorized", "Renamed LLC", True)
+    assert (await db_session.get(CarrierVerification, "100")).legal_name == "Renamed LLC"
+
+    # Past the hard staleness limit the caller waits for a live lookup.
+    too_stale = await service.verify("200")
+    assert (too_stale.verification, too_stale.cached) == ("not_authorized", False)
+    assert calls == ["100", "200"]
+
+
+def test_stale_serving_is_capped_whatever_the_settings_say():
+    cache = CarrierVerificationCache(ttl_seconds_by_status={"verified": 60}, max_stale_seconds=604800)
+    verified_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    cache.put(
+        CachedVerification(
+            result=FMCSAResult(eligible=True, verification="verified", legal_name="Old LLC", mc_number="300"),
+            verified_at=verified_at,
+            expires_at=verified_at + timedelta(seconds=60),
+        )
+    )
+
+    assert cache.max_stale_seconds == MAX_STALE_SECONDS
+    assert cache.get("300", datetime.now(timezone.utc)) is None
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_background_refreshes_before_closing_the_fmcsa_client(monkeypatch):
+    app = create_app(Settings(carrier_prewarm_enabled=False))
+    client_closed_during_refresh: list[bool] = []
+
+    async def slow_verify(self, mc_number: str, deadline_seconds: float | None = None):
+        await asyncio.sleep(0.05)
+        client_closed_during_refresh.append(app.state.fmcsa_http_client.is_closed)
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", slow_verify)
+    refreshes_before = verification_refresher.refreshes
+    async with app.router.lifespan_context(app):
+        verification_refresher.schedule("400", FMCSAClient(api_key="key"), CarrierVerificationCache())
+
+    assert client_closed_during_refresh == [False]
+    assert verification_refresher.refreshes == refreshes_before + 1
+    assert app.state.fmcsa_http_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_verify_carrier_route_reports_cache_age(client, monkeypatch):
+    async def mock_verify(self, mc_number: str):
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+
+    live = await client.post("/verify-carrier", json={"mc_number": "31337"}, headers=API_HEADERS)
+    cached = await client.post("/verify-carrier", json={"mc_number": "MC31337"}, headers=API_HEADERS)
+
+    assert (live.json()["cached"], live.json()["cache_age_seconds"]) == (False, None)
+    assert cached.json()["cached"] is True
+    assert cached.json()["cache_age_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_verify_carriers_bounds_parallelism_and_keeps_failures_in_place(monkeypatch):
+    in_flight = [0]
+    peak = [0]
+
+    async def mock_verify(self, mc_number: str):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        if mc_number == "500":
+            raise FMCSAServiceError("upstream down")
+        return FMCSAResult(eligible=True, verification="verified", legal_name=f"Carrier {mc_number}", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+
+    mc_numbers = ["100", "200", "300", "400", "500", "600"]
+    results = await verify_carriers(mc_numbers, FMCSAClient(api_key="key"), max_concurrency=2)
+
+    assert peak[0] == 2
+    assert isinstance(results[4], FMCSAServiceError)
+    assert [result.mc_number for result in results if isinstance(result, FMCSAResult)] == ["100", "200", "300", "400", "600"]
+
+
+@pytest.mark.asyncio
+async def test_verify_carrier_bulk_route(client, monkeypatch):
+    async def mock_verify(self, mc_number: str):
+        if mc_number.endswith("404"):
+            raise FMCSAServiceError("upstream down")
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+
+    response = await client.post(
+        "/verify-carrier/bulk", json={"mc_numbers": ["111", "MC-404", "222"]}, headers=API_HEADERS
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(item["mc_number"], item["verification"]) for item in results] == [
+        ("111", "verified"),
+        ("MC-404", "verification_unavailable"),
+        ("222", "verified"),
+    ]
+
+    repeat = await client.post("/verify-carrier/bulk", json={"mc_numbers": ["111"]}, headers=API_HEADERS)
+    assert repeat.json()["results"][0]["cached"] is True
+
+    too_many = await client.post("/verify-carrier/bulk", json={"mc_numbers": ["1"] * 101}, headers=API_HEADERS)
+    assert too_many.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_prewarmer_refreshes_hot_carriers_missing_or_expiring(db_session, monkeypatch):
+    calls: list[str] = []
+
+    async def mock_verify(self, mc_number: str):
+        calls.append(mc_number)
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+    now = datetime.now(timezone.utc)
+    history = [("MC-100", 0), ("MC-100", 1), ("100", 2), ("200", 0), ("200", 1), ("300", 0), ("400", 0)]
+    history += [("900", 90)] * 5 + [(None, 0)] * 5
+    db_session.add_all(
+        Call(call_outcome="booked", mc_number=mc_number, created_at=now - timedelta(days=days_ago))
+        for mc_number, days_ago in history
+    )
+    await db_session.commit()
+
+    cache = CarrierVerificationCache(ttl_seconds_by_status={"verified": 3600})
+    for mc_number, expires_in_seconds in (("200", 3000), ("300", 60)):
+        cache.put(
+            CachedVerification(
+                result=FMCSAResult(eligible=True, verification="verified", legal_name="Old", mc_number=mc_number),
+                verified_at=now,
+                expires_at=now + timedelta(seconds=expires_in_seconds),
+            )
+        )
+    monkeypatch.setattr("app.services.carrier_service.carrier_verification_cache", cache)
+    prewarmer = CarrierPrewarmer(top_n=3, lookback_days=30, max_concurrency=4, cache=cache)
+
+    summary = await prewarmer.run_once(FMCSAClient(api_key="key"), refresh_ahead_seconds=600)
+
+    # 100 (three calls across two spellings), 200, then 300 on the tiebreak; 900 is outside the lookback.
+    assert await prewarmer.hot_mc_numbers(now) == ["100", "200", "300"]
+    # 200 is fresh past the refresh horizon; 300 expires inside it.
+    assert sorted(calls) == ["100", "300"]
+    assert summary == {"hot": 3, "due": 2, "refreshed": 2, "failures": 0}
+    assert cache.peek("100").result.legal_name == "Carrier One"
+    assert (await db_session.get(CarrierVerification, "100")) is not None
+    assert prewarmer.stats()["refreshed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_prewarmer_skips_carriers_fresh_in_the_database_after_a_restart(db_session, monkeypatch):
+    calls: list[str] = []
+
+    async def mock_verify(self, mc_number: str):
+        calls.append(mc_number)
+        return FMCSAResult(eligible=True, verification="verified", legal_name="Carrier One", mc_number=mc_number)
+
+    monkeypatch.setattr("app.services.fmcsa_client.FMCSAClient.verify_carrier", mock_verify)
+    now = datetime.now(timezone.utc)
+    db_session.add_all(Call(call_outcome="booked", mc_number=mc_number) for mc_number in ("100", "200", "300"))
+    repository = CarrierVerificationRepository(db_session)
+    for mc_number, expires_in_seconds in (("100", 3000), ("200", 60)):
+        await repository.upsert(
+            mc_number, True, "verified", "Stored", now, now + timedelta(seconds=expires_in_seconds)
+        )
+
+    # A cold in-process tier, as in a freshly started worker.
+    cache = CarrierVerificationCache(ttl_seconds_by_status={"verified": 3600})
+    monkeypatch.setattr("app.services.carrier_service.carrier_verification_cache", cache)
+    prewarmer = CarrierPrewarmer(top_n=3, lookback_days=30, max_concurrency=4, cache=cache)
+
+    summary = await prewarmer.run_once(FMCSAClient(api_key="key"), refresh_ahead_seconds=600)
+
+    # 100 is fresh in the database past the horizon; 200 expires inside it and 300 was never verified.
+    assert sorted(calls) == ["200", "300"]
+    assert summary["due"] == 2
+    assert cache.peek("100").result.legal_name == "Stored"
+
+
+@pytest.mark.asyncio
+async def test_prewarmer_keeps_running_after_an_unexpected_error(monkeypatch):
+    prewarmer = CarrierPrewarmer(top_n=3, lookback_days=30, max_concurrency=4)
+    runs: list[int] = []
+
+    async def flaky_run_once(fmcsa_client, refresh_ahead_seconds: float = 0.0) -> dict:
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise RuntimeError("unexpected")
+        return {}
+
+    monkeypatch.setattr(prewarmer, "run_once", flaky_run_once)
+    task = asyncio.create_task(prewarmer.run_periodically(FMCSAClient(api_key="key"), interval_seconds=0.01))
+    while len(runs) < 3:
+        await asyncio.sleep(0.01)
+    assert not task.done()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert prewarmer.stats()["failed_runs"] == 1
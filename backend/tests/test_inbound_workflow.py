@@ -1,9 +1,23 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 
 import pytest
-
-from app.models import Load
+from sqlalchemy import event, func, select
+
+from app.core.call_payload import compact_payload, rebuild_payload
+from app.core.config import get_settings
+from app.core.json_stream import iter_json_records
+from app.db.session import engine
+from app.models import Call, CallDailyRollup, CallLaneDailyRollup, Load, Negotiation
+from app.repositories.call_repository import CallRepository
+from app.repositories.negotiation_repository import NegotiationRepository
+from app.services.call_payloads import rewrite_call_payloads
+from app.services.call_rollups import rebuild_call_rollups
+from app.services.call_log_writer import call_log_writer
+from app.services.negotiation_audit import negotiation_audit_writer
+from app.services.negotiation_service import NegotiationService
+from app.services.negotiation_session_cache import NegotiationSessionCache, negotiation_session_cache
 from app.services.fmcsa_client import FMCSAResult, FMCSAServiceError
 
 API_HEADERS = {"x-api-key": "test-api-key"}
@@ -118,6 +132,8 @@ async def test_ineligible_carrier(client, monkeypatch):
         "verification": "not_authorized",
         "legal_name": "Carrier Two",
         "mc_number": "999999",
+        "cached": False,
+        "cache_age_seconds": None,
     }
 
 
@@ -231,6 +247,206 @@ async def test_counter_offer_does_not_regress_across_rounds(client, db_session):
     assert round_two_payload["counter_rate"] == 2120.0
 
 
+@pytest.mark.asyncio
+async def test_evaluate_offer_reads_context_and_writes_audit_in_two_statements(client, db_session):
+    load = await insert_load(db_session, load_id="NEG-TRIPS-001", rate=Decimal("2000.00"))
+    await client.post(
+        "/evaluate-offer",
+        json={"load_id": load.load_id, "carrier_offer": 2280, "round_number": 1},
+        headers=API_HEADERS,
+    )
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            "/evaluate-offer",
+            json={"load_id": load.load_id, "carrier_offer": 2180, "round_number": 2},
+            headers=API_HEADERS,
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.json()["counter_rate"] == 2120.0
+    assert len(statements) == 2
+    assert statements[0].lstrip().upper().startswith("SELECT")
+    assert statements[1].lstrip().upper().startswith("INSERT") and "RETURNING" in statements[1].upper()
+
+
+@pytest.mark.asyncio
+async def test_deferred_audit_write_lands_after_the_response(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "negotiation_audit_write_mode", "deferred")
+    load = await insert_load(db_session, load_id="NEG-DEFER-001", rate=Decimal("2000.00"))
+
+    response = await client.post(
+        "/evaluate-offer",
+        json={"load_id": load.load_id, "carrier_offer": 2280, "round_number": 1, "call_sid": "CALL-DEFER-1"},
+        headers=API_HEADERS,
+    )
+    assert response.json()["decision"] == "counter"
+
+    await negotiation_audit_writer.wait_idle()
+    entries = (await db_session.execute(select(Negotiation).where(Negotiation.load_id == load.load_id))).scalars().all()
+    assert [(entry.round_number, entry.counter_rate) for entry in entries] == [(1, Decimal("2120.00"))]
+    assert negotiation_audit_writer.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_deferred_round_waits_for_its_sessions_pending_write_on_a_cache_miss(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "negotiation_audit_write_mode", "deferred")
+    load = await insert_load(db_session, load_id="NEG-DEFER-004", rate=Decimal("2000.00"))
+    create_entry = NegotiationRepository.create_entry
+
+    async def slow_create_entry(self, **entry):
+        await asyncio.sleep(0.05)
+        return await create_entry(self, **entry)
+
+    monkeypatch.setattr(NegotiationRepository, "create_entry", slow_create_entry)
+    await evaluate(client, load.load_id, 2280, 1, call_sid="CALL-DEFER-4")
+    # As if another worker had answered round one, or its cache entry had been evicted.
+    negotiation_session_cache.clear()
+    round_two = await evaluate(client, load.load_id, 2180, 2, call_sid="CALL-DEFER-4")
+
+    # Anchored on round one's 2120 counter; a reset to the loadboard rate would give 2090.
+    assert round_two["counter_rate"] == 2120.0
+    await negotiation_audit_writer.wait_idle()
+
+
+@pytest.mark.asyncio
+async def test_deferred_audit_mode_writes_synchronously_without_a_call_sid(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "negotiation_audit_write_mode", "deferred")
+    load = await insert_load(db_session, load_id="NEG-DEFER-002", rate=Decimal("2000.00"))
+    written_before = negotiation_audit_writer.written
+
+    await evaluate(client, load.load_id, 2280, 1)
+    # No wait_idle(): round two reads round one's counter from the table.
+    round_two = await evaluate(client, load.load_id, 2180, 2)
+
+    assert round_two["counter_rate"] == 2120.0
+    assert negotiation_audit_writer.written == written_before
+    entries = (await db_session.execute(select(Negotiation).where(Negotiation.load_id == load.load_id))).scalars().all()
+    assert sorted(entry.round_number for entry in entries) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_deferred_audit_write_counts_unexpected_failures(monkeypatch):
+    async def broken_create_entry(self, **entry):
+        raise TypeError("unexpected entry")
+
+    monkeypatch.setattr(NegotiationRepository, "create_entry", broken_create_entry)
+    failures_before = negotiation_audit_writer.failures
+    negotiation_audit_writer.schedule(
+        call_sid="CALL-DEFER-3",
+        load_id="NEG-DEFER-003",
+        carrier_offer=Decimal("2280"),
+        round_number=1,
+        decision="counter",
+        counter_rate=Decimal("2120"),
+        reasoning="test",
+    )
+    await negotiation_audit_writer.wait_idle()
+
+    assert negotiation_audit_writer.failures - failures_before == 1
+
+
+async def evaluate(client, load_id: str, offer: int, round_number: int, call_sid: str | None = None) -> dict:
+    payload = {"load_id": load_id, "carrier_offer": offer, "round_number": round_number}
+    if call_sid is not None:
+        payload["call_sid"] = call_sid
+    response = await client.post("/evaluate-offer", json=payload, headers=API_HEADERS)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("warm_session_cache", [True, False])
+async def test_negotiation_sessions_do_not_see_other_calls_counters(client, db_session, warm_session_cache):
+    load = await insert_load(db_session, load_id="NEG-SESSION-001", rate=Decimal("2000.00"))
+    assert (await evaluate(client, load.load_id, 2100, 1, call_sid="CA-B"))["counter_rate"] == 2050.0
+    assert (await evaluate(client, load.load_id, 2280, 1, call_sid="CA-A"))["counter_rate"] == 2120.0
+    if not warm_session_cache:
+        negotiation_session_cache.clear()
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        # Anchored on call B's own 2050 counter, not call A's later 2120.
+        round_two = await evaluate(client, load.load_id, 2090, 2, call_sid="CA-B")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert round_two["counter_rate"] == 2070.0
+    history_reads = [statement for statement in statements if "FROM negotiations" in statement]
+    assert len(history_reads) == (0 if warm_session_cache else 1)
+    stored = (await db_session.execute(select(Negotiation.call_sid).where(Negotiation.round_number == 2))).scalars()
+    assert list(stored) == ["CA-B"]
+
+
+def test_negotiation_session_cache_only_trusts_the_immediately_previous_round():
+    cache = NegotiationSessionCache(max_entries=2)
+    cache.record("CA-1", "LOAD-1", 1, Decimal("2050.00"))
+
+    assert cache.previous_turn("CA-1", "LOAD-1", 2).last_counter_rate == Decimal("2050.00")
+    assert cache.previous_turn("CA-1", "LOAD-1", 3) is None
+    assert cache.previous_turn("CA-1", "LOAD-2", 2) is None
+    assert cache.previous_turn(None, "LOAD-1", 2) is None
+
+    cache.record("CA-2", "LOAD-1", 1, None)
+    cache.record("CA-3", "LOAD-1", 1, None)
+    assert cache.previous_turn("CA-1", "LOAD-1", 2) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def resolve_with_ladder(ladder: dict, offer: Decimal, round_number: int, previous_counter: Decimal | None):
+    """How a caller resolves a turn from the `/negotiation-ladder` table, as documented."""
+    rates = {key: Decimal(str(ladder[key])) for key in ("loadboard_rate", "accept_at_or_below", "counter_cap")}
+    thresholds = ladder["rounds"][round_number - 1]
+    if offer <= rates["accept_at_or_below"]:
+        return "accept", None
+    if thresholds["reject_above"] is not None and offer > Decimal(str(thresholds["reject_above"])):
+        return "reject", None
+    if offer >= Decimal(str(thresholds["reject_at_or_above"])):
+        return "reject", None
+    anchor = max(rates["loadboard_rate"], previous_counter) if previous_counter is not None else rates["loadboard_rate"]
+    counter = min((offer + anchor) / 2, rates["counter_cap"]).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    if previous_counter is not None:
+        counter = max(counter, previous_counter)
+    return "counter", counter
+
+
+@pytest.mark.asyncio
+async def test_negotiation_ladder_resolves_turns_like_evaluate_offer(client, db_session):
+    load = await insert_load(db_session, load_id="NEG-LADDER-001", rate=Decimal("2345.67"))
+
+    response = await client.post("/negotiation-ladder", json={"load_id": load.load_id}, headers=API_HEADERS)
+    assert response.status_code == 200
+    ladder = response.json()
+    assert ladder["accept_at_or_below"] == 2392.58
+    assert [item["reject_above"] for item in ladder["rounds"][:3]] == [None, None, 2580.237]
+    assert {item["reject_at_or_above"] for item in ladder["rounds"]} == {2697.52}
+    assert len(ladder["rounds"]) == 10
+
+    service = NegotiationService()
+    for round_number in (1, 2, 3, 4):
+        for previous_counter in (None, Decimal("2400.00"), Decimal("2480.55")):
+            for offer in range(2300, 2760, 7):
+                decision, counter_rate, _ = service.evaluate_offer(load, Decimal(offer), round_number, previous_counter)
+                assert resolve_with_ladder(ladder, Decimal(offer), round_number, previous_counter) == (
+                    decision,
+                    counter_rate,
+                )
+
+    missing = await client.post("/negotiation-ladder", json={"load_id": "NO-SUCH-LOAD"}, headers=API_HEADERS)
+    assert missing.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_needs_more_info_flow(client):
     response = await client.post(
@@ -338,6 +554,367 @@ async def test_log_call_accepts_empty_strings_as_null(client):
     assert response.json()["status"] == "logged"
 
 
+@pytest.mark.asyncio
+async def test_log_call_compact_payload_rebuilds_the_full_request(client, db_session, monkeypatch):
+    request = {
+        "call_outcome": "booked",
+        "mc_number": "123456",
+        "carrier_verified": "true",
+        "initial_rate": "1900",
+        "negotiation_rounds": "2",
+        "availability_time": "2026-02-13T16:09:01",
+    }
+    monkeypatch.setattr(get_settings(), "call_log_payload_mode", "full")
+    full_id = (await client.post("/log-call", json=request, headers=API_HEADERS)).json()["call_id"]
+    monkeypatch.setattr(get_settings(), "call_log_payload_mode", "compact")
+    compact_id = (await client.post("/log-call", json=request, headers=API_HEADERS)).json()["call_id"]
+
+    full_call = await db_session.get(Call, full_id)
+    compact_call = await db_session.get(Call, compact_id)
+    # Timestamps come back from the database in its own time zone, so the string as sent is kept.
+    assert compact_call.analytics_payload == {"availability_time": "2026-02-13T16:09:01"}
+    assert full_call.analytics_payload["initial_rate"] == 1900.0
+    assert compact_call.full_analytics_payload() == full_call.full_analytics_payload() == full_call.analytics_payload
+
+
+@pytest.mark.asyncio
+async def test_existing_payloads_are_compacted_and_expanded_by_an_explicit_command(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "call_log_payload_mode", "full")
+    request = {"call_outcome": "booked", "mc_number": "123456", "availability_time": "2026-02-13T16:09:01-05:00"}
+    responses = [
+        await client.post("/log-call", json={**request, "final_rate": str(rate)}, headers=API_HEADERS)
+        for rate in (2000, 2100, 2200)
+    ]
+    call_ids = [response.json()["call_id"] for response in responses]
+    full_payloads = [(await db_session.get(Call, call_id)).analytics_payload for call_id in call_ids]
+
+    updates: list[bool] = []
+
+    def record(_conn, _cursor, statement, _params, _context, executemany):
+        if statement.startswith("UPDATE calls"):
+            updates.append(executemany)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert await rewrite_call_payloads(db_session, "compact", batch_size=2) == {"calls": 3, "rewritten": 3}
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    # One executemany UPDATE per batch rather than one statement per row.
+    assert updates == [True, False]
+
+    for call_id in call_ids:
+        call = await db_session.get(Call, call_id)
+        assert call.analytics_payload == {"availability_time": "2026-02-13T16:09:01-05:00"}
+    assert await rewrite_call_payloads(db_session, "compact") == {"calls": 3, "rewritten": 0}
+
+    assert await rewrite_call_payloads(db_session, "expand") == {"calls": 3, "rewritten": 3}
+    assert [(await db_session.get(Call, call_id)).analytics_payload for call_id in call_ids] == full_payloads
+
+
+def test_compact_payload_keeps_what_the_columns_cannot_reproduce():
+    columns = {"call_outcome": "booked", "mc_number": "123456", "final_rate": 2050.0, "sentiment": None}
+    payload = {"call_outcome": "booked", "mc_number": "MC-123456", "final_rate": 2050.0, "sentiment": None, "extra": 1}
+
+    compact = compact_payload(payload, columns)
+
+    assert compact == {"mc_number": "MC-123456", "extra": 1}
+    assert {key: value for key, value in rebuild_payload(columns, compact).items() if key in payload} == payload
+
+
+@pytest.mark.asyncio
+async def test_write_behind_log_call_flushes_in_batches(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "call_log_write_mode", "write_behind")
+    monkeypatch.setattr(call_log_writer, "max_batch_rows", 3)
+    monkeypatch.setattr(call_log_writer, "flush_interval_ms", 20.0)
+    flushes_before = call_log_writer.flushes
+    call_log_writer.start()
+    try:
+        responses = [
+            await client.post(
+                "/log-call", json={"call_outcome": "booked", "mc_number": f"7000{idx}"}, headers=API_HEADERS
+            )
+            for idx in range(7)
+        ]
+        assert {(response.json()["status"], response.json()["call_id"]) for response in responses} == {("queued", None)}
+        await call_log_writer.wait_flushed()
+    finally:
+        await call_log_writer.stop()
+
+    rows = (await db_session.execute(select(Call.mc_number, Call.server_timestamp))).all()
+    assert sorted(row.mc_number for row in rows) == [f"7000{idx}" for idx in range(7)]
+    assert all(row.server_timestamp is not None for row in rows)
+    assert call_log_writer.flushes - flushes_before >= 3
+    metrics = (await client.get("/metrics", headers=API_HEADERS)).json()["call_log_writer"]
+    assert metrics["depth"] == 0 and metrics["running"] is False
+
+
+@pytest.mark.asyncio
+async def test_write_behind_stop_drains_the_queue(db_session, monkeypatch):
+    monkeypatch.setattr(call_log_writer, "max_batch_rows", 100)
+    monkeypatch.setattr(call_log_writer, "flush_interval_ms", 60_000.0)
+    call_log_writer.start()
+    for idx in range(5):
+        assert call_log_writer.submit({"call_outcome": "declined", "mc_number": f"8000{idx}"})
+    await asyncio.sleep(0)
+    assert (await db_session.execute(select(func.count(Call.id)))).scalar_one() == 0
+    await db_session.rollback()
+
+    await call_log_writer.stop()
+
+    assert (await db_session.execute(select(func.count(Call.id)))).scalar_one() == 5
+    assert call_log_writer.submit({"call_outcome": "declined"}) is False
+
+
+@pytest.mark.asyncio
+async def test_write_behind_keeps_flushing_after_a_non_database_failure(db_session, monkeypatch):
+    monkeypatch.setattr(call_log_writer, "max_batch_rows", 1)
+    monkeypatch.setattr(call_log_writer, "flush_interval_ms", 0.0)
+    create_calls = CallRepository.create_calls
+
+    async def failing_create_calls(self, payloads):
+        if any(payload["mc_number"] == "81000" for payload in payloads):
+            raise ConnectionResetError("connection reset by peer")
+        return await create_calls(self, payloads)
+
+    monkeypatch.setattr(CallRepository, "create_calls", failing_create_calls)
+    failed_before = call_log_writer.failed_rows
+    call_log_writer.start()
+    try:
+        assert call_log_writer.submit({"call_outcome": "declined", "mc_number": "81000"})
+        await call_log_writer.wait_flushed()
+        assert call_log_writer.running
+        assert call_log_writer.submit({"call_outcome": "booked", "mc_number": "81001"})
+        await call_log_writer.wait_flushed()
+    finally:
+        await call_log_writer.stop()
+
+    assert call_log_writer.failed_rows - failed_before == 1
+    assert (await db_session.execute(select(Call.mc_number))).scalars().all() == ["81001"]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_retries_a_failed_batch_then_drops_only_the_failing_rows(db_session, monkeypatch):
+    monkeypatch.setattr(call_log_writer, "max_batch_rows", 3)
+    monkeypatch.setattr(call_log_writer, "flush_interval_ms", 1000.0)
+    create_calls = CallRepository.create_calls
+    attempts: list[int] = []
+
+    async def flaky_create_calls(self, payloads):
+        attempts.append(len(payloads))
+        if len(attempts) == 1 or any(payload["mc_number"] == "82004" for payload in payloads):
+            raise ConnectionResetError("connection reset by peer")
+        return await create_calls(self, payloads)
+
+    monkeypatch.setattr(CallRepository, "create_calls", flaky_create_calls)
+    failed_before = call_log_writer.failed_rows
+    retried_before = call_log_writer.retried_flushes
+    call_log_writer.start()
+    try:
+        # A transient failure is retried as a whole batch.
+        for mc_number in ("82000", "82001", "82002"):
+            assert call_log_writer.submit({"call_outcome": "booked", "mc_number": mc_number})
+        await call_log_writer.wait_flushed()
+        assert attempts == [3, 3]
+
+        # A batch that fails twice is written row by row, dropping only the row that keeps failing.
+        for mc_number in ("82003", "82004", "82005"):
+            assert call_log_writer.submit({"call_outcome": "booked", "mc_number": mc_number})
+        await call_log_writer.wait_flushed()
+        assert attempts == [3, 3, 3, 3, 1, 1, 1]
+    finally:
+        await call_log_writer.stop()
+
+    assert call_log_writer.failed_rows - failed_before == 1
+    assert call_log_writer.retried_flushes - retried_before == 2
+    stored = (await db_session.execute(select(Call.mc_number).order_by(Call.mc_number))).scalars().all()
+    assert stored == ["82000", "82001", "82002", "82003", "82005"]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_falls_back_to_sync_insert_when_writer_is_not_running(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "call_log_write_mode", "write_behind")
+    response = await client.post("/log-call", json={"call_outcome": "booked"}, headers=API_HEADERS)
+    assert response.json()["status"] == "logged"
+    assert isinstance(response.json()["call_id"], int)
+
+
+@pytest.mark.asyncio
+async def test_log_call_bulk_accepts_a_json_array_in_batches(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "call_log_bulk_batch_rows", 2)
+    records = [{"call_outcome": "booked", "mc_number": str(100000 + index)} for index in range(5)]
+    response = await client.post("/log-call/bulk", json=records, headers=API_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "logged", "received": 5, "inserted": 5, "errors": [], "complete": True}
+    assert await db_session.scalar(select(func.count(Call.id))) == 5
+
+
+@pytest.mark.asyncio
+async def test_log_call_bulk_streams_ndjson_and_reports_per_record_errors(client, db_session):
+    body = (
+        '{"call_outcome": "booked", "origin_location": "Montr\u00e9al QC"}\n'
+        "{not json}\n"
+        '{"call_outcome": "declined", "unexpected_key": 1}\n'
+        "\n"
+        '{"call_outcome": "no_match", "loads_returned_count": "0"}'
+    ).encode()
+
+    async def chunks():
+        # Split records (and a multi-byte character) across chunk boundaries.
+        for start in range(0, len(body), 7):
+            yield body[start : start + 7]
+
+    response = await client.post("/log-call/bulk", content=chunks(), headers=API_HEADERS)
+
+    payload = response.json()
+    assert response.status_code == 200
+    assert (payload["received"], payload["inserted"], payload["complete"]) == (4, 2, True)
+    assert [error["index"] for error in payload["errors"]] == [1, 2]
+    assert payload["errors"][0]["error"].startswith("Invalid JSON")
+    assert "unexpected_key" in payload["errors"][1]["error"]
+    rows = (await db_session.execute(select(Call.call_outcome, Call.origin_location).order_by(Call.id))).all()
+    assert [tuple(row) for row in rows] == [("booked", "Montr\u00e9al QC"), ("no_match", None)]
+
+
+@pytest.mark.asyncio
+async def test_log_call_bulk_stops_at_a_malformed_array(client, db_session):
+    response = await client.post(
+        "/log-call/bulk",
+        content=b'[{"call_outcome": "booked"} {"call_outcome": "declined"}]',
+        headers=API_HEADERS,
+    )
+
+    payload = response.json()
+    assert (payload["received"], payload["inserted"], payload["complete"]) == (2, 1, False)
+    assert payload["errors"][0]["index"] == 1
+    assert await db_session.scalar(select(func.count(Call.id))) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_json_records_decodes_records_split_across_chunks():
+    text = '[ {"a": "caf\u00e9", "b": [1, 2]}, 12345 , "x,y" ,true, null ]'.encode()
+
+    async def chunks(size):
+        for start in range(0, len(text), size):
+            yield text[start : start + size]
+
+    for size in (1, 2, 3, 5, len(text)):
+        records = [record async for record in iter_json_records(chunks(size))]
+        assert records == [{"a": "caf\u00e9", "b": [1, 2]}, 12345, "x,y", True, None]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_aggregates_group_on_coded_columns(client, db_session):
+    load = await insert_load(db_session, load_id="CODED-LOAD-001", rate=Decimal("2000.00"))
+    calls = [
+        {"call_outcome": " Booked", "sentiment": "POSITIVE", "deal_margin_pressure": "High", "equipment_type": "Dry Van"},
+        {"call_outcome": "booked", "sentiment": "negative", "deal_margin_pressure": "low", "equipment_type": "dry-van"},
+        {"call_outcome": "no match", "sentiment": "Frustrated ", "equipment_type": "reefer, dry van"},
+        {"call_outcome": "declined"},
+    ]
+    for call in calls:
+        response = await client.post(
+            "/log-call", json={**call, "load_id_discussed": load.load_id}, headers=API_HEADERS
+        )
+        assert response.status_code == 200
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        overview = (await client.get("/dashboard/overview", headers=API_HEADERS)).json()
+        distribution = (await client.get("/dashboard/sentiment-distribution", headers=API_HEADERS)).json()
+        performance = (await client.get("/dashboard/load-performance", headers=API_HEADERS)).json()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert not [statement for statement in statements if "lower(" in statement.lower()]
+    assert (overview["booked_loads"], overview["avg_sentiment"], overview["avg_margin_pressure"]) == (2, 0.0, 2.0)
+    # Free-text sentiments keep their own (normalized) category; only the average is limited to scored ones.
+    assert sorted((row["sentiment"], row["count"]) for row in distribution) == [
+        ("frustrated", 1),
+        ("negative", 1),
+        ("positive", 1),
+    ]
+    assert [(row["equipment_type"], row["total_calls"], row["booked_calls"]) for row in performance] == [
+        ("Dry Van", 2, 2)
+    ]
+    codes = (await db_session.execute(select(Call.outcome_code, Call.sentiment_label).order_by(Call.id))).all()
+    assert [tuple(row) for row in codes] == [(1, "positive"), (1, "negative"), (3, "frustrated"), (2, None)]
+
+
+@pytest.mark.asyncio
+async def test_call_rollups_are_maintained_on_insert_and_match_a_rebuild(client, db_session):
+    load = await insert_load(db_session, load_id="ROLLUP-LOAD-001", rate=Decimal("2000.00"))
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    await CallRepository(db_session).create_calls(
+        [
+            {"call_outcome": "booked", "sentiment": "positive", "created_at": yesterday, "analytics_payload": {}},
+            {"call_outcome": "declined", "sentiment": "negative", "created_at": yesterday, "analytics_payload": {}},
+        ]
+    )
+    await client.post(
+        "/log-call",
+        json={
+            "call_outcome": "booked",
+            "sentiment": "neutral",
+            "carrier_verified": "true",
+            "load_id_discussed": load.load_id,
+            "equipment_type": "reefer",
+            "final_rate": "2100",
+            "negotiation_rounds": "2",
+        },
+        headers=API_HEADERS,
+    )
+    await client.post(
+        "/log-call/bulk",
+        json=[
+            {
+                "call_outcome": "booked",
+                "carrier_verified": "false",
+                "load_id_discussed": load.load_id,
+                "equipment_type": "reefer",
+            }
+        ],
+        headers=API_HEADERS,
+    )
+
+    async def rollup_rows():
+        await db_session.rollback()
+        daily = (await db_session.execute(select(CallDailyRollup))).scalars()
+        lanes = (await db_session.execute(select(CallLaneDailyRollup))).scalars()
+        rows = [{column: getattr(row, column) for column in row.__table__.columns.keys()} for row in [*daily, *lanes]]
+        return sorted(rows, key=repr)
+
+    maintained = await rollup_rows()
+    assert await rebuild_call_rollups(db_session) == {"calls": 4, "daily_rows": 4, "lane_rows": 1}
+    assert await rollup_rows() == maintained
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        overview = (await client.get("/dashboard/overview", headers=API_HEADERS)).json()
+        timeseries = (await client.get("/dashboard/sentiment", headers=API_HEADERS)).json()
+        performance = (await client.get("/dashboard/load-performance", headers=API_HEADERS)).json()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert not [statement for statement in statements if "FROM calls" in statement]
+    assert (overview["total_calls"], overview["booked_loads"], overview["verified_count"]) == (4, 3, 1)
+    assert overview["avg_negotiation_rounds"] == 2.0
+    assert [row["avg_sentiment"] for row in timeseries] == [0.0, 0.0]
+    assert len(timeseries) == 2
+    assert [(row["total_calls"], row["booked_calls"], row["avg_final_rate"]) for row in performance] == [(2, 2, 2100.0)]
+    assert performance[0]["avg_loadboard_rate"] == 2000.0
+
+
 @pytest.mark.asyncio
 async def test_dashboard_metrics_endpoints_return_success(client, db_session):
     load = await insert_load(db_session, load_id="DASH-LOAD-001", rate=Decimal("2100.00"))
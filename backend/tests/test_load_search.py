@@ -0,0 +1,542 @@
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.load_ranking import LoadQuery, score_load, time_distance_seconds
+from app.core import load_matching
+from app.core.gazetteer import geocode
+from app.core.load_snapshot import NUMPY_MIN_LOADS, LoadSnapshot
+from app.db.base import Base
+from app.db.session import engine
+from app.models import Load
+from app.repositories import LoadRepository
+from app.repositories.load_search_index import LoadSearchIndex, load_search_index
+from app.repositories.load_snapshot_store import LoadSnapshotStore, load_snapshot_store
+from app.services import LoadService
+from app.services.load_search_cache import LoadSearchCache, load_search_cache
+
+BASE_TIME = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+# The SQL strategy's strpos/pg_trgm path only runs on Postgres; point this at a throwaway
+# database (postgresql+asyncpg://...) to check it against the Python ranking too.
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+ORIGINS = [
+    "Chicago, IL",
+    "Chicago, Illinois",
+    "Joliet, IL",
+    "Dallas, TX",
+    "Fort Worth, TX",
+    "Los Angeles, CA",
+    "Kansas City, MO",
+    "Kansas City, KS",
+    "Newark, NJ",
+    "Denver,   CO",
+]
+EQUIPMENT = ["Dry Van", "DryVan", "Reefer", "Flatbed", "flat-bed", "Dry Van / Reefer"]
+
+QUERIES = [
+    ("dryvan", "chicago il"),
+    ("Dry Van", "Chicago, IL"),
+    ("reefer", "Dallas"),
+    ("flat bed", "Kansas City"),
+    ("Power Only", "il"),
+    ("van", "Fort Worth, TX"),
+    ("Reefer", "Miami, FL"),
+    ("Flatbed", "a"),
+]
+
+
+def make_load(load_id: str, origin: str, equipment_type: str, pickup: datetime, is_active: bool = True) -> Load:
+    return Load(
+        load_id=load_id,
+        origin=origin,
+        destination="Atlanta, GA",
+        pickup_datetime=pickup,
+        delivery_datetime=pickup + timedelta(hours=12),
+        equipment_type=equipment_type,
+        loadboard_rate=Decimal("2000.00"),
+        notes="Search fixture",
+        weight=30000,
+        commodity_type="General Freight",
+        miles=600,
+        dimensions="53ft trailer",
+        num_of_pieces=10,
+        is_active=is_active,
+    )
+
+
+async def seed_board(db_session, count: int = 60) -> None:
+    loads = []
+    for idx in range(count):
+        # Pickups straddle BASE_TIME symmetrically so equal time distances exercise the pickup tiebreak.
+        offset_hours = ((idx % 7) - 3) * 4
+        loads.append(
+            make_load(
+                load_id=f"SRCH-{idx:03d}",
+                origin=ORIGINS[idx % len(ORIGINS)],
+                equipment_type=EQUIPMENT[idx % len(EQUIPMENT)],
+                pickup=BASE_TIME + timedelta(hours=offset_hours),
+                is_active=idx % 11 != 0,
+            )
+        )
+    db_session.add_all(loads)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["index", "sql"])
+@pytest.mark.parametrize("equipment_type,origin_location", QUERIES)
+async def test_search_strategies_match_python_scan_ranking(db_session, strategy, equipment_type, origin_location):
+    await seed_board(db_session)
+
+    scan = await LoadRepository(db_session, search_strategy="scan").search_loads(
+        equipment_type, origin_location, BASE_TIME
+    )
+    candidate = await LoadRepository(db_session, search_strategy=strategy, search_index=LoadSearchIndex()).search_loads(
+        equipment_type, origin_location, BASE_TIME
+    )
+
+    assert scan
+    assert [load.load_id for load in candidate] == [load.load_id for load in scan]
+
+
+@pytest.mark.asyncio
+async def test_scan_scores_narrow_columns_and_fetches_full_rows_for_winners_only(db_session):
+    await seed_board(db_session)
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        loads = await LoadRepository(db_session, search_strategy="scan").search_loads("Reefer", "Dallas", BASE_TIME)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert loads
+    full_row_reads = [statement for statement in statements if "loads.notes" in statement]
+    assert len(full_row_reads) == 1
+    assert "loads.id IN" in full_row_reads[0]
+
+
+@pytest.mark.parametrize("radius_miles,window_hours", [(None, None), (None, 6), (150, None)])
+def test_snapshot_ranking_matches_row_by_row_scoring(radius_miles, window_hours):
+    loads = [
+        make_load(f"SNAP-{idx:03d}", ORIGINS[idx % 10], EQUIPMENT[idx % 6], BASE_TIME + timedelta(hours=(idx % 9) - 4))
+        for idx in range(90)
+    ]
+    for idx, load in enumerate(loads):
+        load.id = idx + 1
+        load.refresh_search_columns()
+    snapshot = LoadSnapshot.from_rows(loads)
+    assert len(snapshot.origin_values) == len(ORIGINS)
+
+    for equipment_type, origin_location in QUERIES:
+        query = LoadQuery.build(equipment_type, origin_location, BASE_TIME, radius_miles, window_hours)
+        window = query.pickup_window_bounds
+        in_window = [load for load in loads if window is None or window[0] <= load.pickup_at_utc <= window[1]]
+        expected = []
+        for load in in_window:
+            score = score_load(
+                query, load.equipment_code, load.origin_normalized, load.origin_latitude, load.origin_longitude
+            )
+            if score:
+                expected.append((-score, time_distance_seconds(query, load.pickup_at_utc), load.pickup_at_utc, load.id))
+        expected.sort()
+
+        ranked, pruned = snapshot.rank(query, limit=15)
+        assert ranked == [item[3] for item in expected[:15]]
+        assert pruned == (None if window is None else len(loads) - len(in_window))
+
+
+@pytest.mark.parametrize("radius_miles,window_hours", [(None, None), (None, 6), (150, 12)])
+def test_numpy_scorer_matches_python_scorer(radius_miles, window_hours):
+    pytest.importorskip("numpy")
+    rng = random.Random(11)
+    snapshot = LoadSnapshot()
+    base = BASE_TIME.replace(tzinfo=None)
+    for load_pk in rng.sample(range(1, 50_000), NUMPY_MIN_LOADS * 3):
+        origin = load_matching.normalize_text(rng.choice(ORIGINS))
+        point = geocode(origin)
+        snapshot.append(
+            load_pk,
+            load_matching.normalize_equipment(rng.choice(EQUIPMENT)),
+            origin,
+            point.latitude if point else None,
+            point.longitude if point else None,
+            # Hour-aligned pickups on both sides of the query time produce many full ties.
+            base + timedelta(hours=rng.randint(-24, 24)),
+        )
+
+    for equipment_type, origin_location in QUERIES:
+        query = LoadQuery.build(equipment_type, origin_location, BASE_TIME, radius_miles, window_hours)
+        for limit in (1, 15, 400):
+            assert snapshot.rank(query, limit, scorer="numpy") == snapshot.rank(query, limit, scorer="python")
+
+
+@pytest.mark.asyncio
+async def test_numpy_scorer_ranks_the_kept_snapshot_for_the_index_strategy(db_session):
+    pytest.importorskip("numpy")
+    await seed_board(db_session)
+    index = LoadSearchIndex()
+    numpy_repo = LoadRepository(db_session, search_strategy="index", search_index=index, scorer="numpy")
+    python_repo = LoadRepository(db_session, search_strategy="index", scorer="python")
+
+    for equipment_type, origin_location in QUERIES:
+        ranked = await numpy_repo.search_loads(equipment_type, origin_location, BASE_TIME, pickup_window_hours=8)
+        expected = await python_repo.search_loads(equipment_type, origin_location, BASE_TIME, pickup_window_hours=8)
+        assert [load.load_id for load in ranked] == [load.load_id for load in expected]
+        assert numpy_repo.last_search_stats == python_repo.last_search_stats
+    assert not index.is_fresh and load_snapshot_store.is_fresh
+
+
+@pytest.mark.asyncio
+async def test_index_applies_inserts_and_deactivations_incrementally(db_session):
+    index = load_search_index
+    repo = LoadRepository(db_session, search_strategy="index")
+    db_session.add(make_load("INC-001", "Chicago, IL", "Dry Van", BASE_TIME + timedelta(hours=2)))
+    await db_session.commit()
+
+    first = await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME)
+    assert [load.load_id for load in first] == ["INC-001"]
+
+    new_load = make_load("INC-002", "Chicago, IL", "Dry Van", BASE_TIME + timedelta(hours=1))
+    db_session.add(new_load)
+    await db_session.commit()
+    assert index.is_fresh
+    assert len(index) == 2
+
+    second = await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME)
+    assert [load.load_id for load in second] == ["INC-002", "INC-001"]
+
+    new_load.is_active = False
+    await db_session.commit()
+
+    third = await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME)
+    assert [load.load_id for load in third] == ["INC-001"]
+    assert len(index) == 1
+    assert index.ids_in_pickup_range(BASE_TIME, BASE_TIME + timedelta(hours=3)) == [first[0].id]
+
+
+@pytest.mark.asyncio
+async def test_scan_snapshot_is_kept_across_requests_and_follows_load_changes(db_session):
+    await seed_board(db_session)
+    repo = LoadRepository(db_session, search_strategy="scan")
+    await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME)
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    new_load = make_load("SNAP-001", "Boise, ID", "Dry Van", BASE_TIME)
+    db_session.add(new_load)
+    await db_session.commit()
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        added = await repo.search_loads("Dry Van", "Boise, ID", BASE_TIME)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    # Only the keyed fetch of the winners reads `loads`; the snapshot is not rebuilt.
+    assert len(statements) == 1 and "loads.id IN" in statements[0]
+    assert added[0].load_id == "SNAP-001"
+
+    new_load.origin = "Reno, NV"
+    await db_session.commit()
+    assert [load.load_id for load in await repo.search_loads("Step Deck", "Boise, ID", BASE_TIME)] == []
+    assert (await repo.search_loads("Step Deck", "Reno, NV", BASE_TIME))[0].load_id == "SNAP-001"
+    new_load.is_active = False
+    await db_session.commit()
+    assert "SNAP-001" not in [load.load_id for load in await repo.search_loads("Step Deck", "Reno, NV", BASE_TIME)]
+
+    rebuilt = LoadSnapshotStore()
+    fresh = await LoadRepository(db_session, search_strategy="scan", snapshot_store=rebuilt).search_loads(
+        "Dry Van", "Chicago, IL", BASE_TIME, limit=60
+    )
+    kept = await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME, limit=60)
+    assert [load.load_id for load in kept] == [load.load_id for load in fresh]
+    assert len(load_snapshot_store.snapshot) == len(rebuilt.snapshot)
+
+
+@pytest.mark.asyncio
+async def test_search_columns_are_maintained_on_insert_and_update(db_session):
+    central_pickup = datetime(2026, 3, 2, 7, 0, tzinfo=timezone(timedelta(hours=-5)))
+    load = make_load("COLS-001", "  Chicago,   IL ", "Dry-Van", central_pickup)
+    db_session.add(load)
+    await db_session.commit()
+
+    assert load.origin_normalized == "chicago il"
+    assert load.origin_tokens == ["chicago", "il"]
+    assert load.equipment_code == "dry van"
+    assert load.pickup_at_utc == datetime(2026, 3, 2, 12, 0)
+
+    load.origin = "Joliet, IL"
+    load.equipment_type = "Flat-Bed"
+    await db_session.commit()
+
+    assert load.origin_normalized == "joliet il"
+    assert load.origin_tokens == ["joliet", "il"]
+    assert load.equipment_code == "flatbed"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["scan", "index", "sql"])
+async def test_radius_search_matches_nearby_cities_only(db_session, strategy):
+    await seed_board(db_session)
+    db_session.add(make_load("GEO-PEORIA", "Peoria, IL", "Dry Van", BASE_TIME))
+    await db_session.commit()
+
+    repo = LoadRepository(db_session, search_strategy=strategy, search_index=LoadSearchIndex())
+    loads = await repo.search_loads("Dry Van", "Joliet, IL", BASE_TIME, origin_radius_miles=50)
+
+    origins = {load.origin for load in loads}
+    assert origins <= {"Chicago, IL", "Chicago, Illinois", "Joliet, IL"}
+    assert "Chicago, IL" in origins
+    assert all(load.is_active for load in loads)
+    assert loads[0].origin == "Joliet, IL"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["index", "sql"])
+async def test_radius_search_strategies_match_python_scan_ranking(db_session, strategy):
+    await seed_board(db_session)
+
+    scan = await LoadRepository(db_session, search_strategy="scan").search_loads(
+        "Reefer", "Dallas, TX", BASE_TIME, origin_radius_miles=120
+    )
+    candidate = await LoadRepository(db_session, search_strategy=strategy, search_index=LoadSearchIndex()).search_loads(
+        "Reefer", "Dallas, TX", BASE_TIME, origin_radius_miles=120
+    )
+
+    assert {load.origin for load in scan} == {"Dallas, TX", "Fort Worth, TX"}
+    assert [load.load_id for load in candidate] == [load.load_id for load in scan]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+async def test_sql_strategy_matches_python_scan_ranking_on_postgres():
+    postgres_engine = create_async_engine(TEST_POSTGRES_URL)
+    try:
+        async with postgres_engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(postgres_engine, expire_on_commit=False) as session:
+            await seed_board(session)
+            for equipment_type, origin_location in QUERIES:
+                for radius_miles, window_hours in ((None, None), (None, 8), (150.0, None), (150.0, 8)):
+                    scan = LoadRepository(session, search_strategy="scan", snapshot_store=LoadSnapshotStore())
+                    sql = LoadRepository(session, search_strategy="sql")
+                    expected = await scan.search_loads(
+                        equipment_type, origin_location, BASE_TIME, 15, radius_miles, window_hours
+                    )
+                    actual = await sql.search_loads(
+                        equipment_type, origin_location, BASE_TIME, 15, radius_miles, window_hours
+                    )
+                    assert [load.load_id for load in actual] == [load.load_id for load in expected]
+                    assert sql.last_search_stats == scan.last_search_stats
+    finally:
+        async with postgres_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await postgres_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_radius_is_ignored_when_carrier_location_is_unknown(db_session):
+    await seed_board(db_session)
+    repo = LoadRepository(db_session, search_strategy="scan")
+
+    with_radius = await repo.search_loads("Dry Van", "Chicago area", BASE_TIME, origin_radius_miles=50)
+    without_radius = await repo.search_loads("Dry Van", "Chicago area", BASE_TIME)
+
+    assert [load.load_id for load in with_radius] == [load.load_id for load in without_radius]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["scan", "index", "sql"])
+async def test_pickup_window_prunes_loads_outside_window(db_session, strategy):
+    await seed_board(db_session)
+    active_outside_window = sum(1 for idx in range(60) if idx % 11 != 0 and abs(((idx % 7) - 3) * 4) > 4)
+
+    repo = LoadRepository(db_session, search_strategy=strategy, search_index=LoadSearchIndex())
+    windowed = await repo.search_loads("Dry Van", "Chicago, IL", BASE_TIME, pickup_window_hours=4)
+    assert repo.last_search_stats.pruned_by_pickup_window == active_outside_window
+
+    unwindowed = await LoadRepository(db_session, search_strategy="scan").search_loads(
+        "Dry Van", "Chicago, IL", BASE_TIME, limit=100
+    )
+    base = BASE_TIME.replace(tzinfo=None)
+    expected = [load.load_id for load in unwindowed if abs(load.pickup_at_utc - base) <= timedelta(hours=4)]
+    assert windowed
+    assert [load.load_id for load in windowed] == expected[:15]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("radius_miles", [None, 150.0])
+async def test_sql_search_is_one_round_trip_including_the_window_count(db_session, radius_miles):
+    await seed_board(db_session)
+    repo = LoadRepository(db_session, search_strategy="sql")
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        windowed = await repo.search_loads(
+            "Dry Van", "Chicago, IL", BASE_TIME, origin_radius_miles=radius_miles, pickup_window_hours=4
+        )
+        windowed_pruned = repo.last_search_stats.pruned_by_pickup_window
+        statements_per_search = len(statements)
+        unmatched = await repo.search_loads(
+            "Power Only", "Miami, FL", BASE_TIME, origin_radius_miles=radius_miles, pickup_window_hours=4
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert windowed
+    # The radius path ranks narrow rows in Python and then reads the winners by primary key.
+    assert statements_per_search == (1 if radius_miles is None else 2)
+    # The window count is reported even when nothing matches.
+    assert unmatched == []
+    assert repo.last_search_stats.pruned_by_pickup_window == windowed_pruned > 0
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_reports_pickup_window_pruning(client, db_session):
+    await seed_board(db_session, count=14)
+    response = await client.post(
+        "/search-loads",
+        json={
+            "equipment_type": "Dry Van",
+            "origin_location": "Chicago, IL",
+            "availability_time": BASE_TIME.isoformat(),
+            "pickup_window_hours": 1,
+        },
+        headers={"x-api-key": "test-api-key"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["pruned_by_pickup_window"] > 0
+    assert all(load["pickup_datetime"].startswith("2026-03-02T12:00") for load in payload["loads"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["scan", "index", "sql"])
+async def test_batch_search_matches_individual_searches(db_session, strategy):
+    await seed_board(db_session)
+    requests = [
+        (equipment_type, origin_location, {}) for equipment_type, origin_location in QUERIES
+    ] + [
+        ("Reefer", "Dallas, TX", {"origin_radius_miles": 120}),
+        ("Dry Van", "Chicago, IL", {"pickup_window_hours": 4}),
+    ]
+
+    repo = LoadRepository(db_session, search_strategy=strategy, search_index=LoadSearchIndex())
+    batch = await repo.search_loads_batch(
+        [
+            LoadQuery.build(
+                equipment_type,
+                origin_location,
+                BASE_TIME,
+                options.get("origin_radius_miles"),
+                options.get("pickup_window_hours"),
+            )
+            for equipment_type, origin_location, options in requests
+        ]
+    )
+    batch_stats = repo.last_batch_stats
+
+    scan = LoadRepository(db_session, search_strategy="scan")
+    for position, (equipment_type, origin_location, options) in enumerate(requests):
+        expected = await scan.search_loads(equipment_type, origin_location, BASE_TIME, **options)
+        assert [load.load_id for load in batch[position]] == [load.load_id for load in expected]
+        assert batch_stats[position] == scan.last_search_stats
+
+
+@pytest.mark.asyncio
+async def test_batch_search_endpoint_returns_results_per_query(client, db_session):
+    await seed_board(db_session)
+    queries = [
+        {"equipment_type": "Dry Van", "origin_location": "Dallas, TX"},
+        {"equipment_type": "Reefer", "origin_location": "Fort Worth, TX", "pickup_window_hours": 4},
+    ]
+    response = await client.post(
+        "/search-loads/batch",
+        json={"queries": [{**query, "availability_time": BASE_TIME.isoformat()} for query in queries]},
+        headers={"x-api-key": "test-api-key"},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["pruned_by_pickup_window"] is None
+    assert results[1]["pruned_by_pickup_window"] > 0
+    for query, result in zip(queries, results):
+        single = await client.post(
+            "/search-loads",
+            json={**query, "availability_time": BASE_TIME.isoformat()},
+            headers={"x-api-key": "test-api-key"},
+        )
+        assert result == single.json()
+
+    empty = await client.post("/search-loads/batch", json={"queries": []}, headers={"x-api-key": "test-api-key"})
+    assert empty.status_code == 422
+
+
+def test_search_cache_evicts_least_recently_used_and_expired_entries(monkeypatch):
+    cache = LoadSearchCache(max_entries=2, ttl_seconds=30)
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.load_search_cache.time.monotonic", lambda: clock[0])
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+
+    clock[0] += 31
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 1,
+        "max_entries": 2,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 2,
+        "invalidations": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_cache_serves_same_lane_and_invalidates_on_load_changes(db_session):
+    db_session.add(make_load("CACHE-001", "Chicago, IL", "Dry Van", BASE_TIME + timedelta(hours=2)))
+    await db_session.commit()
+    service = LoadService(LoadRepository(db_session), cache=load_search_cache)
+    hits_before = load_search_cache.hits
+    invalidations_before = load_search_cache.invalidations
+
+    first = await service.search("Dry Van", "Chicago, IL", BASE_TIME)
+    second = await service.search("dryvan", "chicago il", BASE_TIME + timedelta(minutes=1))
+    assert [load.load_id for load in second] == [load.load_id for load in first] == ["CACHE-001"]
+    assert load_search_cache.hits == hits_before + 1
+
+    db_session.add(make_load("CACHE-002", "Chicago, IL", "Dry Van", BASE_TIME + timedelta(hours=1)))
+    await db_session.commit()
+
+    third = await service.search("Dry Van", "Chicago, IL", BASE_TIME)
+    assert [load.load_id for load in third] == ["CACHE-002", "CACHE-001"]
+    assert load_search_cache.invalidations == invalidations_before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_search_cache_counters(client):
+    response = await client.get("/metrics", headers={"x-api-key": "test-api-key"})
+
+    assert response.status_code == 200
+    assert set(response.json()["load_search_cache"]) >= {"hits", "misses", "evictions"}
@@ -0,0 +1,82 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pydantic import ValidationError
+
+from app.schemas.negotiation import EvaluateOfferRequest
+from app.services.negotiation_service import CentsLadder, NegotiationService, to_cents
+
+cents = st.integers(min_value=1, max_value=5_000_000)
+rounds = st.integers(min_value=1, max_value=10)
+
+
+def as_rate(amount_cents: int) -> Decimal:
+    return Decimal(amount_cents).scaleb(-2)
+
+
+@settings(max_examples=1000, deadline=None)
+@given(
+    loadboard_cents=cents,
+    offer_cents=cents,
+    round_number=rounds,
+    previous_counter_cents=st.none() | cents,
+)
+def test_cents_engine_matches_decimal_engine(loadboard_cents, offer_cents, round_number, previous_counter_cents):
+    load = SimpleNamespace(loadboard_rate=as_rate(loadboard_cents))
+    previous_counter = as_rate(previous_counter_cents) if previous_counter_cents is not None else None
+
+    expected = NegotiationService(engine="decimal").evaluate_offer(
+        load, as_rate(offer_cents), round_number, previous_counter
+    )
+    actual = NegotiationService(engine="cents").evaluate_offer(load, as_rate(offer_cents), round_number, previous_counter)
+
+    assert actual == expected
+    assert actual[1] is None or actual[1].as_tuple().exponent == -2
+
+
+@settings(max_examples=500, deadline=None)
+@given(loadboard_cents=cents, offer_cents=cents, round_number=rounds)
+def test_offers_near_thresholds_match(loadboard_cents, offer_cents, round_number):
+    # Hypothesis rarely lands exactly on a boundary, so probe each threshold and its neighbours.
+    ladder = CentsLadder.for_cents(loadboard_cents)
+    load = SimpleNamespace(loadboard_rate=as_rate(loadboard_cents))
+    boundaries = (
+        ladder.accept_at_or_below,
+        ladder.reject_at_or_above,
+        ladder.final_round_reject_above_x100 // 100,
+        ladder.counter_cap_x200 // 200,
+    )
+    cents_engine = NegotiationService(engine="cents")
+    decimal_engine = NegotiationService(engine="decimal")
+    for boundary in boundaries:
+        for probe in (boundary - 1, boundary, boundary + 1, offer_cents):
+            if probe > 0:
+                offer = as_rate(probe)
+                assert cents_engine.evaluate_offer(load, offer, round_number) == decimal_engine.evaluate_offer(
+                    load, offer, round_number
+                )
+
+
+def test_sub_cent_amounts_fall_back_to_decimal():
+    load = SimpleNamespace(loadboard_rate=Decimal("2000.00"))
+    assert to_cents(Decimal("2100.005")) is None
+
+    result = NegotiationService(engine="cents").evaluate_offer(load, Decimal("2100.005"), 1)
+    assert result == NegotiationService(engine="decimal").evaluate_offer(load, Decimal("2100.005"), 1)
+    assert result[1] == Decimal("2050.00")
+
+
+def test_amounts_too_long_for_cents_fall_back_to_decimal():
+    load = SimpleNamespace(loadboard_rate=Decimal("2000.00"))
+    for offer in (Decimal("1e27"), Decimal("123456789012345678901234567.5")):
+        assert to_cents(offer) is None
+        result = NegotiationService(engine="cents").evaluate_offer(load, offer, 1)
+        assert result == NegotiationService(engine="decimal").evaluate_offer(load, offer, 1)
+        assert result[0] == "reject"
+    assert to_cents(Decimal("2100.000")) == 210000
+
+    with pytest.raises(ValidationError):
+        EvaluateOfferRequest(load_id="LD-1", carrier_offer=Decimal("1e27"), round_number=1)